@@ -1,5 +1,4 @@
 import os
-import random
 import sys
 import time
 
@@ -13,88 +12,187 @@ with contextlib.redirect_stdout(None):
 	import pygame
 
 import providers
-from typing import Callable, Any
+from typing import Callable, Any, Union
 
 from game import challenge_manager
+from providers.Preloader import AssetManifest, AssetPreloader
 from scene import scene_manager
 from scene.all.GameScene import GameScene
 from scene.all.MenuScene import MenuScene
-from utils import AppState, C, Provider
+from shaders import GlitchShader
+from shaders.FrameStats import FrameStatsOverlay
+from utils import AppState, C, Provider, FrameTimings, InputQueue
+from utils.database import ScoreDatabase
+from utils.leaderboard import Leaderboard
+from utils.sync import SyncClient, DEFAULT_PORT
 
-# Initialize pygame and compute screen size
-pygame.init()
-info = pygame.display.Info()
-C.DISPLAY_SIZE = info.current_w, info.current_h
-C.DISPLAY_RECT = pygame.Rect((0, 0), C.DISPLAY_SIZE)
-screen = pygame.display.set_mode(C.DISPLAY_SIZE, pygame.FULLSCREEN)
+# Main loop phases, in the order they run within a frame
+PHASES = FrameTimings.PHASES
 
-# Initialize base providers (font, sprite, ...)
-providers.init()
-
-# Initialize window icon and title
-pygame.display.set_caption("FuriousHacker by Honeypot")
-pygame.display.set_icon(providers.SpriteProvider.get('HoneyPot_Logo_NOBG_Centered.png'))
-
-# Register scenes
-scene_manager.set(scene_manager.MENU_SCENE, MenuScene())
-game_scene = GameScene()
-scene_manager.set(scene_manager.GAME_SCENE, game_scene)
-
-challenge_manager.init_challenges()
-
-# Create Scene Manager
-scene_manager.set_active_scene(scene_manager.MENU_SCENE)
-
-# Register event handlers
 EventHandlers: Provider[int, Callable[[pygame.event.Event], Any]] = Provider[
 	int, Callable[[pygame.event.Event], None]]()
-EventHandlers.set(pygame.QUIT, lambda _: AppState.stop())
-EventHandlers.set(pygame.MOUSEMOTION, lambda ev: scene_manager.set_cursor(ev.pos))
-EventHandlers.set(pygame.MOUSEBUTTONDOWN, lambda ev: scene_manager.handle_click(ev.pos, ev.button))
-EventHandlers.set(pygame.MOUSEBUTTONUP, lambda ev: scene_manager.handle_release(ev.button))
-EventHandlers.set(pygame.KEYDOWN, lambda ev: scene_manager.type(ev.unicode))
-
-
-# Register main screen shader
-def glitch_shader(screen: pygame.Surface, t: float):
-	delay = 15
-	duration = 0.5
-	disparity = 10, 25
-	block_unit_size = 10, 10
-	if not C.FORCE_GLITCH_SHADER and round((t + random.randint(disparity[0], disparity[1]) / 10) / duration) % delay != 0:
-		return
-
-	def extract_sub_surfaces(_block_size: tuple[int, int]):
-		_pos_a = random.randint(_block_size[0] * 2, screen.get_width() - _block_size[0] * 2), random.randint(_block_size[1] * 2, screen.get_height() - _block_size[1] * 2)
-		_pos_b = _pos_a[0] + 0.5 * block_size[0] * (-1 if random.random() < 0.5 else 1), _pos_a[1] + block_size[1] * random.randint(-1, 1)
-		_frame_a, _frame_b = screen.subsurface(_pos_a, _block_size).copy(), screen.subsurface(_pos_b, _block_size).copy()
-		# dark = pygame.Surface(_frame_b.get_size())
-		# dark.set_alpha(random.randint(30, 60))
-		# dark.fill((0, 0, 0))
-		# _frame_b.blit(dark, (0, 0))
-		return _frame_a, _frame_b, _pos_a, _pos_b
-
-	for _ in range(random.randint(20, 35)):
-		block_size = random.randint(2, 8) * block_unit_size[0], block_unit_size[1]
-		frame_a, frame_b, pos_a, pos_b = extract_sub_surfaces(block_size)
-		screen.blit(frame_a, pos_b)
-		screen.blit(frame_b, pos_a)
-
-
-providers.ShaderProvider.set("glitch", glitch_shader)
-
-# Begin main loop
-clock = pygame.time.Clock()
-elapsed = .0
-while AppState.is_running() and scene_manager.get_current_scene() is not None:
-	frame_start = time.time()
-	for event in pygame.event.get():
+InputEvents = InputQueue()
+# Events coming from the player, as opposed to the window or the system
+PLAYER_INPUT = {pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL, pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT}
+
+
+def get_option(name: str) -> Union[str, None]:
+	"""
+	:return: Value of a --name=value argument, an empty string if given without value, None if not given
+	"""
+	for arg in sys.argv:
+		if arg == name or arg.startswith(name + "="):
+			return arg[len(name) + 1:]
+	return None
+
+
+def init_display(size: Union[tuple[int, int], None] = None, flags: int = pygame.FULLSCREEN) -> pygame.Surface:
+	"""
+	Initializes pygame, the display and base providers (font, sprite, ...)
+	:param size: Display size, the screen's size if None
+	"""
+	pygame.init()
+	if size is None:
+		info = pygame.display.Info()
+		size = info.current_w, info.current_h
+	C.DISPLAY_SIZE = size
+	C.DISPLAY_RECT = pygame.Rect((0, 0), C.DISPLAY_SIZE)
+	C.DIRTY_RECT_RENDERING = "--dirty-rects" in sys.argv
+	screen = pygame.display.set_mode(C.DISPLAY_SIZE, flags)
+	providers.init()
+	return screen
+
+
+def draw_loading_screen(screen: pygame.Surface, progress: float):
+	bar = pygame.Rect(0, 0, C.DISPLAY_SIZE[0] // 3, C.DISPLAY_SIZE[1] // 60)
+	bar.center = C.DISPLAY_RECT.center
+	screen.fill(providers.ColorProvider.get('bg'))
+	pygame.draw.rect(screen, providers.ColorProvider.get('fg'), (bar.left, bar.top, int(bar.width * progress), bar.height))
+	pygame.draw.rect(screen, providers.ColorProvider.get('fg2'), bar, 1)
+	pygame.display.flip()
+	pygame.event.pump()
+
+
+def load_assets(screen: pygame.Surface) -> AssetPreloader:
+	"""
+	Decodes every asset up front, instead of whenever scenes and challenges are first built
+	"""
+	preloader = AssetPreloader(AssetManifest.load()).run(lambda progress: draw_loading_screen(screen, progress))
+	if "--asset-report" in sys.argv:
+		for name, duration in sorted(preloader.get_load_times().items(), key=lambda item: -item[1]):
+			print(f"{1000 * duration:8.2f} ms  {name}")
+	return preloader
+
+
+def init_game():
+	# Initialize window icon and title
+	pygame.display.set_caption("FuriousHacker by Honeypot")
+	pygame.display.set_icon(providers.SpriteProvider.get('HoneyPot_Logo_NOBG_Centered.png'))
+
+	# Register scenes
+	scene_manager.set(scene_manager.MENU_SCENE, MenuScene())
+	scene_manager.set(scene_manager.GAME_SCENE, GameScene())
+
+	# Scores are saved in json files, or in a single database with --database[=path]
+	database = get_option("--database")
+	if database is not None:
+		providers.LeaderboardProvider.use_database(ScoreDatabase(database or Leaderboard.get_save_directory() + "leaderboards.db"))
+	challenge_manager.init_challenges()
+	# Boards are shared with the other kiosks of an event with --sync=host[:port]
+	server = get_option("--sync")
+	if server:
+		host, _, port = server.partition(":")
+		providers.LeaderboardProvider.use_sync(SyncClient(host, int(port) if port else DEFAULT_PORT))
+	if "--asset-report" in sys.argv:
+		for file_name, duration in providers.LeaderboardProvider.get_load_times().items():
+			print(f"{1000 * duration:8.2f} ms  leaderboard/{file_name}")
+
+	scene_manager.set_active_scene(scene_manager.MENU_SCENE)
+
+	# Register event handlers
+	EventHandlers.set(pygame.QUIT, lambda _: AppState.stop())
+	EventHandlers.set(pygame.MOUSEMOTION, lambda ev: scene_manager.set_cursor(ev.pos))
+	EventHandlers.set(pygame.MOUSEBUTTONDOWN, lambda ev: scene_manager.handle_click(ev.pos, ev.button))
+	EventHandlers.set(pygame.MOUSEBUTTONUP, lambda ev: scene_manager.handle_release(ev.button))
+	EventHandlers.set(pygame.KEYDOWN, handle_key)
+
+	# Register main screen shader
+	providers.ShaderProvider.set("glitch", GlitchShader(vectorized="--numpy-glitch" in sys.argv))
+	# Frame timings overlay, toggled with F3
+	providers.ShaderProvider.set("frame_stats", FrameStatsOverlay(AppState.get_frame_timings()))
+	if "--frame-stats" not in sys.argv:
+		providers.ShaderProvider.disable("frame_stats")
+
+
+def handle_key(event: pygame.event.Event):
+	if event.key == pygame.K_F3:
+		toggle_frame_stats()
+	else:
+		scene_manager.type(event.unicode)
+
+
+def toggle_frame_stats():
+	if providers.ShaderProvider.is_enabled("frame_stats"):
+		providers.ShaderProvider.disable("frame_stats")
+	else:
+		providers.ShaderProvider.enable("frame_stats")
+
+
+def run_frame(screen: pygame.Surface, dt: float, now: Union[float, None] = None) -> list[float]:
+	"""
+	Runs a single iteration of the main loop
+	:param dt: Time elapsed since the previous frame, in seconds
+	:param now: Time given to shaders, the current time if None
+	:return: Time spent in each of the PHASES, in seconds
+	"""
+	timestamps = [time.perf_counter()]
+	frame_start = time.time() if now is None else now
+	for received, event in InputEvents.poll().drain():
+		if event.type in PLAYER_INPUT:
+			AppState.set_input_time(received)
 		EventHandlers.get(event.type, lambda _: None)(event)
-	scene_manager.get_current_scene().update(elapsed / 1000)
-	scene_manager.get_current_scene().draw(screen)
-	for shader in providers.ShaderProvider.get_all().values():
-		shader(screen, frame_start)
-	pygame.display.update()
+	providers.LeaderboardProvider.merge_remote()
+	timestamps.append(time.perf_counter())
+	scene_manager.get_current_scene().update(dt)
+	timestamps.append(time.perf_counter())
+	damage = scene_manager.get_current_scene().draw(screen)
+	timestamps.append(time.perf_counter())
+	shaded = providers.ShaderProvider.run(screen, frame_start)
+	# Regions drawn on by shaders are presented now and repainted next frame, whole frames being repainted anyway otherwise
+	if C.DIRTY_RECT_RENDERING:
+		scene_manager.get_current_scene().invalidate(shaded)
+	timestamps.append(time.perf_counter())
+	if shaded is None:
+		pygame.display.update()
+	else:
+		pygame.display.update(damage + shaded)
+	timestamps.append(time.perf_counter())
+	AppState.notify_present(timestamps[-1])
+	if scene_manager.get_current_scene() is not None:
+		AppState.set_frame_policy(scene_manager.get_current_scene().get_frame_policy())
 	C.FRAME_ID += 1
-	elapsed = clock.tick(AppState.get_target_frame_rate())
-	AppState.register_frame_time(1000 / elapsed)
+	return [end - start for start, end in zip(timestamps, timestamps[1:])]
+
+
+def main():
+	screen = init_display()
+	load_assets(screen)
+	init_game()
+
+	clock = pygame.time.Clock()
+	elapsed = .0
+	while AppState.is_running() and scene_manager.get_current_scene() is not None:
+		frame_start = time.perf_counter()
+		times = run_frame(screen, elapsed / 1000)
+		# Input keeps being collected until the next frame, so it is timestamped when it happened rather than when handled
+		# Clicks and keys are handled right away, moving the mouse only ends an idle frame early so that it doesn't drive the frame rate
+		wake_on = PLAYER_INPUT if AppState.is_idle() else PLAYER_INPUT - {pygame.MOUSEMOTION}
+		InputEvents.wait(frame_start + 1 / AppState.get_target_frame_rate(), AppState.get_frame_policy().is_busy_loop(), wake_on)
+		elapsed = clock.tick()
+		AppState.register_frame_time(times, elapsed / 1000)
+	# Scores are written in the background, don't leave any behind
+	providers.LeaderboardProvider.close_all()
+
+
+if __name__ == '__main__':
+	main()
@@ -5,7 +5,7 @@ a = Analysis(
     ['HackersBenchmark.py'],
     pathex=[],
     binaries=[],
-    datas=[('resources/sprites/*.png', 'resources/sprites'), ('resources/sprites/Challenges/*.png', 'resources/sprites/Challenges'), ('resources/fonts/*', 'resources/fonts'), ('resources/files/*', 'resources/files')],
+    datas=[('resources/assets.pack', 'resources'), ('resources/manifest.json', 'resources')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -25,21 +25,18 @@ splash = Splash(
     always_on_top=True,
 )
 
+# One-dir build: the asset archive is memory-mapped where it lies, rather than extracted to a temporary folder at every launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     splash,
-    splash.binaries,
     [],
+    exclude_binaries=True,
     name='HackersBenchmark',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -48,3 +45,13 @@ exe = EXE(
     entitlements_file=None,
     icon=['Honeypot.ico'],
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    splash.binaries,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='HackersBenchmark',
+)
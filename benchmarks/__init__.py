@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+from typing import Callable, Any
+
+
+def init_headless(size: tuple[int, int] = (1920, 1080)):
+	"""
+	Creates a display on SDL's dummy video driver so benchmarks can run without a screen
+	"""
+	os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+	os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+	sys.path.insert(0, os.getcwd())
+
+	import contextlib
+	with contextlib.redirect_stdout(None):
+		import pygame
+
+	from utils import C
+	pygame.init()
+	C.DISPLAY_SIZE = size
+	C.DISPLAY_RECT = pygame.Rect((0, 0), size)
+	screen = pygame.display.set_mode(size)
+
+	import providers
+	providers.init()
+	return screen
+
+
+def measure(function: Callable[[], Any], iterations: int) -> float:
+	"""
+	:return: Average duration of a call, in milliseconds
+	"""
+	start = time.perf_counter()
+	for _ in range(iterations):
+		function()
+	return 1000 * (time.perf_counter() - start) / iterations
@@ -0,0 +1,119 @@
+"""
+Compares loading every asset of the manifest from loose files (decoding PNGs) and from the packed archive,
+sprites being converted to the display format in both cases.
+Cold loads each run in a fresh process, once the files read were evicted from the OS cache with posix_fadvise, other files being left cached.
+Where it isn't available (e.g. Windows), cold loads are reported as unavailable
+
+Usage: python -m benchmarks.asset_archive
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import init_headless
+
+RUNS = 5
+COLD_RUNS = 3
+
+
+def load_loose(manifest) -> float:
+	import pygame
+	from providers import to_display_format, read_file
+	start = time.perf_counter()
+	for name in manifest.sprites:
+		to_display_format(pygame.image.load("resources/sprites/" + name))
+	for name in manifest.fonts:
+		with open("resources/fonts/" + name, 'rb') as f:
+			f.read()
+	for name in manifest.files:
+		read_file("resources/files/" + name)
+	return time.perf_counter() - start
+
+
+def load_archive(manifest, path: str) -> float:
+	from providers import to_display_format
+	from providers.Archive import AssetArchive
+	start = time.perf_counter()
+	archive = AssetArchive(path)
+	for name in manifest.sprites:
+		to_display_format(archive.get_sprite(name))
+	for name in manifest.fonts:
+		archive.get_font_data(name)
+	for name in manifest.files:
+		archive.get_file(name)
+	elapsed = time.perf_counter() - start
+	archive.close()
+	return elapsed
+
+
+def evict(paths: list[str]) -> bool:
+	"""
+	Removes files from the OS cache, so that the next read comes from the disk
+	:return: Whether it could be done
+	"""
+	if not hasattr(os, "posix_fadvise"):
+		return False
+	for path in paths:
+		fd = os.open(path, os.O_RDONLY)
+		try:
+			os.fsync(fd)  # Dirty pages can't be evicted
+			os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+		finally:
+			os.close(fd)
+	return True
+
+
+def loose_paths(manifest) -> list[str]:
+	return ["resources/sprites/" + name for name in manifest.sprites] + ["resources/fonts/" + name for name in manifest.fonts] + ["resources/files/" + name for name in manifest.files]
+
+
+def cold_load(kind: str, path: str) -> float:
+	"""
+	:return: Time spent loading assets from a fresh process with nothing cached, in seconds, NaN if files can't be evicted
+	"""
+	output = subprocess.run([sys.executable, "-m", "benchmarks.asset_archive", "--cold", kind, "--path", path], capture_output=True, text=True, check=True).stdout
+	return float(output.strip().splitlines()[-1])
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--cold", choices=("loose", "archive"), help=argparse.SUPPRESS)
+	parser.add_argument("--path", help=argparse.SUPPRESS)
+	args = parser.parse_args()
+	path = os.path.abspath(args.path) if args.path else None
+
+	init_headless()
+	from providers.Preloader import AssetManifest
+	manifest = AssetManifest.load()
+
+	if args.cold is not None:
+		# Child process: evicted files then loaded once
+		if not evict(loose_paths(manifest) if args.cold == "loose" else [path]):
+			print(float("nan"))
+			return
+		print(load_loose(manifest) if args.cold == "loose" else load_archive(manifest, path))
+		return
+
+	from providers.Archive import AssetArchive
+	with tempfile.TemporaryDirectory() as directory:
+		# Packed ahead of any measure, the cold runs evicting it from the cache it was written through
+		path = os.path.join(directory, "assets.pack")
+		AssetArchive.pack(manifest.sprites, manifest.fonts, manifest.files, path)
+		cold_loose = [cold_load("loose", path) for _ in range(COLD_RUNS)]
+		cold_packed = [cold_load("archive", path) for _ in range(COLD_RUNS)]
+		loose = [load_loose(manifest) for _ in range(RUNS)]
+		packed = [load_archive(manifest, path) for _ in range(RUNS)]
+		size = os.path.getsize(path)
+
+	print(f"Loading {len(manifest.get_assets())} assets, cold: fresh process with files evicted from the OS cache ({COLD_RUNS} runs), warm: files cached ({RUNS} runs)")
+	print(f"{'':<14}{'cold (ms)':>12}{'warm (ms)':>12}")
+	print(f"{'loose files':<14}{1000 * min(cold_loose):>12.1f}{1000 * min(loose):>12.1f}")
+	print(f"{'archive':<14}{1000 * min(cold_packed):>12.1f}{1000 * min(packed):>12.1f}")
+	print(f"Archive size: {size / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,50 @@
+"""
+Compares the menu's binary rain drawn as one element per column and as a single particle element
+
+Usage: python -m benchmarks.binary_rain
+"""
+from benchmarks import init_headless, measure
+
+screen = init_headless()
+
+import random
+
+from elements.Attributes import FontSettings
+from elements.Elements import BinaryDropText, BinaryRain
+from providers import ColorProvider
+
+COLUMN_COUNTS = 50, 500, 1000, 2000, 5000
+LEGACY_MAX_COLUMNS = 500  # One element per column gets too slow to measure past this
+ITERATIONS = 120
+SEED = 42
+
+
+def font() -> FontSettings:
+	return FontSettings("resources/fonts/Code.ttf", 30, ColorProvider.get("fg"))
+
+
+def frame(elements: list, blit: bool = True) -> float:
+	def step():
+		screen.fill(ColorProvider.get("bg"))
+		for element in elements:
+			element.tick(1 / 60)
+			if blit:
+				element.draw(screen)
+			else:
+				element.compose()
+	for _ in range(60):  # Let columns fall on screen first
+		step()
+	return measure(step, ITERATIONS)
+
+
+def main():
+	random.seed(SEED)
+	print(f"{'columns':<10}{'drop texts (ms)':>18}{'rain (ms)':>12}{'rain without blits (ms)':>26}")
+	for count in COLUMN_COUNTS:
+		legacy = frame([BinaryDropText(font()) for _ in range(count)]) if count <= LEGACY_MAX_COLUMNS else None
+		rain = BinaryRain(font(), column_count=count, seed=SEED)
+		print(f"{count:<10}{'-' if legacy is None else f'{legacy:.3f}':>18}{frame([rain]):>12.3f}{frame([rain], False):>26.3f}")
+
+
+if __name__ == '__main__':
+	main()
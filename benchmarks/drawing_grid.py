@@ -0,0 +1,46 @@
+"""
+Compares the per-cell drawing grid with the compact one, hovering and clicking across the grid every frame
+
+Usage: python -m benchmarks.drawing_grid
+"""
+from benchmarks import init_headless, measure
+
+screen = init_headless()
+
+import pygame
+
+from elements.Elements import DrawingGrid, CompactDrawingGrid
+from scene import Scene
+
+pygame.mouse.set_cursor = lambda *_: None  # Not supported by the dummy video driver
+GRID_SIZES = 4, 16, 32
+ITERATIONS = 120
+
+
+def frame(grid_type: type, size: int) -> float:
+	scene = Scene()
+	grid = grid_type((size, size))
+	grid.set_anchor("center").set_relative_pos((0.5, 0.5)).set_relative_height(0.8)
+	scene.add_element(grid)
+	positions = [(grid.left + (i % size + 0.5) * grid.width / size, grid.top + (i // size % size + 0.5) * grid.height / size) for i in range(size * size)]
+	state = {"frame": 0}
+
+	def step():
+		pos = positions[state["frame"] % len(positions)]
+		state["frame"] += 1
+		scene.set_cursor(pos)
+		scene.handle_click(pos, pygame.BUTTON_LEFT)
+		scene.handle_release(pygame.BUTTON_LEFT)
+		scene.update(1 / 60)
+		scene.draw(screen)
+	return measure(step, ITERATIONS)
+
+
+def main():
+	print(f"{'grid':<8}{'cells (ms)':>12}{'compact (ms)':>14}")
+	for size in GRID_SIZES:
+		print(f"{f'{size}x{size}':<8}{frame(DrawingGrid, size):>12.3f}{frame(CompactDrawingGrid, size):>14.3f}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,40 @@
+"""
+Compares the blit-based and NumPy implementations of the glitch shader
+
+Usage: python -m benchmarks.glitch_shader
+"""
+from benchmarks import init_headless, measure
+
+init_headless((640, 480))
+
+import numpy as np
+import pygame
+
+from shaders import GlitchShader
+
+RESOLUTIONS = {"1080p": (1920, 1080), "4K": (3840, 2160)}
+ITERATIONS = 300
+SEED = 42
+
+
+def make_screen(size: tuple[int, int]) -> pygame.Surface:
+	screen = pygame.Surface(size, 0, pygame.display.get_surface())
+	pygame.surfarray.blit_array(screen, np.random.default_rng(SEED).integers(0, 255, (size[0], size[1], 3)))
+	return screen
+
+
+def main():
+	print(f"{'':<8}{'blits (ms)':>12}{'numpy (ms)':>12}{'speedup':>10}{'idle check (us)':>18}")
+	for name, size in RESOLUTIONS.items():
+		screen = make_screen(size)
+		results = []
+		for vectorized in (False, True):
+			shader = GlitchShader(SEED, vectorized)
+			results.append(measure(lambda: shader.apply(screen), ITERATIONS))
+		idle = GlitchShader(SEED)
+		idle_time = measure(lambda: idle.is_active(0), ITERATIONS * 100)
+		print(f"{name:<8}{results[0]:>12.3f}{results[1]:>12.3f}{results[0] / results[1]:>9.2f}x{1000 * idle_time:>18.3f}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,60 @@
+"""
+Compares the default text backend with the glyph atlas on a running timer and while typing in a text area
+
+Usage: python -m benchmarks.glyph_atlas
+"""
+import time
+
+from benchmarks import init_headless
+
+init_headless()
+
+from elements.Attributes import FontSettings
+from elements.Elements import Timer, TextArea
+from providers import ColorProvider, TextSurfaceCache
+
+ITERATIONS = 600
+
+
+def measure_render(element, update, iterations: int) -> float:
+	"""
+	:return: Average duration of the element's render call after each update, in milliseconds
+	"""
+	total = 0.
+	for _ in range(iterations):
+		update()
+		start = time.perf_counter()
+		element.render()
+		total += time.perf_counter() - start
+	return 1000 * total / iterations
+PATTERN = "Le cache est bien plus qu'un simple raccourci ; c'est un outil qui rend chaque image moins chere a dessiner. " * 3
+
+
+def timer_frame(glyph_atlas: bool) -> float:
+	timer = Timer(FontSettings("resources/fonts/Code.ttf", 65, ColorProvider.get('fg')).set_glyph_atlas(glyph_atlas), clock=0, limit=[0, 5 * 60]).start()
+
+	return measure_render(timer, lambda: timer.tick(1 / 60), ITERATIONS)
+
+
+def text_area_frame(glyph_atlas: bool) -> float:
+	text_area = TextArea(FontSettings("resources/fonts/ArialMonoMTProRegular.TTF", 22, ColorProvider.get('fg')).set_glyph_atlas(glyph_atlas))
+	text_area.set_max_width(1200).set_pattern(PATTERN)
+
+	def update():
+		text_area.on_type(text_area.get_next_character() or "")
+		text_area.tick(1 / 60)
+	return measure_render(text_area, update, min(ITERATIONS, len(PATTERN)))
+
+
+def main():
+	print(f"Render time per frame\n{'':<12}{'default (ms)':>14}{'glyph atlas (ms)':>18}")
+	for name, frame in (("timer", timer_frame), ("text area", text_area_frame)):
+		results = []
+		for glyph_atlas in (False, True):
+			TextSurfaceCache.clear()
+			results.append(frame(glyph_atlas))
+		print(f"{name:<12}{results[0]:>14.3f}{results[1]:>18.3f}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,197 @@
+"""
+Measures the leaderboard queries done on every result screen (improvement check, submission, rank, top 10) against the amount of players,
+compared with the previous list-based leaderboard. Boards are kept in memory, saving to disk is left out.
+Then measures loading saved boards, compared with replaying every saved score as a submission,
+and the time a submission holds the frame loop to be saved, in a journal or a database, compared with rewriting the whole board
+
+Usage: python -m benchmarks.leaderboard
+"""
+import contextlib
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import measure
+from utils.database import ScoreDatabase
+from utils.journal import ScoreJournal
+from utils.leaderboard import Leaderboard, LeaderboardEntry, LeaderboardRegistry
+
+PLAYERS = (1000, 10000, 100000)
+QUERIES = 200
+REPLAY_MAX_PLAYERS = 1000  # Replaying rewrites the file on every score, too slow beyond that
+SAVES = 20
+
+
+class MemoryJournal(ScoreJournal):
+
+	def append(self, name: str, score: float, improved: bool = True):
+		pass
+
+	def compact(self):
+		pass
+
+
+class MemoryLeaderboard(Leaderboard):
+
+	def __init__(self, file_name: str, descending: bool = True):
+		super().__init__(file_name, descending)
+		self.store = MemoryJournal(self.get_save_path(), descending)
+
+
+class ListLeaderboard(MemoryLeaderboard):
+	"""
+	Leaderboard as it was before being indexed: a list scanned by name and sorted again on every submission
+	"""
+
+	def __init__(self, file_name: str, descending: bool = True):
+		super().__init__(file_name, descending)
+		self.scores: list[LeaderboardEntry] = []
+
+	def get_prev_entry(self, name: str):
+		for prev in self.scores:
+			if prev.get_name().lower() == name.lower():
+				return prev
+		return None
+
+	def add_score(self, entry: LeaderboardEntry):
+		if not self.improves(entry):
+			return
+		prev = self.get_prev_entry(entry.get_name())
+		if prev is not None:
+			self.scores.remove(prev)
+		self.scores.append(entry)
+		self.scores.sort(key=lambda _e: _e.get_score(), reverse=self.descending)
+
+	def get_rank(self, player: str) -> int:
+		player = player.lower()
+		for rank, entry in enumerate(self.scores):
+			if entry.get_name().lower() == player:
+				return rank + 1
+		return -1
+
+	def get_top(self, max_entries: int = 10):
+		return self.scores[:max_entries]
+
+
+def fill(board: Leaderboard, players: int) -> Leaderboard:
+	entries = [LeaderboardEntry(f"player{i}", random.uniform(0, 1000)) for i in range(players)]
+	if isinstance(board, ListLeaderboard):
+		board.scores = sorted(entries, key=lambda _e: _e.get_score(), reverse=board.descending)
+	else:
+		board.scores.update(entries)
+		board.players = {board.normalize(entry.get_name()): entry for entry in entries}
+	return board
+
+
+def result_screen(board: Leaderboard, players: int):
+	"""
+	Queries of Challenge.submit_score and GameScene.end_challenge for a random returning player
+	"""
+	name = f"Player{random.randrange(players)}"
+	entry = LeaderboardEntry(name, random.uniform(0, 1100))
+	if board.improves(entry):
+		board.add_score(entry)
+	board.get_rank(name)
+	board.get_prev_entry(name)
+	board.get_top(10)
+
+
+def rewrite(board: Leaderboard):
+	"""
+	Saves a board the way it was before journaling: the whole board rewritten in place
+	"""
+	with open(board.get_save_path(), 'w') as f:
+		f.write(json.dumps({entry.get_name(): entry.get_score() for entry in board.scores}, indent=4))
+
+
+def replay(file_name: str) -> Leaderboard:
+	"""
+	Loads a board the way it was before bulk loading: every saved score submitted in turn, saving each time
+	"""
+	board = ListLeaderboard(file_name)
+	with open(board.get_save_path(), 'r') as f:
+		for name, score in json.loads(f.read()).items():
+			if board.improves(LeaderboardEntry(name, score)):
+				board.add_score(LeaderboardEntry(name, score))
+				rewrite(board)
+	return board
+
+
+def load(players: int) -> tuple[float, float]:
+	"""
+	:return: Time spent replaying and bulk loading a saved board, in milliseconds, replay is NaN for large boards
+	"""
+	with contextlib.redirect_stdout(None):
+		board = fill(MemoryLeaderboard(f"load_{players}"), players)
+		rewrite(board)
+		start = time.perf_counter()
+		bulk = Leaderboard(board.file_name)
+		elapsed = 1000 * (time.perf_counter() - start)
+		assert bulk.get_size() == players
+		if players > REPLAY_MAX_PLAYERS:
+			return float("nan"), elapsed
+		start = time.perf_counter()
+		replay(board.file_name)
+		return 1000 * (time.perf_counter() - start), elapsed
+
+
+def save(players: int) -> tuple[float, float, float, float, float]:
+	"""
+	:return: Time a submission holds the caller when rewriting the board, when journaling it and when adding it to a database,
+	then until the journal and the database are on disk, in milliseconds
+	"""
+	with contextlib.redirect_stdout(None):
+		board = fill(MemoryLeaderboard(f"save_{players}"), players)
+		rewrite(board)
+		journaled = Leaderboard(board.file_name)
+		registry = LeaderboardRegistry().use_database(ScoreDatabase(Leaderboard.get_save_directory() + f"save_{players}.db"))
+		stored = registry.get_board(board.file_name)
+	submissions = iter(range(5 * SAVES))
+
+	def submit(_board: Leaderboard):
+		# Always an improvement, so that it is saved
+		_board.add_score(LeaderboardEntry(f"player{next(submissions)}", 2000))
+
+	rewritten = measure(lambda: (submit(board), rewrite(board)), SAVES)
+	queued = measure(lambda: submit(journaled), SAVES)
+	durable = measure(lambda: (submit(journaled), journaled.store.flush()), SAVES)
+	journaled.close()
+	stored_queued = measure(lambda: submit(stored), SAVES)
+	stored_durable = measure(lambda: (submit(stored), stored.store.flush()), SAVES)
+	registry.close_all()
+	return rewritten, queued, stored_queued, durable, stored_durable
+
+
+def main():
+	# Leaderboards are created on the user's desktop, keep them out of it
+	profile = tempfile.TemporaryDirectory()
+	os.environ["USERPROFILE"] = profile.name
+
+	print(f"Time per result screen\n{'players':<10}{'list (ms)':>12}{'indexed (ms)':>14}")
+	for players in PLAYERS:
+		random.seed(players)
+		with contextlib.redirect_stdout(None):
+			boards = fill(ListLeaderboard("bench"), players), fill(MemoryLeaderboard("bench"), players)
+		results = [measure(lambda: result_screen(board, players), QUERIES) for board in boards]
+		print(f"{players:<10}{results[0]:>12.3f}{results[1]:>14.4f}")
+
+	print(f"\nTime to load a saved board\n{'players':<10}{'replay (ms)':>12}{'bulk (ms)':>14}")
+	for players in PLAYERS:
+		random.seed(players)
+		results = load(players)
+		print(f"{players:<10}{results[0]:>12.1f}{results[1]:>14.1f}")
+
+	print("\nTime to save a submission: time the caller is held, then time until the score is on disk (rewriting holds the caller until then)")
+	print(f"{'':<10}{'held by the caller (ms)':^36}{'until on disk (ms)':^26}")
+	print(f"{'players':<10}{'rewrite':>12}{'journal':>12}{'database':>12}{'journal':>13}{'database':>13}")
+	for players in PLAYERS:
+		random.seed(players)
+		results = save(players)
+		print(f"{players:<10}{results[0]:>12.2f}{results[1]:>12.3f}{results[2]:>12.3f}{results[3]:>13.2f}{results[4]:>13.2f}")
+	profile.cleanup()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,304 @@
+"""
+Plays scripted sessions of the game headlessly (menu, challenge browsing, typing, aim and sequence challenges),
+recording the time spent in each phase of every frame and the peak memory, and writes them as a JSON report.
+Comparing against a previous report flags regressions, exiting with status 1 if any
+
+Usage: python -m benchmarks.scripted [--output report.json] [--compare baseline.json] [--tolerance 0.2]
+                                     [--size 1280x720] [--seed 0] [--sequence-length 5] [--dirty-rects] [--numpy-glitch]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+from typing import Callable, Generator, Union
+
+import numpy as np
+
+from benchmarks import init_headless
+
+Scenario = Generator[None, None, None]
+
+FRAME_TIME = 1 / 60  # Simulated time between frames, in seconds
+MAX_WAIT_FRAMES = 1200
+NICKNAME = "bench"
+ABSOLUTE_TOLERANCE_MS = 0.05  # Differences below this are noise, whatever the relative tolerance
+
+
+def peak_memory() -> Union[int, None]:
+	"""
+	:return: Peak resident memory of the process in bytes, None if unknown on this platform
+	"""
+	try:
+		import resource
+		peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+		return peak if sys.platform == "darwin" else peak * 1024
+	except ImportError:
+		pass
+	try:
+		import ctypes
+		from ctypes import wintypes
+
+		class ProcessMemoryCounters(ctypes.Structure):
+			_fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [(name, ctypes.c_size_t) for name in (
+				"PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+				"QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage"
+			)]
+
+		counters = ProcessMemoryCounters()
+		counters.cb = ctypes.sizeof(counters)
+		if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+			return counters.PeakWorkingSetSize
+	except (ImportError, AttributeError, OSError):
+		pass
+	return None
+
+
+class ScriptedSession:
+	"""
+	Runs scenarios against the game's main loop, posting input events as a player would
+	"""
+
+	def __init__(self, screen, sequence_length: int):
+		import HackersBenchmark
+		from game import challenge_manager
+		from scene import scene_manager
+
+		self._game = HackersBenchmark
+		self._screen = screen
+		self._sequence_length = sequence_length
+		self.challenges = challenge_manager
+		self.scenes = scene_manager
+		self.timings: dict[str, list[list[float]]] = {}
+		self._frame = 0
+		self.memory: dict[str, Union[int, None]] = {}
+
+	@property
+	def game_scene(self):
+		return self.scenes.get(self.scenes.GAME_SCENE)
+
+	def run(self, name: str, scenario: Callable[[], Scenario]):
+		frames = self.timings.setdefault(name, [])
+		for _ in scenario():
+			# Shaders are driven by simulated time too, so that glitches happen on the same frames every run
+			self._frame += 1
+			frames.append(self._game.run_frame(self._screen, FRAME_TIME, self._frame * FRAME_TIME))
+		self.memory[name] = peak_memory()
+
+	# Input helpers
+
+	@staticmethod
+	def click(pos: tuple[int, int]):
+		import pygame
+		pos = int(pos[0]), int(pos[1])
+		pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+		pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=pygame.BUTTON_LEFT))
+		pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=pygame.BUTTON_LEFT))
+
+	@staticmethod
+	def press(text: str):
+		import pygame
+		for letter in text:
+			pygame.event.post(pygame.event.Event(pygame.KEYDOWN, unicode=letter, key=0, mod=0))
+
+	@staticmethod
+	def wait(frames: int) -> Scenario:
+		for _ in range(frames):
+			yield
+
+	@staticmethod
+	def wait_until(condition: Callable[[], bool]) -> Scenario:
+		for _ in range(MAX_WAIT_FRAMES):
+			if condition():
+				return
+			yield
+		raise RuntimeError("Scripted session stuck, condition never met")
+
+	def is_shown(self, element) -> bool:
+		# Elements are rects, compare them by identity rather than by position
+		return any(shown is element for shown in self.scenes.get_current_scene().get_elements())
+
+	# Scenarios
+
+	def menu(self) -> Scenario:
+		menu = self.scenes.get(self.scenes.MENU_SCENE)
+		yield from self.wait(120)
+		self.click(menu.start_btn.center)
+		yield from self.wait_until(lambda: self.scenes.get_current_scene() is self.game_scene)
+
+	def browse(self) -> Scenario:
+		for _ in range(self.challenges.get_challenge_count() + 1):
+			self.click(self.game_scene.next_chall_btn.center)
+			yield from self.wait(30)
+
+	def start_challenge(self, index: int) -> Scenario:
+		scene = self.game_scene
+		scene.current_challenge = index
+		scene.display_current_challenge()
+		yield
+		self.click(scene.start_chall_btn.center)
+		yield from self.wait_until(lambda: self.is_shown(scene.username_input))
+		self.press(NICKNAME)
+		yield from self.wait_until(lambda: self.is_shown(scene.start_chall_btn))
+		self.click(scene.start_chall_btn.center)
+		yield from self.wait_until(lambda: not self.is_shown(scene.username_input))
+
+	def close_results(self) -> Scenario:
+		from game import Challenge
+		yield from self.wait(60)
+		self.click(Challenge.get_close_button().center)
+		yield from self.wait_until(lambda: self.is_shown(self.game_scene.start_chall_btn))
+
+	def typing(self) -> Scenario:
+		yield from self.start_challenge(0)
+		text_area = self.challenges.get_challenge(0).text_area
+		while not text_area.is_complete():
+			self.press(text_area.get_next_character())
+			yield
+		yield from self.close_results()
+
+	def aim(self) -> Scenario:
+		yield from self.start_challenge(1)
+		bug = self.challenges.get_challenge(1).bug
+		while self.is_shown(bug):
+			self.click(bug.center)
+			yield from self.wait(3)
+		yield from self.close_results()
+
+	def sequence(self) -> Scenario:
+		yield from self.start_challenge(4)
+		challenge = self.challenges.get_challenge(4)
+		grid = challenge.grid
+
+		def cell_center(cell: tuple[int, int]) -> tuple[int, int]:
+			return grid.get_cell_rect(grid.get_cell_index(cell)).move(grid.topleft).center
+
+		self.click(grid.center)  # Starts the sequence
+		while self.is_shown(grid):
+			yield
+			busy = any(grid.get_animation(name).is_running() for name in ("blink", "show_play", "play_sequence"))
+			if not grid.is_enabled() or busy or challenge.played >= len(challenge.sequence):
+				continue
+			x, y = challenge.sequence[challenge.played]
+			if len(challenge.sequence) > self._sequence_length:
+				x = (x + 1) % challenge.GRID_SIZE  # Fail on purpose once long enough
+			self.click(cell_center((x, y)))
+		yield from self.close_results()
+
+
+def summarize(frames: list[list[float]]) -> dict[str, dict[str, float]]:
+	from HackersBenchmark import PHASES
+	times = 1000 * np.array(frames)
+	columns = {phase: times[:, i] for i, phase in enumerate(PHASES)}
+	columns["frame"] = times.sum(axis=1)
+	return {
+		name: {
+			"mean": float(values.mean()),
+			"p50": float(np.percentile(values, 50)),
+			"p95": float(np.percentile(values, 95)),
+			"max": float(values.max())
+		} for name, values in columns.items()
+	}
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+	"""
+	:return: Description of every metric worse than the baseline by more than the tolerance
+	"""
+	regressions = []
+	for name, scenario in report["scenarios"].items():
+		base = baseline["scenarios"].get(name)
+		if base is None:
+			continue
+		for phase, stats in scenario["ms"].items():
+			for stat in ("p50", "p95"):
+				current, previous = stats[stat], base["ms"].get(phase, {}).get(stat)
+				if previous is not None and current > previous * (1 + tolerance) and current - previous > ABSOLUTE_TOLERANCE_MS:
+					regressions.append(f"{name:<10} {phase:<8} {stat}: {previous:8.3f} -> {current:8.3f} ms ({100 * (current / previous - 1):+.0f}%)")
+		current, previous = scenario["peak_memory"], base.get("peak_memory")
+		if current is not None and previous is not None and current > previous * (1 + tolerance):
+			regressions.append(f"{name:<10} peak memory: {previous / 2 ** 20:.1f} -> {current / 2 ** 20:.1f} MB")
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Headless scripted benchmark of the whole game")
+	parser.add_argument("--output", help="Path of the JSON report to write")
+	parser.add_argument("--compare", help="Report to compare against, regressions make the command fail")
+	parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown tolerated when comparing (default 0.2)")
+	parser.add_argument("--size", default="1280x720", help="Display size (default 1280x720)")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--sequence-length", type=int, default=5, help="Length reached in the sequence challenge")
+	parser.add_argument("--dirty-rects", action="store_true", help="Render with dirty rectangles")
+	parser.add_argument("--numpy-glitch", action="store_true", help="Use the vectorized glitch shader")
+	args = parser.parse_args()
+	# Resolved before init_headless moves to the project's root
+	output, baseline = (None if path is None else os.path.abspath(path) for path in (args.output, args.compare))
+
+	# Leaderboards are written to the user's desktop, keep them out of it
+	profile = tempfile.TemporaryDirectory()
+	os.environ["USERPROFILE"] = profile.name
+	size = tuple(map(int, args.size.split("x")))
+	screen = init_headless(size)
+
+	import pygame
+	import random
+	import providers
+	from shaders import GlitchShader
+	from utils import C
+	pygame.mouse.set_cursor = lambda *_: None  # Not supported by the dummy video driver
+	C.DIRTY_RECT_RENDERING = args.dirty_rects
+	random.seed(args.seed)
+	np.random.seed(args.seed)
+
+	with contextlib.redirect_stdout(None):
+		import HackersBenchmark
+		HackersBenchmark.load_assets(screen)
+		HackersBenchmark.init_game()
+		providers.ShaderProvider.set("glitch", GlitchShader(seed=args.seed, vectorized=args.numpy_glitch), position=0)
+		session = ScriptedSession(screen, args.sequence_length)
+		for name in ("menu", "browse", "typing", "aim", "sequence"):
+			session.run(name, getattr(session, name))
+
+	report = {
+		"meta": {
+			"size": list(size),
+			"seed": args.seed,
+			"sequence_length": args.sequence_length,
+			"dirty_rects": args.dirty_rects,
+			"numpy_glitch": args.numpy_glitch,
+			"python": platform.python_version(),
+			"pygame": pygame.version.ver,
+			"platform": platform.platform()
+		},
+		"scenarios": {
+			name: {"frames": len(frames), "ms": summarize(frames), "peak_memory": session.memory[name]}
+			for name, frames in session.timings.items()
+		}
+	}
+	profile.cleanup()
+
+	print(f"{'scenario':<10}{'frames':>8}{'mean (ms)':>12}{'p95 (ms)':>12}{'max (ms)':>12}{'peak (MB)':>12}")
+	for name, scenario in report["scenarios"].items():
+		frame = scenario["ms"]["frame"]
+		memory = "?" if scenario["peak_memory"] is None else f"{scenario['peak_memory'] / 2 ** 20:.1f}"
+		print(f"{name:<10}{scenario['frames']:>8}{frame['mean']:>12.3f}{frame['p95']:>12.3f}{frame['max']:>12.3f}{memory:>12}")
+
+	if output is not None:
+		with open(output, 'w') as f:
+			f.write(json.dumps(report, indent=4))
+
+	if baseline is not None:
+		with open(baseline, 'r') as f:
+			regressions = compare(report, json.loads(f.read()), args.tolerance)
+		if len(regressions) > 0:
+			print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+			print("\n".join(regressions))
+			sys.exit(1)
+		print(f"\nNo regression against {args.compare}")
+
+
+if __name__ == '__main__':
+	main()
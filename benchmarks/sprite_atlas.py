@@ -0,0 +1,66 @@
+"""
+Compares SpriteAnimation.extract with the former per-frame subsurface copy
+
+Usage: python -m benchmarks.sprite_atlas
+"""
+from weakref import WeakSet
+
+from benchmarks import init_headless, measure
+
+screen = init_headless()
+
+import pygame
+
+from elements.Attributes import SpriteAnimation
+from providers import SpriteProvider
+
+FRAMES = 600
+SPRITES = 12
+
+
+def legacy_extract(animation: SpriteAnimation) -> pygame.Surface:
+	coords = animation.get_frame_coords()
+	frame_size = animation.get_frame_size()
+	sheet = animation.get_spritesheet()
+	offset = coords[0] * frame_size[0], coords[1] * frame_size[1]
+	frame_end = offset[0] + frame_size[0], offset[1] + frame_size[1]
+	clamp_factor = max(0, frame_end[0] - sheet.get_width()), max(0, frame_end[1] - sheet.get_height())
+	return sheet.subsurface(offset, (frame_size[0] - clamp_factor[0], frame_size[1] - clamp_factor[1])).copy()
+
+
+def run(extract) -> tuple[float, float, int]:
+	animations = [
+		SpriteAnimation(SpriteProvider.get("Btn_StartGame.png"), [20], [0.05], (600, 250)).set_mode(SpriteAnimation.MODE_CIRCULAR)
+		for _ in range(SPRITES)
+	]
+	seen, allocated = WeakSet(), 0
+
+	def extract_all():
+		nonlocal allocated
+		for animation in animations:
+			animation.tick(1 / 60)
+			surface = extract(animation)
+			if surface not in seen:  # Surfaces only stay in the set while something else holds them
+				seen.add(surface)
+				allocated += 1
+
+	def blit_all():
+		for animation in animations:
+			screen.blit(extract(animation), (0, 0))
+
+	extract_time = measure(extract_all, FRAMES)
+	blit_time = measure(blit_all, FRAMES)
+	return extract_time, blit_time, allocated
+
+
+def main():
+	legacy = run(legacy_extract)
+	atlas = run(SpriteAnimation.extract)
+	print(f"{SPRITES} sprites over {FRAMES} frames")
+	print(f"{'':<10}{'extract (ms/frame)':>20}{'extract+blit (ms/frame)':>26}{'surfaces allocated':>20}{'per frame':>12}")
+	for name, (extract_time, blit_time, allocated) in (("copy", legacy), ("atlas", atlas)):
+		print(f"{name:<10}{extract_time:>20.3f}{blit_time:>26.3f}{allocated:>20}{allocated / FRAMES:>12.2f}")
+
+
+if __name__ == '__main__':
+	main()
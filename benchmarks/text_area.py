@@ -0,0 +1,50 @@
+"""
+Measures the cost of a keystroke in a text area (typing, laying out and rendering the frame) against the statement length
+
+Usage: python -m benchmarks.text_area
+"""
+import time
+
+from benchmarks import init_headless
+
+init_headless()
+
+from elements.Attributes import FontSettings
+from elements.Elements import TextArea
+from providers import ColorProvider, TextSurfaceCache
+
+STATEMENT = "Le cache est bien plus qu'un simple raccourci ; c'est un outil qui rend chaque image moins chere a dessiner. "
+REPEATS = (1, 4, 16, 64)
+KEYSTROKES = 100
+
+
+def keystroke(repeats: int, glyph_atlas: bool) -> float:
+	"""
+	:return: Average duration of the last keystrokes of the statement, in milliseconds
+	"""
+	text_area = TextArea(FontSettings("resources/fonts/ArialMonoMTProRegular.TTF", 22, ColorProvider.get('fg')).set_glyph_atlas(glyph_atlas))
+	pattern = STATEMENT * repeats
+	text_area.set_max_width(1200).set_pattern(pattern)
+	for letter in pattern[:-KEYSTROKES]:
+		text_area.on_type(letter)
+	text_area.compose()
+
+	start = time.perf_counter()
+	for _ in range(KEYSTROKES):
+		text_area.on_type(text_area.get_next_character())
+		text_area.compose()
+	return 1000 * (time.perf_counter() - start) / KEYSTROKES
+
+
+def main():
+	print(f"Time per keystroke\n{'characters':<12}{'default (ms)':>14}{'glyph atlas (ms)':>18}")
+	for repeats in REPEATS:
+		results = []
+		for glyph_atlas in (False, True):
+			TextSurfaceCache.clear()
+			results.append(keystroke(repeats, glyph_atlas))
+		print(f"{len(STATEMENT) * repeats:<12}{results[0]:>14.3f}{results[1]:>18.3f}")
+
+
+if __name__ == '__main__':
+	main()
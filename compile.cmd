@@ -1 +1,2 @@
-pyinstaller -F HackersBenchmark.py --splash Honeypot_Logo_BG_Centered.jpg --noconsole -i Honeypot.ico --add-data resources/sprites/*.png:resources/sprites --add-data resources/sprites/Challenges/*.png:resources/sprites/Challenges --add-data resources/fonts/*:resources/fonts --add-data resources/files/*:resources/files
\ No newline at end of file
+python tools/pack_assets.py
+pyinstaller -D HackersBenchmark.py --splash Honeypot_Logo_BG_Centered.jpg --noconsole -i Honeypot.ico --add-data resources/assets.pack:resources --add-data resources/manifest.json:resources
\ No newline at end of file
@@ -1,9 +1,52 @@
 import math
-import os.path
+import string
 from typing import Callable, Any, Union, overload
 
 import pygame
 
+from providers import TextSurfaceCache, FontProvider, to_display_format
+from utils import bump_surface_version
+
+
+class SpriteAtlas:
+
+	_tables: dict[tuple, tuple[pygame.Surface, list[list[pygame.Surface]]]] = {}
+
+	@staticmethod
+	def slice(spritesheet: pygame.Surface, frame_count: list[int], frame_size: tuple[int, int]) -> list[list[pygame.Surface]]:
+		"""
+		:return: Frames of each row of the spritesheet, converted to the display pixel format
+		"""
+		spritesheet = to_display_format(spritesheet)
+		table = []
+		for row, count in enumerate(frame_count):
+			frames = []
+			for column in range(count):
+				offset = column * frame_size[0], row * frame_size[1]
+				size = max(0, min(frame_size[0], spritesheet.get_width() - offset[0])), max(0, min(frame_size[1], spritesheet.get_height() - offset[1]))
+				frames.append(spritesheet.subsurface(offset, size).copy())
+			table.append(frames)
+		return table
+
+	@staticmethod
+	def get(spritesheet: pygame.Surface, frame_count: list[int], frame_size: tuple[int, int]) -> Union[list[list[pygame.Surface]], None]:
+		"""
+		:return: The frame table shared by all animations using this spritesheet layout, None until the display is created
+		"""
+		key = id(spritesheet), tuple(frame_count), frame_size
+		entry = SpriteAtlas._tables.get(key)
+		if entry is not None and entry[0] is spritesheet:
+			return entry[1]
+		if pygame.display.get_surface() is None:
+			return None  # Conversion to the display format requires a display
+		entry = spritesheet, SpriteAtlas.slice(spritesheet, frame_count, frame_size)
+		SpriteAtlas._tables[key] = entry
+		return entry[1]
+
+	@staticmethod
+	def clear():
+		SpriteAtlas._tables.clear()
+
 
 class SpriteAnimation:
 
@@ -15,6 +58,7 @@ class SpriteAnimation:
 		self.frame_count = frame_count
 		self.frame_time = frame_time
 		self.frame_size = frame_size if frame_size is not None else (int(spritesheet.get_width() / frame_count[0]), int(spritesheet.get_height() / len(frame_count)))
+		self.frames: Union[list[list[pygame.Surface]], None] = None
 		self.forced_frame_id = None
 
 		self.animation_row = 0
@@ -77,8 +121,20 @@ class SpriteAnimation:
 			progress = self.animation_time / (self.frame_time[self.animation_row] * self.get_frame_count())
 			return int(self.get_frame_count() * (1 + math.sin(progress * math.pi / 2)) / 2), self.animation_row
 
+	def get_frames(self) -> Union[list[list[pygame.Surface]], None]:
+		if self.frames is None:
+			self.frames = SpriteAtlas.get(self.spritesheet, self.frame_count, self.frame_size)
+		return self.frames
+
 	def extract(self) -> pygame.Surface:
+		"""
+		:return: Current frame. It is shared with every animation using the same spritesheet and must not be drawn onto
+		"""
 		coords = self.get_frame_coords()
+		frames = self.get_frames()
+		if frames is not None:
+			row = frames[coords[1]]
+			return row[max(0, min(coords[0], len(row) - 1))]
 		offset = coords[0] * self.frame_size[0], coords[1] * self.frame_size[1]
 		frame_end = offset[0] + self.frame_size[0], offset[1] + self.frame_size[1]
 		clamp_factor = max(0, frame_end[0] - self.spritesheet.get_width()), max(0, frame_end[1] - self.spritesheet.get_height())
@@ -250,15 +306,22 @@ class PulseSettings:
 
 class FontSettings:
 
-	def __init__(self, font_path: str, font_size: int, color: pygame.Color):
+	MAX_MEASURED_WORDS = 4096  # Per font
+
+	_word_widths: dict[tuple[str, int, int, bool], dict[str, int]] = {}
+
+	def __init__(self, font_path: str, font_size: int, color: pygame.Color, style: int = 0):
+		"""
+		:param font_path: Font file, or the name of a system font if no such file exists
+		:param style: Combination of FontRegistry style flags
+		"""
 		self._font_path = font_path
 		self._font_size = font_size
-		if os.path.exists(font_path):
-			self._font = pygame.font.Font(font_path, font_size)
-		else:
-			self._font = pygame.font.SysFont(font_path, font_size)
+		self._font_style = style
+		self._font = FontProvider.get_font(font_path, font_size, style)
 		self._color = color
 		self._dirty = False
+		self._glyph_atlas = False
 
 	def get_font_path(self) -> str:
 		return self._font_path
@@ -266,11 +329,20 @@ class FontSettings:
 	def get_font_size(self) -> int:
 		return self._font_size
 
+	def get_font_style(self) -> int:
+		return self._font_style
+
 	def get_font(self) -> pygame.font.Font:
+		"""
+		:return: Font instance shared with other settings using the same font, which must not be altered
+		"""
 		return self._font
 
-	def set_font(self, font_path: str, font_size: int) -> 'FontSettings':
-		self._font = pygame.font.Font(font_path, font_size)
+	def set_font(self, font_path: str, font_size: int, style: int = 0) -> 'FontSettings':
+		self._font_path = font_path
+		self._font_size = font_size
+		self._font_style = style
+		self._font = FontProvider.get_font(font_path, font_size, style)
 		self._dirty = True
 		return self
 
@@ -281,17 +353,438 @@ class FontSettings:
 		self._color = color
 		return self
 
+	def uses_glyph_atlas(self) -> bool:
+		return self._glyph_atlas
+
+	def set_glyph_atlas(self, enabled: bool = True) -> 'FontSettings':
+		"""
+		Draws text glyph by glyph from an atlas rendered once per font and colour, placed at the font's advances: kerning and ligatures are dropped.
+		Meant for monospace fonts and digits, whose lines then only redraw from the first glyph that changed
+		"""
+		self._glyph_atlas = enabled
+		self._dirty = True
+		return self
+
+	def get_glyph_atlas(self) -> 'GlyphAtlas':
+		return GlyphAtlas.get(self)
+
 	def is_dirty(self) -> bool:
 		return self._dirty
 
 	def clear_dirty(self):
 		self._dirty = False
 
-	def render_line(self, line: str):
-		return self._font.render(line, True, self._color)
+	def measure(self, text: str) -> int:
+		"""
+		:return: Rendered width of the given text, memoized per font
+		"""
+		key = self._font_path, self._font_size, self._font_style, self._glyph_atlas
+		widths = FontSettings._word_widths.get(key)
+		if widths is None or len(widths) >= self.MAX_MEASURED_WORDS:
+			widths = FontSettings._word_widths[key] = {}
+		width = widths.get(text)
+		if width is None:
+			width = widths[text] = self.get_glyph_atlas().measure(text) if self._glyph_atlas else self._font.size(text)[0]
+		return width
+
+	def render_line(self, line: str, antialias: bool = True) -> pygame.Surface:
+		key = self._font_path, self._font_size, self._font_style, tuple(self._color), antialias, self._glyph_atlas, line
+		surface = TextSurfaceCache.get(key)
+		if surface is None:
+			surface = GlyphLine().update(GlyphAtlas.get(self, antialias), line) if self._glyph_atlas else self._font.render(line, antialias, self._color)
+			TextSurfaceCache.set(key, surface)
+		return surface
 
 	def copy(self) -> 'FontSettings':
-		return FontSettings(self._font_path, self._font_size, self._color)
+		return FontSettings(self._font_path, self._font_size, self._color, self._font_style).set_glyph_atlas(self._glyph_atlas)
+
+
+class GlyphAtlas:
+
+	PRELOADED = string.digits + string.ascii_letters + string.punctuation + " "
+
+	_atlases: dict[tuple, 'GlyphAtlas'] = {}
+
+	@staticmethod
+	def get(font: FontSettings, antialias: bool = True) -> 'GlyphAtlas':
+		"""
+		:return: The atlas shared by every text using this font, size and colour
+		"""
+		key = font.get_font_path(), font.get_font_size(), font.get_font_style(), tuple(font.get_color()), antialias
+		atlas = GlyphAtlas._atlases.get(key)
+		if atlas is None:
+			atlas = GlyphAtlas._atlases[key] = GlyphAtlas(font.get_font(), font.get_color(), antialias)
+		return atlas
+
+	@staticmethod
+	def clear():
+		GlyphAtlas._atlases.clear()
+
+	def __init__(self, font: pygame.font.Font, color: pygame.Color, antialias: bool = True):
+		self._font = font
+		self._color = pygame.Color(color)
+		self._antialias = antialias
+		self._glyphs: dict[str, tuple[pygame.Rect, int, int]] = {}
+		self._max_width = 0
+		self._tiled = True  # Whether every glyph fills exactly its advance, so that glyphs never overlap
+		self._surface = pygame.Surface((0, font.get_height()), pygame.SRCALPHA)
+		self.add(self.PRELOADED)
+
+	def get_font(self) -> pygame.font.Font:
+		return self._font
+
+	def get_surface(self) -> pygame.Surface:
+		return self._surface
+
+	def get_height(self) -> int:
+		return self._surface.get_height()
+
+	def is_tiled(self) -> bool:
+		"""
+		:return: Whether glyphs can be copied over one another, each overwriting exactly its cell
+		"""
+		return self._tiled
+
+	def get_max_width(self) -> int:
+		"""
+		:return: Width of the widest glyph, how far a glyph may reach from the pen
+		"""
+		return self._max_width
+
+	def add(self, chars: str):
+		"""
+		Rasterizes the given characters, the atlas surface is only grown when some were missing
+		"""
+		chars = [char for char in dict.fromkeys(chars) if char not in self._glyphs]
+		if len(chars) == 0:
+			return
+		glyphs = [self._font.render(char, self._antialias, self._color) for char in chars]
+		x = self._surface.get_width()
+		surface = pygame.Surface((x + sum(glyph.get_width() for glyph in glyphs), self._surface.get_height()), pygame.SRCALPHA)
+		surface.blit(self._surface, (0, 0))
+		for char, glyph, metrics in zip(chars, glyphs, self._font.metrics("".join(chars))):
+			surface.blit(glyph, (x, 0))
+			# Rendered alone, a glyph starts at its left bearing when it overhangs the pen, and may be wider than its advance
+			bearing, advance = (0, glyph.get_width()) if metrics is None else (min(metrics[0], 0), metrics[4])
+			self._glyphs[char] = pygame.Rect(x, 0, glyph.get_width(), self._surface.get_height()), bearing, advance
+			self._max_width = max(self._max_width, glyph.get_width())
+			self._tiled = self._tiled and bearing == 0 and advance == glyph.get_width()
+			x += glyph.get_width()
+		self._surface = surface.convert_alpha() if pygame.display.get_surface() is not None else surface
+		if self._tiled:
+			self._surface.set_alpha(None)  # Glyphs are copied along with their alpha, overwriting whatever was in their cell
+
+	def get_glyph(self, char: str) -> tuple[pygame.Rect, int, int]:
+		"""
+		:return: Area of the glyph in the atlas surface, where it's drawn from the pen (bearing, at most 0) and its advance
+		"""
+		glyph = self._glyphs.get(char)
+		if glyph is None:
+			self.add(char)
+			glyph = self._glyphs[char]
+		return glyph
+
+	def measure(self, text: str) -> int:
+		"""
+		:return: Width of the line, glyphs being placed at the font's advances as Font.size does, without kerning nor ligatures
+		"""
+		pen = right = 0
+		for char in text:
+			area, bearing, advance = self.get_glyph(char)
+			right = max(right, pen + bearing + area.width)
+			pen += advance
+		return max(right, pen) - (self.get_glyph(text[0])[1] if len(text) > 0 else 0)
+
+
+class GlyphLine:
+	"""
+	Line of text drawn from a glyph atlas into a retained surface, glyphs being placed at the font's advances.
+	Updates only copy the glyphs that changed when glyphs never overlap, otherwise they redraw the line from the first glyph that changed
+	"""
+
+	def __init__(self):
+		self._atlas: Union[GlyphAtlas, None] = None
+		self._text = ""
+		self._pens = [0]  # Pen position before each glyph, then after the last one
+		self._rights = [0]  # Rightmost pixel drawn by the glyphs before each pen position
+		self._width = 0
+		self._surface: Union[pygame.Surface, None] = None
+		self._view: Union[pygame.Surface, None] = None
+
+	def get_text(self) -> str:
+		return self._text
+
+	def get_surface(self) -> Union[pygame.Surface, None]:
+		return self._view
+
+	def update(self, atlas: GlyphAtlas, text: str) -> pygame.Surface:
+		"""
+		:return: Surface holding the line, the same one as long as its width doesn't change
+		"""
+		if atlas is self._atlas and text == self._text and self._view is not None:
+			return self._view
+
+		old_text, old_width = self._text, self._width
+		if atlas is not self._atlas:
+			old_text, old_width = "", 0
+		start = self._common_prefix(old_text, text)
+		pens, rights = self._pens[:start + 1], self._rights[:start + 1]
+		for char in text[start:]:
+			area, bearing, advance = atlas.get_glyph(char)
+			rights.append(max(rights[-1], pens[-1] + bearing + area.width))
+			pens.append(pens[-1] + advance)
+		# A first glyph overhanging the pen shifts the whole line to the right
+		origin = -atlas.get_glyph(text[0])[1] if len(text) > 0 else 0
+		width, height = max(rights[-1], pens[-1]) + origin, atlas.get_height()
+
+		if self._surface is None or self._surface.get_width() < width or self._surface.get_height() != height:
+			# Leave room for the line to grow, e.g. while typing
+			self._surface = pygame.Surface((width + width // 2 + 1, height), pygame.SRCALPHA)
+			old_text, old_width, start = "", 0, 0
+
+		if atlas.is_tiled():
+			self._copy_glyphs(atlas, text, pens, old_text, old_width, start, width)
+		else:
+			self._blend_glyphs(atlas, text, pens, old_text, old_width, start, origin, width)
+
+		if self._view is None or self._view.get_size() != (width, height) or self._view.get_parent() is not self._surface:
+			self._view = self._surface.subsurface((0, 0, width, height))
+		self._atlas, self._text, self._pens, self._rights, self._width = atlas, text, pens, rights, width
+		bump_surface_version(self._view)
+		return self._view
+
+	def _copy_glyphs(self, atlas: GlyphAtlas, text: str, pens: list[int], old_text: str, old_width: int, start: int, width: int):
+		height = atlas.get_height()
+		if old_width > width:
+			self._surface.fill((0, 0, 0, 0), (width, 0, old_width - width, height))
+		surface = atlas.get_surface()
+		glyphs = []
+		for i in range(start, len(text)):
+			char = text[i]
+			if i < len(old_text) and old_text[i] == char and self._pens[i] == pens[i]:
+				continue
+			glyphs.append((surface, (pens[i], 0), atlas.get_glyph(char)[0]))
+		self._surface.blits(glyphs, doreturn=False)
+
+	def _blend_glyphs(self, atlas: GlyphAtlas, text: str, pens: list[int], old_text: str, old_width: int, start: int, origin: int, width: int):
+		height = atlas.get_height()
+		# Cleared from where the first changed glyph, old or new, is drawn, glyphs reaching there being blended back in
+		left = 0
+		if start > 0:
+			left = origin + pens[start] + min(atlas.get_glyph(line[start])[1] if start < len(line) else 0 for line in (text, old_text))
+		first = start
+		while first > 0 and origin + pens[first - 1] + atlas.get_max_width() > left:
+			first -= 1
+		area = pygame.Rect(left, 0, max(width, old_width) - left, height)
+		self._surface.set_clip(area)
+		self._surface.fill((0, 0, 0, 0), area)
+		surface = atlas.get_surface()
+		glyphs = []
+		for i in range(first, len(text)):
+			glyph, bearing, _ = atlas.get_glyph(text[i])
+			glyphs.append((surface, (origin + pens[i] + bearing, 0), glyph))
+		self._surface.blits(glyphs, doreturn=False)
+		self._surface.set_clip(None)
+
+	@staticmethod
+	def _common_prefix(a: str, b: str) -> int:
+		if b.startswith(a):
+			return len(a)
+		if a.startswith(b):
+			return len(b)
+		i = 0
+		while a[i] == b[i]:
+			i += 1
+		return i
+
+
+class TextLayout:
+
+	MAX_COLORS = 4  # Colors kept rendered at once, e.g. a text and its blink color
+
+	def __init__(self, font: FontSettings):
+		self._font = font
+		self._font_key = None
+		self._max_width = -1
+		self._paragraphs: list[str] = [""]
+		self._paragraph_lines: list[list[tuple[str, int]]] = [[]]
+		self._lines: list[str] = []
+		self._line_widths: list[int] = []
+		self._surfaces: dict[tuple, list[Union[pygame.Surface, None]]] = {}
+		self._glyph_lines: dict[tuple, list[GlyphLine]] = {}
+		self._size = 0, 0
+
+	def get_font(self) -> FontSettings:
+		return self._font
+
+	def update(self, text: str, max_width: int) -> 'TextLayout':
+		"""
+		Wraps the given text, only laying out again the paragraphs that changed since the last update
+		:return: self
+		"""
+		font_key = self._font.get_font(), self._font.uses_glyph_atlas()
+		if font_key != self._font_key or max_width != self._max_width:
+			self._font_key, self._max_width = font_key, max_width
+			self._paragraphs, self._paragraph_lines = [], []
+
+		paragraphs = self._split(text)
+		kept = 0
+		while kept < min(len(paragraphs), len(self._paragraphs)) and paragraphs[kept] == self._paragraphs[kept]:
+			kept += 1
+		if kept == len(paragraphs) == len(self._paragraphs):
+			return self
+
+		self._paragraphs = paragraphs
+		return self._relayout(kept)
+
+	def append(self, text: str) -> 'TextLayout':
+		"""
+		Appends text to the laid out one, only wrapping again the last line of the last paragraph
+		:return: self
+		"""
+		paragraphs = self._split(text)
+		last = len(self._paragraphs) - 1
+		self._paragraphs[last] += paragraphs[0]
+		self._paragraphs += paragraphs[1:]
+		return self._relayout(last, len(self._paragraph_lines[last]) - 1)
+
+	def pop(self, count: int = 1) -> 'TextLayout':
+		"""
+		Removes characters at the end of the laid out text, line breaks counting as a single character
+		:return: self
+		"""
+		single = count == 1
+		while count > 0:
+			if self._paragraphs[-1] == "" and len(self._paragraphs) > 1:
+				self._paragraphs.pop()
+				self._paragraph_lines.pop()
+				count -= 1
+				single = False
+			else:
+				removed = min(count, len(self._paragraphs[-1]))
+				self._paragraphs[-1] = self._paragraphs[-1][:len(self._paragraphs[-1]) - removed]
+				count = count - removed if removed > 0 else 0
+		last = len(self._paragraphs) - 1
+		if not single:
+			# Text may flow back further than the last lines, wrap the whole paragraph again
+			return self._relayout(last)
+		# A word shrinking at the start of the last line may fit back on the line before
+		return self._relayout(last, len(self._paragraph_lines[last]) - 2)
+
+	@staticmethod
+	def _split(text: str) -> list[str]:
+		# Same as splitlines, but a trailing line break is kept as an empty last paragraph
+		paragraphs = (text + "_").splitlines()
+		paragraphs[-1] = paragraphs[-1][:-1]
+		return paragraphs
+
+	def _relayout(self, paragraph: int, line: int = 0) -> 'TextLayout':
+		"""
+		Wraps again every paragraph from the given one, keeping lines of this paragraph before the given line
+		"""
+		kept = self._paragraph_lines[paragraph][:max(0, line)] if paragraph < len(self._paragraph_lines) else []
+		del self._paragraph_lines[paragraph:]
+		first_line = sum(len(paragraph_lines) for paragraph_lines in self._paragraph_lines) + len(kept)
+		del self._lines[first_line:]
+		del self._line_widths[first_line:]
+		for surfaces in self._surfaces.values():
+			del surfaces[first_line:]
+
+		offset = sum(len(text) + 1 for text, _ in kept)
+		for i in range(paragraph, len(self._paragraphs)):
+			if i == len(self._paragraphs) - 1 and self._paragraphs[i] == "":
+				lines = []  # Trailing line break, no line to draw
+			elif i == paragraph:
+				lines = kept + self.wrap(self._paragraphs[i][offset:])
+			else:
+				lines = self.wrap(self._paragraphs[i])
+			self._paragraph_lines.append(lines)
+			self._lines += [text for text, _ in lines[len(kept) if i == paragraph else 0:]]
+			self._line_widths += [width for _, width in lines[len(kept) if i == paragraph else 0:]]
+		self._size = self._compute_size()
+		return self
+
+	def wrap(self, paragraph: str) -> list[tuple[str, int]]:
+		"""
+		:return: (line, width) pairs making up the given paragraph once wrapped to the max width
+		"""
+		lines = []
+		space_width = self._font.measure(" ")
+		subline, subline_width = [], 0
+		for word in paragraph.split(" "):
+			word_width = self._font.measure(word)
+			next_width = subline_width + space_width + word_width if len(subline) > 0 else word_width
+			if next_width > self._max_width > 0:
+				if len(subline) == 0:  # Support in case a single word takes more space than allocated, draw it anyway (Could split the word but whatever)
+					lines.append((word, word_width))
+				else:
+					lines.append(self._measured_line(subline))
+					subline, subline_width = [word], word_width
+			else:
+				subline.append(word)
+				subline_width = next_width
+		if len(subline) > 0:
+			lines.append(self._measured_line(subline))
+		return lines
+
+	def _measured_line(self, words: list[str]) -> tuple[str, int]:
+		# Word widths are only used to find line breaks, kerning makes the actual line width slightly differ
+		if len(words) == 1:
+			return words[0], self._font.measure(words[0])
+		line = " ".join(words)
+		return line, self._font.measure(line) if self._font.uses_glyph_atlas() else self._font.get_font().size(line)[0]
+
+	def _compute_size(self) -> tuple[int, int]:
+		width = max(self._line_widths, default=0)
+		if self._max_width > 0 and any(len(paragraph_lines) > 1 for paragraph_lines in self._paragraph_lines):
+			width = self._max_width
+		return width, len(self._lines) * self._font.get_font().get_height()
+
+	def get_lines(self) -> list[str]:
+		return self._lines
+
+	def get_line_count(self) -> int:
+		return len(self._lines)
+
+	def get_paragraph_count(self) -> int:
+		"""
+		:return: Number of paragraphs, not counting a trailing line break (same as len(text.splitlines()))
+		"""
+		return len(self._paragraphs) - (1 if self._paragraphs[-1] == "" else 0)
+
+	def get_last_line_width(self) -> int:
+		return self._line_widths[-1] if len(self._line_widths) > 0 else 0
+
+	def get_size(self) -> tuple[int, int]:
+		return self._size
+
+	def render(self) -> list[pygame.Surface]:
+		"""
+		Lines are rendered once per color, only rendering again the lines that changed since the last call
+		"""
+		key = tuple(self._font.get_color()), self._font.uses_glyph_atlas()
+		if key not in self._surfaces and len(self._surfaces) >= self.MAX_COLORS:
+			self._surfaces.clear()
+			self._glyph_lines.clear()
+		surfaces = self._surfaces.setdefault(key, [])
+		if len(surfaces) == len(self._lines) and None not in surfaces:
+			return surfaces.copy()
+
+		surfaces += [None] * (len(self._lines) - len(surfaces))
+		if not self._font.uses_glyph_atlas():
+			for i, line in enumerate(self._lines):
+				if surfaces[i] is None:
+					surfaces[i] = self._font.render_line(line)
+			return surfaces.copy()
+
+		atlas = self._font.get_glyph_atlas()
+		glyph_lines = self._glyph_lines.setdefault(key, [])
+		while len(glyph_lines) < len(self._lines):
+			glyph_lines.append(GlyphLine())
+		for i, line in enumerate(self._lines):
+			if surfaces[i] is None:
+				surfaces[i] = glyph_lines[i].update(atlas, line)
+		return surfaces.copy()
 
 
 class TimerTrigger:
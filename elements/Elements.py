@@ -3,12 +3,13 @@ import random
 import string
 from typing import Callable, Union, Any
 
+import numpy as np
 import pygame
 
-from elements.Attributes import SpriteAnimation, Animation, FontSettings, TimerTrigger
+from elements.Attributes import SpriteAnimation, Animation, FontSettings, TimerTrigger, TextLayout
 from elements.Types import SceneElement, Hoverable, Pulsing, ElementGroup, Typable
 from providers import ColorProvider
-from utils import C
+from utils import C, bump_surface_version
 
 
 class Sprite(SceneElement):
@@ -40,43 +41,12 @@ class TextDisplay(SceneElement):
 		self._display_settings = display_settings
 		self._content = kwargs.get("content", "")
 		self._max_width = -1
-		self._word_positions = []
+		self._layout = TextLayout(display_settings)
 		self._recompute_size()
 
 	def _recompute_size(self) -> 'TextDisplay':
 		def _():
-			self._word_positions.clear()
-			font = self.get_display_settings().get_font()
-			word_position = [0, 0]
-			final_width, final_height = 0, 0
-
-			for line in self._content.splitlines():
-				subline = []
-				for word in line.split(" "):
-					next_content = " ".join(subline + [word])
-					next_size = self.get_display_settings().get_font().size(next_content)[0]
-					if next_size > self._max_width > 0:
-						# Update word position and append to the list
-						word_position[0] = 0
-						word_position[1] += font.get_height()
-						self._word_positions.append(word_position)
-
-						# Increase text final size
-						final_width = self._max_width
-						final_height += font.get_height()
-
-						# Reset line content
-						subline = [] if len(subline) == 0 else [word]
-					else:
-						subline.append(word)
-						# Append word position to the list and update next word's starting point
-						self._word_positions.append(word_position)
-						word_position[0] = next_size
-						# Update final width
-						final_width = max(final_width, next_size)
-				final_height += font.get_height()
-
-			self.set_original_size((final_width, final_height))
+			self.set_original_size(self._layout.update(self.get_content(), self._max_width).get_size())
 			self.get_display_settings().clear_dirty()
 		self.lock_pos(_)
 		return self
@@ -103,31 +73,17 @@ class TextDisplay(SceneElement):
 	def get_max_width(self) -> int:
 		return self._max_width
 
+	def get_layout(self) -> TextLayout:
+		return self._layout
+
 	@staticmethod
 	def render_text(text: str, font: FontSettings, max_width: int) -> list[pygame.Surface]:
-		surfaces = []
-		for line in text.splitlines():
-			subline = []
-			for word in line.split(" "):
-				next_content = " ".join(subline + [word])
-				next_size = font.get_font().size(next_content)[0]
-				if next_size > max_width > 0:
-					if len(subline) == 0:  # Support in case a single word takes more space than allocated, draw it anyway (Could split the word but whatever)
-						surfaces.append(font.render_line(" ".join([word])))
-						subline = []
-					else:
-						surfaces.append(font.render_line(" ".join(subline)))
-						subline = [word]
-				else:
-					subline.append(word)
-			if len(subline) > 0:
-				surfaces.append(font.render_line(" ".join(subline)))
-		return surfaces
+		return TextLayout(font).update(text, max_width).render()
 
 	def render(self) -> list[pygame.Surface]:
 		if self.get_display_settings().is_dirty():
 			self._recompute_size()
-		return self.render_text(self.get_content(), self.get_display_settings(), self._max_width)
+		return self._layout.render()
 
 
 class PulsingImage(Sprite, Pulsing):
@@ -239,6 +195,137 @@ class BinaryDropText(TextDisplay):
 			self.__reset()
 
 
+class BinaryRain(SceneElement):
+	"""
+	Columns of falling binary digits, updated and drawn as a whole rather than as one element per column.
+	Drawing is bound by overdraw: about 1000 columns fit in a 60 FPS frame at 1080p, updating alone stays cheap for thousands
+	"""
+
+	MIN_DROP_SPEED = BinaryDropText.MIN_DROP_SPEED
+	MAX_DROP_SPEED = BinaryDropText.MAX_DROP_SPEED
+	MIN_ZOOM = BinaryDropText.MIN_ZOOM
+	MAX_ZOOM = BinaryDropText.MAX_ZOOM
+	MIN_CHAIN_SIZE = BinaryDropText.MIN_CHAIN_SIZE
+	MAX_CHAIN_SIZE = BinaryDropText.MAX_CHAIN_SIZE
+	LEVELS = 8  # Zoom and colour steps pre-rendered in the atlas
+	VARIANTS = 16  # Random digit strips rendered per level, columns show a slice of one of them
+
+	def __init__(self, display_settings: FontSettings, column_count: int = 50, seed: Union[int, None] = None, **kwargs):
+		"""
+		:param display_settings: Font the digits are rendered with, their colour fades from the background one to fg2 with depth
+		:param seed: Seeds the columns' random generator
+		"""
+		self._display_settings = display_settings
+		self.rng = np.random.default_rng(seed)
+		self._strips: list[pygame.Surface] = []
+		self._column_widths = np.zeros(0, dtype=np.intp)
+		self._line_heights = np.zeros(0, dtype=np.intp)
+		self._bounds: Union[pygame.Rect, None] = None
+
+		self._x = np.zeros(0)
+		self._y = np.zeros(0)
+		self._speed = np.zeros(0)
+		self._level = np.zeros(0, dtype=np.intp)
+		self._chain = np.zeros(0, dtype=np.intp)
+		self._variant = np.zeros(0, dtype=np.intp)
+		self._offset = np.zeros(0, dtype=np.intp)
+
+		super().__init__(C.DISPLAY_SIZE[0], C.DISPLAY_SIZE[1], **kwargs)
+		self.set_anchor("topleft")
+		self.render_atlas()
+		self.set_column_count(column_count)
+
+	def render_atlas(self) -> 'BinaryRain':
+		"""
+		Pre-renders strips of random digits at every depth level, must be called again if the font or colours change
+		"""
+		fg, bg = ColorProvider.get("fg2"), ColorProvider.get("bg")
+		font = self._display_settings.get_font()
+		self._strips, widths, heights = [], [], []
+		for level in range(self.LEVELS):
+			coefficient = (level + 0.5) / self.LEVELS
+			zoom = self.MIN_ZOOM + coefficient * (self.MAX_ZOOM - self.MIN_ZOOM)
+			glyphs = [pygame.transform.smoothscale_by(font.render(digit, True, bg.lerp(fg, coefficient)), zoom) for digit in "01"]
+			width, height = max(glyph.get_width() for glyph in glyphs), round(font.get_height() * zoom)
+			strip = pygame.Surface((width * self.VARIANTS, height * self.MAX_CHAIN_SIZE * 2), pygame.SRCALPHA)
+			strip.blits([
+				(glyphs[self.rng.integers(0, 1, endpoint=True)], (variant * width, row * height))
+				for variant in range(self.VARIANTS) for row in range(self.MAX_CHAIN_SIZE * 2)
+			], doreturn=False)
+			# Blended onto the background once and keyed out: colorkey blits cost about a third of per-pixel alpha ones
+			flat = pygame.Surface(strip.get_size())
+			if pygame.display.get_surface() is not None:
+				flat = flat.convert()
+			flat.fill(bg)
+			flat.blit(strip, (0, 0))
+			flat.set_colorkey(bg)
+			self._strips.append(flat)
+			widths.append(width)
+			heights.append(height)
+		self._column_widths, self._line_heights = np.array(widths, dtype=np.intp), np.array(heights, dtype=np.intp)
+		return self
+
+	def get_column_count(self) -> int:
+		return len(self._x)
+
+	def set_column_count(self, column_count: int) -> 'BinaryRain':
+		count = self.get_column_count()
+		for name in ("_x", "_y", "_speed", "_level", "_chain", "_variant", "_offset"):
+			column = getattr(self, name)
+			setattr(self, name, column[:column_count] if column_count <= count else np.concatenate((column, np.zeros(column_count - count, dtype=column.dtype))))
+		self.reset_columns(np.arange(count, column_count))
+		return self
+
+	def reset_columns(self, columns: np.ndarray):
+		"""
+		Gives new content, depth and speed to the given columns and puts them back above the top of the element
+		"""
+		n = len(columns)
+		if n == 0:
+			return
+		coefficient = self.rng.random(n)
+		level = np.minimum((coefficient * self.LEVELS).astype(np.intp), self.LEVELS - 1)
+		self._level[columns] = level
+		self._speed[columns] = self.MIN_DROP_SPEED + coefficient * (self.MAX_DROP_SPEED - self.MIN_DROP_SPEED)
+		self._chain[columns] = self.rng.integers(self.MIN_CHAIN_SIZE, self.MAX_CHAIN_SIZE, n, endpoint=True)
+		self._variant[columns] = self.rng.integers(0, self.VARIANTS, n)
+		self._offset[columns] = self.rng.integers(0, self.MAX_CHAIN_SIZE, n, endpoint=True)
+		self._x[columns] = self.left + self.rng.random(n) * self.width - self._column_widths[level] / 2
+		self._y[columns] = self.top - self._chain[columns] * self._line_heights[level]
+
+	def tick(self, dt: float):
+		super().tick(dt)
+		self._y += self._speed * dt
+		self.reset_columns(np.flatnonzero(self._y > self.bottom))
+
+	def compose(self) -> list[tuple[pygame.Surface, tuple[float, float], pygame.Rect]]:
+		"""
+		:return: (strip, position, area) triplets, one per visible column
+		"""
+		widths, heights = self._column_widths[self._level], self._line_heights[self._level] * self._chain
+		columns = np.flatnonzero((self._y < self.bottom) & (self._y + heights > self.top)).tolist()
+		level, x, y = self._level.tolist(), self._x.tolist(), self._y.tolist()
+		areas = np.stack((self._variant * widths, self._offset * self._line_heights[self._level], widths, heights), axis=1).tolist()
+		return [(self._strips[level[i]], (x[i], y[i]), pygame.Rect(areas[i])) for i in columns]
+
+	def render(self) -> list[pygame.Surface]:
+		return [strip for strip, _, _ in self.compose()]
+
+	def collect_damage(self, frame: list[tuple[pygame.Surface, tuple[float, float], pygame.Rect]]) -> list[pygame.Rect]:
+		# Columns move every frame, comparing each of them would cost more than repainting the whole area
+		bounds = self.copy() if len(frame) > 0 else None
+		damage = [rect for rect in (self._bounds, bounds) if rect is not None]
+		self._bounds = bounds
+		return damage
+
+	def forget_damage(self) -> Union[pygame.Rect, None]:
+		bounds, self._bounds = self._bounds, None
+		return bounds
+
+	def get_drawn_bounds(self) -> Union[pygame.Rect, None]:
+		return self._bounds
+
+
 class Timer(TextDisplay):
 
 	def __init__(self, display_settings: FontSettings, **kwargs):
@@ -361,6 +448,9 @@ class TextArea(TextDisplay, Typable):
 	pattern = None
 
 	def __init__(self, display_settings: FontSettings, **kwargs):
+		# Typed text is kept as an edit buffer of chunks, only joined when the whole content is needed
+		self._buffer: list[str] = [kwargs["content"]] if kwargs.get("content", "") != "" else []
+		self._content_length = sum(map(len, self._buffer))
 		super().__init__(display_settings, **kwargs)
 		self.add_animation("prompt_blink", Animation(TextArea.PROMPT_BLINK_SPEED).set_end_behavior(Animation.REWIND_ON_END).start())
 		self.add_animation("error_blink", Animation(TextArea.BLINK_TIME).set_end_behavior(Animation.RESET_ON_END))
@@ -368,15 +458,13 @@ class TextArea(TextDisplay, Typable):
 		self.pattern = kwargs.get("pattern", None)
 		self.pattern_size, self.content_size = 0, 0
 		self.pattern_color = kwargs.get("pattern_color", ColorProvider.get('placeholder'))
-		self.pattern_display = FontSettings(display_settings.get_font_path(), display_settings.get_font_size(), self.pattern_color)
+		self.pattern_display = FontSettings(display_settings.get_font_path(), display_settings.get_font_size(), self.pattern_color, display_settings.get_font_style()).set_glyph_atlas(display_settings.uses_glyph_atlas())
+		self._pattern_layout = TextLayout(self.pattern_display)
 		self.require_pattern = kwargs.get("require_pattern", True)
 		self.blink_color = ColorProvider.get("error")
 		self.blink_mode = kwargs.get("blink_mode", TextArea.BLINK_PATTERN)
 		self.enabled = True
 		self.enable_multiline = kwargs.get("multiline", True)
-
-		self.on("type", lambda: self._recompute_size())
-		self.on("erase", lambda: self._recompute_size())
 		self._recompute_size()
 
 	def blink(self, color: Union[pygame.Color, None], then: Union[Callable[[], Any], None]):
@@ -394,43 +482,64 @@ class TextArea(TextDisplay, Typable):
 	def _recompute_size(self) -> 'TextDisplay':
 		if self.has_pattern():
 			def _():
-				self._word_positions.clear()
-				font = self.get_display_settings().get_font()
-				word_position = [0, 0]
-				final_width, final_height = 0, 0
-
-				for line in self.pattern.splitlines():
-					subline = []
-					for word in line.split(" "):
-						next_content = " ".join(subline + [word])
-						next_size = self.get_display_settings().get_font().size(next_content)[0]
-						if next_size > self._max_width > 0:
-							# Update word position and append to the list
-							word_position[0] = 0
-							word_position[1] += font.get_height()
-							self._word_positions.append(word_position)
-
-							# Increase text final size
-							final_width = self._max_width
-							final_height += font.get_height()
-
-							# Reset line content
-							subline = [] if len(subline) == 0 else [word]
-						else:
-							subline.append(word)
-							# Append word position to the list and update next word's starting point
-							self._word_positions.append(word_position)
-							word_position[0] = next_size
-							# Update final width
-							final_width = max(final_width, next_size)
-					final_height += font.get_height()
-				self.set_original_size((final_width, final_height))
+				self._layout.update(self.get_content(), self._max_width)
+				self.set_original_size(self._pattern_layout.update(self.pattern, self._max_width).get_size())
 				self.get_display_settings().clear_dirty()
 			self.lock_pos(_)
 			return self
 		else:
-			self.content_size = max(1, len(self.get_content().splitlines()))
-			return super()._recompute_size()
+			super()._recompute_size()
+			self.content_size = max(1, self._layout.get_paragraph_count())
+			return self
+
+	def get_content(self) -> str:
+		if len(self._buffer) > 1:
+			self._buffer = ["".join(self._buffer)]
+		return self._buffer[0] if len(self._buffer) > 0 else ""
+
+	def get_content_length(self) -> int:
+		return self._content_length
+
+	def set_content(self, new: str) -> 'TextArea':
+		self._buffer = [new] if new != "" else []
+		self._content_length = len(new)
+		return super().set_content(new)
+
+	def append_content(self, text: str) -> 'TextArea':
+		"""
+		Appends text to the content, only laying out again its last line
+		"""
+		self._buffer.append(text)
+		self._content_length += len(text)
+		return self._update_layout(lambda: self._layout.append(text))
+
+	def pop_content(self, count: int = 1) -> 'TextArea':
+		"""
+		Removes characters at the end of the content, only laying out again its last lines
+		"""
+		count = min(count, self._content_length)
+		self._content_length -= count
+		removed = count
+		while removed > 0:
+			chunk = self._buffer.pop()
+			if len(chunk) > removed:
+				self._buffer.append(chunk[:len(chunk) - removed])
+			removed -= len(chunk)
+		return self._update_layout(lambda: self._layout.pop(count))
+
+	def _update_layout(self, update: Callable[[], TextLayout]) -> 'TextArea':
+		if self.get_display_settings().is_dirty():
+			return self._recompute_size()
+		if self.has_pattern():
+			# Sized after the pattern, which doesn't change
+			update()
+			return self
+		self.lock_pos(lambda: self.set_original_size(update().get_size()))
+		self.content_size = max(1, self._layout.get_paragraph_count())
+		return self
+
+	def _ends_with_line_break(self) -> bool:
+		return len(self._buffer) > 0 and self._buffer[-1].endswith("\n")
 
 	def is_enabled(self) -> bool:
 		return self.enabled
@@ -446,7 +555,7 @@ class TextArea(TextDisplay, Typable):
 	def get_next_character(self, n: int = 1) -> str:
 		if not self.has_pattern() or self.is_complete():
 			return ""
-		return self.pattern[len(self.get_content()):len(self.get_content()) + n]
+		return self.pattern[self._content_length:self._content_length + n]
 
 	def has_pattern(self) -> bool:
 		return self.pattern is not None
@@ -467,7 +576,7 @@ class TextArea(TextDisplay, Typable):
 		return self.has_pattern() and self.require_pattern
 
 	def is_complete(self) -> bool:
-		return self.has_pattern() and self.get_content() == self.pattern
+		return self.has_pattern() and self._content_length == len(self.pattern) and self.get_content() == self.pattern
 
 	def is_multiline(self) -> bool:
 		return (self.has_pattern() and self.pattern_size > 1) or self.enable_multiline
@@ -481,9 +590,9 @@ class TextArea(TextDisplay, Typable):
 			return
 		if letter == "\x08" and not self.is_pattern_required():
 			# Support backspaces
-			if self.get_content() == "":
+			if self._content_length == 0:
 				return
-			self.set_content(self.get_content()[:-1])
+			self.pop_content()
 			self.get_animation("prompt_blink").reset().start()
 			self.call("erase")
 			return
@@ -494,7 +603,7 @@ class TextArea(TextDisplay, Typable):
 			return
 		elif (letter not in string.printable and letter not in "éèêëàâôûùç") or letter == "\t":
 			return
-		self.set_content(self.get_content() + letter)
+		self.append_content(letter)
 		self.get_animation("prompt_blink").reset().start()
 		self.call("type")
 		if self.is_complete():
@@ -509,14 +618,12 @@ class TextArea(TextDisplay, Typable):
 		if is_bar:
 			# Compute cursor position
 			pos = super().get_drawing_position(max(0, surface_id - 1 - self.pattern_size))
-			last_line = "" if self.get_content() == "" else self.get_content().splitlines()[-1]
-			last_line_size = self.get_display_settings().get_font().size(last_line)[0] if last_line != "" else 0
-			width_fix = (0.5 * self.get_display_settings().get_font().size(" ")[0])
-			cursor_offset = self.prev_surface_size[0] if self.get_content() != "" else -width_fix
-			if self.get_max_width() > 0:
-				return pos[0] + cursor_offset - (width_fix if last_line != "" else 0), pos[1]
-			else:
-				return pos[0] + (last_line_size * self.get_zoom()[0]) - (width_fix if last_line != "" else 0), pos[1]
+			# The cursor follows the last laid out line, whose width is known without measuring the content again
+			last_line_size = self._layout.get_last_line_width()
+			width_fix = 0.5 * self.get_display_settings().measure(" ")
+			if self._content_length == 0:
+				return pos[0] - width_fix, pos[1]
+			return pos[0] + last_line_size * self.get_zoom()[0] - (width_fix if last_line_size > 0 else 0), pos[1]
 		if self.has_pattern() and surface_id >= self.pattern_size > 0:
 			surface_id -= self.pattern_size
 		return super().get_drawing_position(surface_id)
@@ -539,11 +646,11 @@ class TextArea(TextDisplay, Typable):
 		if not self.has_pattern():
 			result = super().render() + bar
 		else:
-			pattern_lines = TextArea.render_text(self.get_pattern(), self.pattern_display, self.get_max_width())
+			pattern_lines = self._pattern_layout.render()
 			content_lines = super().render()
 
 			self.pattern_size = len(pattern_lines)
-			self.content_size = len(content_lines) + (1 if self.get_content().endswith("\n") else 0)
+			self.content_size = len(content_lines) + (1 if self._ends_with_line_break() else 0)
 
 			result = pattern_lines + content_lines + bar
 
@@ -560,6 +667,7 @@ class TextArea(TextDisplay, Typable):
 
 class DrawingCell(Hoverable):
 
+	CACHE_SCALED = False
 	COLOR_TRANSITION_DURATION = 0.5
 
 	def __init__(self, width: int, height: int, **kwargs):
@@ -697,3 +805,185 @@ class DrawingGrid(ElementGroup):
 		for el in self.get_elements():
 			if isinstance(el, DrawingCell):
 				el.set_filled(False)
+
+
+class CompactDrawingGrid(Hoverable):
+	"""
+	Drawing grid keeping its cells' state in arrays and drawing them into a single surface, repainted cell by cell
+	"""
+
+	BLINK_TIME = DrawingGrid.BLINK_TIME
+	BLINK_FREQUENCY = DrawingGrid.BLINK_FREQUENCY
+	COLOR_TRANSITION_DURATION = DrawingCell.COLOR_TRANSITION_DURATION
+
+	def __init__(self, grid_size: tuple[int, int], **kwargs):
+		assert grid_size[0] != 0 and grid_size[1] != 0
+		super().__init__(30 * grid_size[0], 30 * grid_size[1], **kwargs)
+		self._grid_size = grid_size
+		self._hover_color = kwargs.get("hover_color", ColorProvider.get("fg"))
+		self._empty_color = kwargs.get("empty_color", ColorProvider.get("bg"))
+		self._filled_color = kwargs.get("filled_color", ColorProvider.get("fg"))
+		self._border_color = kwargs.get("border_color", ColorProvider.get("fg2"))
+		self._cell_color = self._filled_color
+		self._blink_color = ColorProvider.get("error")
+
+		self._filled = np.zeros(grid_size[0] * grid_size[1], dtype=bool)
+		self._fade = np.zeros(grid_size[0] * grid_size[1])  # Hover colour transition progress, fading out after the cursor left
+		self._cursor_pos = 0, 0
+		self._hovered_cell: Union[int, None] = None
+		self._clicked_cell: Union[int, None] = None
+
+		self._surface: Union[pygame.Surface, None] = None
+		self._drawn_colors = np.full((grid_size[0] * grid_size[1], 3), -1, dtype=np.int16)
+
+		self.add_animation("blink", Animation(self.BLINK_TIME).set_end_behavior(Animation.RESET_ON_END))
+		self.on("mouse_enter", lambda: pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_HAND))
+		self.on("mouse_leave", lambda: pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW))
+
+	def set_relative_width(self, relw: float, keep_ratio: bool = True, holder: Union[pygame.Rect, None] = None) -> 'SceneElement':
+		return super().set_relative_width(relw, True, holder)
+
+	def set_relative_height(self, relh: float, keep_ratio: bool = True, holder: Union[pygame.Rect, None] = None) -> 'SceneElement':
+		return super().set_relative_height(relh, True, holder)
+
+	def get_grid_size(self) -> tuple[int, int]:
+		return self._grid_size
+
+	def get_cell_index(self, cell: tuple[int, int]) -> int:
+		return cell[1] * self._grid_size[0] + cell[0]
+
+	def get_cell(self, index: int) -> tuple[int, int]:
+		return index % self._grid_size[0], index // self._grid_size[0]
+
+	def get_cell_at(self, pos: tuple[float, float]) -> Union[int, None]:
+		"""
+		:return: Index of the cell under the given screen position, None if outside the grid
+		"""
+		if self.width == 0 or self.height == 0:
+			return None
+		x, y = int((pos[0] - self.left) * self._grid_size[0] / self.width), int((pos[1] - self.top) * self._grid_size[1] / self.height)
+		if not (0 <= x < self._grid_size[0] and 0 <= y < self._grid_size[1]):
+			return None
+		return y * self._grid_size[0] + x
+
+	def get_cell_rect(self, index: int) -> pygame.Rect:
+		"""
+		:return: Area of the cell in the grid's surface
+		"""
+		x, y = self.get_cell(index)
+		return pygame.Rect(int(x * self.width / self._grid_size[0]), int(y * self.height / self._grid_size[1]), int(self.width / self._grid_size[0]), int(self.height / self._grid_size[1]))
+
+	def is_filled(self, cell: tuple[int, int]) -> bool:
+		return bool(self._filled[self.get_cell_index(cell)])
+
+	def set_filled(self, cell: tuple[int, int], filled: bool) -> 'CompactDrawingGrid':
+		self._filled[self.get_cell_index(cell)] = filled
+		return self
+
+	def get_filled_cells(self) -> list[tuple[int, int]]:
+		return [self.get_cell(index) for index in np.flatnonzero(self._filled).tolist()]
+
+	def get_clicked_cell(self) -> Union[tuple[int, int], None]:
+		"""
+		:return: Last cell clicked, set before click listeners are called
+		"""
+		return None if self._clicked_cell is None else self.get_cell(self._clicked_cell)
+
+	def on_mouse_move(self, pos: tuple[int, int]):
+		super().on_mouse_move(pos)
+		self._cursor_pos = pos
+		if self.is_hovered() and self.is_enabled():
+			self.set_hovered_cell(self.get_cell_at(pos))
+
+	def on_mouse_enter(self):
+		super().on_mouse_enter()
+		if self.is_hovered():
+			self.set_hovered_cell(self.get_cell_at(self._cursor_pos))
+
+	def on_mouse_leave(self):
+		super().on_mouse_leave()
+		self.set_hovered_cell(None)
+
+	def set_hovered_cell(self, index: Union[int, None]):
+		if index == self._hovered_cell:
+			return
+		if self._hovered_cell is not None and not self._filled[self._hovered_cell]:
+			self._fade[self._hovered_cell] = 1.
+		if index is not None:
+			self._fade[index] = 0.
+		self._hovered_cell = index
+
+	def on_mouse_click(self, pos: tuple[float, float], button: int):
+		if not self.is_hovered() or button != pygame.BUTTON_LEFT or not self.is_enabled():
+			return
+		index = self.get_cell_at(pos)
+		if index is None:
+			return
+		self._clicked_cell = index
+		self._filled[index] = not self._filled[index]
+		super().on_mouse_click(pos, button)
+
+	def blink(self, color: pygame.Color, then: Union[Callable[[], Any], None]):
+		self._blink_color = color
+		self.set_enabled(False)
+		self.get_animation("blink").start()
+
+		def end_behavior(anim):
+			anim.reset()
+			self.set_enabled(True)
+			self._cell_color = self._filled_color
+			self._filled[:] = False
+			if then is not None:
+				then()
+
+		self.get_animation("blink").set_end_behavior(end_behavior)
+
+	def compare(self, pattern: list[list[bool]]) -> bool:
+		return bool(np.array_equal(self._filled, np.array(pattern, dtype=bool).reshape(-1)))
+
+	def clear_grid(self):
+		self._filled[:] = False
+
+	def tick(self, dt: float):
+		super().tick(dt)
+		np.maximum(self._fade - dt / self.COLOR_TRANSITION_DURATION, 0, out=self._fade)
+
+		blink_animation = self.get_animation("blink")
+		if blink_animation.is_running():
+			if not math.cos(blink_animation.get_progress_percent() * self.BLINK_FREQUENCY * math.pi) > 0:
+				self._cell_color = self._filled_color
+			else:
+				self._cell_color = self._blink_color
+
+	def get_cell_colors(self) -> np.ndarray:
+		"""
+		:return: RGB colour of every cell for the current frame
+		"""
+		filled, empty, hover = (np.array(tuple(color)[:3], dtype=np.float64) for color in (self._cell_color, self._empty_color, self._hover_color))
+		base = np.where(self._filled[:, None], filled, empty)
+		colors = (base + self._fade[:, None] * (hover - base)).astype(np.int16)
+		if self._hovered_cell is not None and not self._filled[self._hovered_cell]:
+			colors[self._hovered_cell] = hover
+		return colors
+
+	def render(self) -> list[pygame.Surface]:
+		if self._surface is None or self._surface.get_size() != self.size:
+			self._surface = pygame.Surface(self.size)
+			self._drawn_colors[:] = -1
+
+		colors = self.get_cell_colors()
+		changed = np.flatnonzero((colors != self._drawn_colors).any(axis=1)).tolist()
+		for index in changed:
+			rect = self.get_cell_rect(index)
+			pygame.draw.rect(self._surface, colors[index].tolist(), rect)
+			pygame.draw.lines(self._surface, self._border_color, True, (rect.topleft, (rect.left, rect.bottom - 1), (rect.right - 1, rect.bottom - 1), (rect.right - 1, rect.top)))
+		if len(changed) > 0:
+			self._drawn_colors = colors
+			bump_surface_version(self._surface)
+		return [self._surface]
+
+	def compose(self) -> list[tuple[pygame.Surface, tuple[float, float]]]:
+		# The surface is drawn at the grid's current size, no need to scale it
+		frame = [(surface, self.get_drawing_position(i)) for i, surface in enumerate(self.render())]
+		self.prev_surface_size = self.size
+		return frame
@@ -8,8 +8,8 @@ from typing import Literal, Union, Callable, Any
 from pygame import Rect
 
 from elements.Attributes import Animation, PulseSettings
-from providers import ColorProvider
-from utils import C
+from providers import ColorProvider, ScaleCache
+from utils import C, AppState, get_surface_version
 
 
 ClickCallback = Callable[[], Any]
@@ -27,6 +27,8 @@ class SceneElement(pygame.Rect, ABC):
 	SHAKE_SMOOTH_IN = 1
 	SHAKE_INSTANT = 2
 
+	CACHE_SCALED = True  # Disable for elements rendering new surfaces every frame
+
 	@staticmethod
 	def relative_to_absolute(rel: float, holder: float) -> float:
 		return rel * holder
@@ -38,9 +40,12 @@ class SceneElement(pygame.Rect, ABC):
 		self.listeners = {"create": [], "resize": [], "move": []}
 		self.width, self.height = width, height
 		self.prev_surface_size = 0, 0
+		self.__drawn_signature: list[tuple[pygame.Surface, int, tuple[float, float]]] = []
+		self.__drawn_bounds: Union[pygame.Rect, None] = None
 		self.__original_size = self.width, self.height
 
 		self.__anchor = "center"
+		self.__static = False
 		self.__animations: dict[str, Animation] = {}
 		self.__zoom = 1, 1
 		self.__shake_force, self.__shake_return_pos, self.__shake_mode = 0, (0, 0), self.SHAKE_SMOOTH_IN_OUT
@@ -89,6 +94,16 @@ class SceneElement(pygame.Rect, ABC):
 		self.set_zoom(zoom)
 		self.call("resize")
 
+	def set_static(self, static: bool = True) -> 'SceneElement':
+		"""
+		Static elements are drawn once into the scene's background layer, which is refreshed whenever one of them changes
+		"""
+		self.__static = static
+		return self
+
+	def is_static(self) -> bool:
+		return self.__static
+
 	def add_animation(self, name: str, anim: Animation) -> 'SceneElement':
 		self.__animations[name] = anim
 		return self
@@ -244,15 +259,50 @@ class SceneElement(pygame.Rect, ABC):
 			self.set_absolute_pos((og[0] + (random.random() - 0.5) * self.__shake_force * c, og[1] + (random.random() - 0.5) * self.__shake_force * c))
 		self.call("tick")
 
-	def draw(self, where: pygame.Surface):
-		i = 0
-		for surface in self.render():
-			scale = self.get_zoom()
+	def compose(self) -> list[tuple[pygame.Surface, tuple[float, float]]]:
+		"""
+		:return: (surface, position) pairs to blit for the current frame
+		"""
+		frame = []
+		scale = self.get_zoom()
+		for i, surface in enumerate(self.render()):
 			if scale[0] != 1. or scale[1] != 1.:
-				surface = pygame.transform.smoothscale_by(surface, scale)
-			where.blit(surface, self.get_drawing_position(i))
+				surface = ScaleCache.scale(surface, scale) if self.CACHE_SCALED else pygame.transform.smoothscale_by(surface, scale)
+			frame.append((surface, self.get_drawing_position(i)))
 			self.prev_surface_size = surface.get_size()
-			i += 1
+		return frame
+
+	def draw(self, where: pygame.Surface):
+		where.blits(self.compose(), doreturn=False)
+
+	def collect_damage(self, frame: list[tuple[pygame.Surface, tuple[float, float]]]) -> list[pygame.Rect]:
+		"""
+		Compares a composed frame with the one drawn previously
+		:return: Previous and current bounds if anything moved, resized, animated or changed content, an empty list otherwise
+		"""
+		signature = [(surface, get_surface_version(surface), pos) for surface, pos in frame]
+		if signature == self.__drawn_signature:
+			return []
+		bounds = None
+		for surface, pos in frame:
+			# Blits truncate float positions, grow the rect by a pixel to stay on the safe side
+			rect = pygame.Rect(pos, surface.get_size()).inflate(2, 2)
+			bounds = rect if bounds is None else bounds.union(rect)
+		damage = [rect for rect in (self.__drawn_bounds, bounds) if rect is not None]
+		self.__drawn_signature, self.__drawn_bounds = signature, bounds
+		return damage
+
+	def forget_damage(self) -> Union[pygame.Rect, None]:
+		"""
+		Called when the element stops being drawn
+		:return: Bounds it was last drawn in
+		"""
+		bounds = self.__drawn_bounds
+		self.__drawn_signature, self.__drawn_bounds = [], None
+		return bounds
+
+	def get_drawn_bounds(self) -> Union[pygame.Rect, None]:
+		return self.__drawn_bounds
 
 
 class Hoverable(SceneElement, ABC):
@@ -262,6 +312,7 @@ class Hoverable(SceneElement, ABC):
 	__draggable = False
 	__one_click_per_frame = False
 	__last_clicked_frame = 0
+	__last_click_time = 0.
 
 	# State
 	__hovered = False
@@ -284,6 +335,12 @@ class Hoverable(SceneElement, ABC):
 	def is_enabled(self) -> bool:
 		return self.__enabled
 
+	def get_last_click_time(self) -> float:
+		"""
+		:return: perf_counter time at which the input of the last click was received, click callbacks may run later (e.g. after an animation)
+		"""
+		return self.__last_click_time
+
 	def set_draggable(self, draggable: bool = True) -> 'Hoverable':
 		self.__draggable = draggable
 		if not draggable:
@@ -331,6 +388,7 @@ class Hoverable(SceneElement, ABC):
 			return
 		if self.is_one_click_per_frame() and self.__last_clicked_frame == C.FRAME_ID:
 			return
+		self.__last_click_time = AppState.get_input_time()
 		self.call("click")
 		self.__clicked = True
 		self.__prev_mouse_pos = pos
@@ -395,6 +453,8 @@ class Pulsing(SceneElement, ABC):
 
 class ElementGroup(Hoverable, SceneElement):
 
+	CACHE_SCALED = False
+
 	_elements = []
 
 	@staticmethod
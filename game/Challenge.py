@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import random
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
 if TYPE_CHECKING:
 	from scene.all.GameScene import GameScene
@@ -11,21 +11,37 @@ from abc import ABC, abstractmethod
 from elements.Attributes import FontSettings, SpriteAnimation, PulseSettings
 from elements.Elements import TextDisplay, Button, Sprite, PulsingText
 from elements.Types import SceneElement
-from providers import ColorProvider, SpriteProvider
+from providers import ColorProvider, SpriteProvider, LeaderboardProvider
 from scene import scene_manager
-from utils import C
-from utils.leaderboard import Leaderboard, LeaderboardEntry
+from utils import C, FramePolicy
+from utils.leaderboard import LeaderboardEntry
 
 
 class Challenge(ABC):
 
+	# Metadata known without building the challenge, used when registering it
+	NAME = ""
+	DESCRIPTION = ""
+	LOGO = ""
+	DESCENDING_LEADERBOARD = True
+
+	# Frame pacing while the challenge is played
+	FRAME_POLICY = FramePolicy()
+
+	_close_btn: Union[Button, None] = None
+	_restart_btn: Union[Button, None] = None
+
 	def __init__(self, name: str, description: str, logo_file_name: str, descending_lb: bool):
 		self._name = name
 		self._description = description
 		self._logo_sprite = Sprite(SpriteAnimation(SpriteProvider.get("Challenges/" + logo_file_name), [20], [0.04], None).set_mode(SpriteAnimation.MODE_CIRCULAR))
 		self._logo_sprite.set_relative_height(0.22).set_anchor("center").set_relative_pos((0.5, 0.3))
 		self.title_display, self.description_display, self.leaderboard_display = None, None, None
-		self.leaderboard = Leaderboard(name.lower().replace(" ", "_"), descending_lb)
+		self.leaderboard = LeaderboardProvider.get_board(self.get_leaderboard_file_name(name), descending_lb)
+
+	@staticmethod
+	def get_leaderboard_file_name(name: str) -> str:
+		return name.lower().replace(" ", "_")
 
 	def get_name(self) -> str:
 		return self._name
@@ -40,19 +56,19 @@ class Challenge(ABC):
 	def create_title(self) -> list[SceneElement]:
 		if self.title_display is None:
 			self.title_display = TextDisplay(FontSettings("resources/fonts/Code.ttf", 75, ColorProvider.get("fg")), content=">/" + self.get_name())
-			self.title_display.set_anchor("midtop").set_relative_pos((0.5, 0.01))
+			self.title_display.set_static().set_anchor("midtop").set_relative_pos((0.5, 0.01))
 		return [self.title_display]
 
 	def create_description(self) -> list[SceneElement]:
 		if self.description_display is None:
 			self.description_display = TextDisplay(FontSettings("resources/fonts/Start.otf", 50, ColorProvider.get("fg")), content=self.get_description())
-			self.description_display.set_anchor("midtop").set_relative_pos((0.5, 0.01)).move((0, self.title_display.height))
+			self.description_display.set_static().set_anchor("midtop").set_relative_pos((0.5, 0.01)).move((0, self.title_display.height))
 		return [self.description_display]
 
 	def create_leaderboard(self) -> list[SceneElement]:
 		if self.leaderboard_display is None:
 			font_settings = FontSettings("resources/fonts/Code.ttf", 50, ColorProvider.get("fg"))
-			self.leaderboard_display = TextDisplay(font_settings)
+			self.leaderboard_display = TextDisplay(font_settings).set_static()
 		top = self.leaderboard.get_top(10)
 
 		lines = []
@@ -79,15 +95,27 @@ class Challenge(ABC):
 	def create_challenge_components(self) -> list[SceneElement]:
 		pass
 
+	@staticmethod
+	def get_restart_button() -> Button:
+		if Challenge._restart_btn is None:
+			Challenge._restart_btn = Button(SpriteAnimation(SpriteProvider.get("Btn_Restart.png"), [1], [64], (570, 60)), on_click=lambda: None).set_static()
+		return Challenge._restart_btn
+
+	@staticmethod
+	def get_close_button() -> Button:
+		if Challenge._close_btn is None:
+			Challenge._close_btn = Button(SpriteAnimation(SpriteProvider.get("Btn_Fermer.png"), [1], [64], (570, 60)), on_click=lambda: None).set_static()
+		return Challenge._close_btn
+
 	def create_reset_button(self) -> list[SceneElement]:
-		return [Challenge.restart_btn.set_click_callback(lambda: scene_manager.get_current_scene().start_challenge()).set_anchor("center").set_relative_pos((0.25, 0.95)).set_relative_width(0.25)]
+		return [Challenge.get_restart_button().set_click_callback(lambda: scene_manager.get_current_scene().start_challenge()).set_anchor("center").set_relative_pos((0.25, 0.95)).set_relative_width(0.25)]
 
 	def create_close_button(self) -> list[SceneElement]:
 		def close_handler():
 			self.reset_challenge()
 			scene_manager.get_current_scene().on_set_active()
 
-		return [Challenge.close_btn.set_anchor("center").set_relative_pos((0.75, 0.95)).set_click_callback(close_handler).set_relative_width(0.25)]
+		return [Challenge.get_close_button().set_anchor("center").set_relative_pos((0.75, 0.95)).set_click_callback(close_handler).set_relative_width(0.25)]
 
 	def create_control_buttons(self) -> list[SceneElement]:
 		return self.create_reset_button() + self.create_close_button()
@@ -98,13 +126,20 @@ class Challenge(ABC):
 	def create_chall_display_elements_and_lb(self) -> list[SceneElement]:
 		return self.create_title() + self.create_description() + [self._logo_sprite] + self.create_leaderboard()
 
+	def prewarm(self):
+		"""
+		Renders the elements of the challenge's display screen once, so that showing it doesn't stall on slicing and scaling sprites
+		"""
+		for element in self.create_chall_display_elements_and_lb():
+			element.compose()
+
 	def create_chall_session_elements(self) -> list[SceneElement]:
 		return self.create_title() + self.create_description() + self.create_challenge_components() + self.create_control_buttons()
 
 	def create_result_display_elements(self, result: float, improved: bool, best: float, rank: int) -> list[SceneElement]:
 		font_settings = FontSettings("fonts/Code.ttf", 75, ColorProvider.get('fg'))
-		keys_text = TextDisplay(font_settings, content=f"{self.get_result_header()}\n\nBest {self.get_result_header()}\n\nRank")
-		values_text = TextDisplay(font_settings, content=f":  {self.format_result(result)}\n\n:  {self.format_result(best)}\n\n:  #{rank}")
+		keys_text = TextDisplay(font_settings, content=f"{self.get_result_header()}\n\nBest {self.get_result_header()}\n\nRank").set_static()
+		values_text = TextDisplay(font_settings, content=f":  {self.format_result(result)}\n\n:  {self.format_result(best)}\n\n:  #{rank}").set_static()
 		if keys_text.width > 0.2 * C.DISPLAY_SIZE[0]:
 			keys_text.set_relative_width(0.2)
 		if values_text.width > 0.2 * C.DISPLAY_SIZE[0]:
@@ -136,8 +171,7 @@ class Challenge(ABC):
 		scene: GameScene = scene_manager.get_current_scene()
 		entry = LeaderboardEntry(scene.current_player, score)
 		improved = self.leaderboard.improves(entry)
-		if improved:
-			self.leaderboard.add_score(entry)
+		self.leaderboard.add_score(entry)
 		return improved, self.leaderboard.get_rank(scene.current_player)
 
 	@abstractmethod
@@ -155,6 +189,3 @@ class Challenge(ABC):
 	def reset_challenge(self):
 		pass
 
-
-Challenge.close_btn = Button(SpriteAnimation(SpriteProvider.get("Btn_Fermer.png"), [1], [64], (570, 60)), on_click=lambda: None)
-Challenge.restart_btn = Button(SpriteAnimation(SpriteProvider.get("Btn_Restart.png"), [1], [64], (570, 60)), on_click=lambda: None)
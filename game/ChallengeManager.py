@@ -1,4 +1,8 @@
+import time
+from typing import Callable, Union
+
 from game import Challenge
+from providers import LeaderboardProvider
 from game.types.AimChallenge import AimChallenge
 from game.types.ReactionTimeChallenge import ReactionTimeChallenge
 from game.types.SequenceMemoryChallenge import SequenceMemoryChallenge
@@ -6,27 +10,126 @@ from game.types.TimeMasterChallenge import TimeMasterChallenge
 from game.types.TypingChallenge import TypingChallenge
 
 
+class ChallengeEntry:
+	"""
+	Registered challenge, only built the first time it is needed
+	"""
+
+	def __init__(self, factory: Callable[[], Challenge], name: str, description: str, logo_file_name: str, descending_leaderboard: bool):
+		self._factory = factory
+		self._name = name
+		self._description = description
+		self._logo_file_name = logo_file_name
+		self._descending_leaderboard = descending_leaderboard
+		self._challenge: Union[Challenge, None] = None
+		self._build_time = 0.
+		self._warm = False
+
+	def get_name(self) -> str:
+		return self._name
+
+	def get_description(self) -> str:
+		return self._description
+
+	def get_logo_file_name(self) -> str:
+		return self._logo_file_name
+
+	def is_leaderboard_descending(self) -> bool:
+		return self._descending_leaderboard
+
+	def is_built(self) -> bool:
+		return self._challenge is not None
+
+	def get(self) -> Challenge:
+		if self._challenge is None:
+			start = time.perf_counter()
+			self._challenge = self._factory()
+			self._build_time = time.perf_counter() - start
+		return self._challenge
+
+	def set(self, challenge: Challenge) -> 'ChallengeEntry':
+		self._challenge = challenge
+		return self
+
+	def get_build_time(self) -> float:
+		"""
+		:return: Time spent building the challenge, in seconds
+		"""
+		return self._build_time
+
+	def is_warm(self) -> bool:
+		return self._warm
+
+	def prewarm(self):
+		self.get().prewarm()
+		self._warm = True
+
+
 class ChallengeManager:
 
+	# Challenges registered by init_challenges, in menu order
+	CHALLENGE_TYPES = TypingChallenge, AimChallenge, TimeMasterChallenge, ReactionTimeChallenge, SequenceMemoryChallenge
+
 	def __init__(self):
-		self._challenges = []
+		self._entries: list[ChallengeEntry] = []
+		self._prewarm_queue: list[int] = []
 
 	def get_challenge_count(self) -> int:
-		return len(self._challenges)
+		return len(self._entries)
+
+	def get_entries(self) -> list[ChallengeEntry]:
+		return self._entries
+
+	def get_entry(self, _id: int) -> ChallengeEntry:
+		return self._entries[_id]
 
 	def get_challenges(self) -> list[Challenge]:
-		return self._challenges
+		"""
+		:return: Every challenge, building those which weren't yet
+		"""
+		return [entry.get() for entry in self._entries]
 
 	def get_challenge(self, _id: int) -> Challenge:
-		return self._challenges[_id] or None
+		return self._entries[_id].get()
+
+	def add_challenge(self, c: Challenge):
+		self._entries.append(ChallengeEntry(type(c), c.get_name(), c.get_description(), c.LOGO, c.leaderboard.descending).set(c))
 
-	def add_challenge(self, c):
-		self._challenges.append(c)
+	def register(self, challenge_type: type[Challenge]):
+		"""
+		Registers a challenge from the metadata of its class, it is only built once shown or started
+		"""
+		self._entries.append(ChallengeEntry(challenge_type, challenge_type.NAME, challenge_type.DESCRIPTION, challenge_type.LOGO, challenge_type.DESCENDING_LEADERBOARD))
 
 	def init_challenges(self):
-		self.add_challenge(TypingChallenge())
-		self.add_challenge(AimChallenge())
-		self.add_challenge(TimeMasterChallenge())
-		self.add_challenge(ReactionTimeChallenge())
-		self.add_challenge(SequenceMemoryChallenge())
+		for challenge_type in self.CHALLENGE_TYPES:
+			self.register(challenge_type)
+		self.load_leaderboards()
+
+	def load_leaderboards(self):
+		"""
+		Loads the boards of every registered challenge together, without building the challenges
+		"""
+		LeaderboardProvider.load_all({Challenge.get_leaderboard_file_name(entry.get_name()): entry.is_leaderboard_descending() for entry in self._entries})
+
+	def prewarm(self, ids: list[int]):
+		"""
+		Queues challenges (e.g. those next to the one on screen) to be built and rendered by later prewarm_next calls
+		"""
+		self._prewarm_queue = [i for i in ids if 0 <= i < len(self._entries) and not self._entries[i].is_warm()]
+
+	def cancel_prewarm(self):
+		self._prewarm_queue.clear()
 
+	def prewarm_next(self) -> bool:
+		"""
+		Prewarms a single queued challenge, meant to be called once per frame while the screen is idle.
+		Runs on the main thread, as pygame surfaces and render caches are not shared across threads
+		:return: Whether a challenge was prewarmed
+		"""
+		while len(self._prewarm_queue) > 0:
+			entry = self._entries[self._prewarm_queue.pop(0)]
+			if not entry.is_warm():
+				entry.prewarm()
+				return True
+		return False
@@ -7,19 +7,26 @@ from elements.Types import SceneElement
 from game import Challenge
 from providers import ColorProvider, SpriteProvider
 from scene import scene_manager
-from utils import C
+from utils import C, FramePolicy
 
 
 class AimChallenge(Challenge):
 
+	NAME = "Sharp Aim"
+	DESCRIPTION = "Clique les bugs le plus rapidement possible"
+	LOGO = "AimChallengeLogo.png"
+	DESCENDING_LEADERBOARD = False
+	# Scored on time, clicks should be handled as soon as possible
+	FRAME_POLICY = FramePolicy(120, busy_loop=True)
+
 	TARGET_COUNT = 20
 
 	def __init__(self):
-		super().__init__("Sharp Aim", "Clique les bugs le plus rapidement possible", "AimChallengeLogo.png", False)
+		super().__init__(self.NAME, self.DESCRIPTION, self.LOGO, self.DESCENDING_LEADERBOARD)
 		self.target_hit = 0
 		self.last_clicked_frame = 0  # Prevent multiple clicks in a single frame
 
-		self.timer = Timer(FontSettings("resources/fonts/Code.ttf", 65, ColorProvider.get('fg')), clock=0, limit=[0, 5 * 60])
+		self.timer = Timer(FontSettings("resources/fonts/Code.ttf", 65, ColorProvider.get('fg')).set_glyph_atlas(), clock=0, limit=[0, 5 * 60])
 		self.timer.set_relative_width(0.33).set_anchor("center").set_relative_pos((0.5, 0.8))
 
 		self.target_count_display = TextDisplay(FontSettings("resources/fonts/Start.otf", 65, ColorProvider.get('fg')))
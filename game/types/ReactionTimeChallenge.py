@@ -1,5 +1,5 @@
 import random
-import time
+from typing import Union
 
 from elements.Attributes import SpriteAnimation, Animation, FontSettings
 from elements.Elements import Button, TextDisplay
@@ -7,11 +7,18 @@ from elements.Types import SceneElement
 from game import Challenge
 from providers import SpriteProvider, ColorProvider
 from scene import scene_manager
-from utils import C
+from utils import C, AppState, FramePolicy
 
 
 class ReactionTimeChallenge(Challenge):
 
+	NAME = "Quick as GPU"
+	DESCRIPTION = "Prouve que tes réflexes sont comparables à ceux d'une carte graphique"
+	LOGO = "ReactionTestLogo.png"
+	DESCENDING_LEADERBOARD = False
+	# Scored on reaction times, every millisecond between a click and the frame showing its effect counts
+	FRAME_POLICY = FramePolicy(240, busy_loop=True)
+
 	CLICK_FRAME_ID = 0
 
 	CLICK_COUNT = 5  # clicks
@@ -24,9 +31,9 @@ class ReactionTimeChallenge(Challenge):
 	STATE_GREEN = 2
 
 	def __init__(self):
-		super().__init__("Quick as GPU", "Prouve que tes réflexes sont comparables à ceux d'une carte graphique", "ReactionTestLogo.png", False)
+		super().__init__(self.NAME, self.DESCRIPTION, self.LOGO, self.DESCENDING_LEADERBOARD)
 		self.deltas = []
-		self.green_time = 0
+		self.green_time: Union[float, None] = None  # When green was first presented, perf_counter time
 		self.state = self.STATE_WAITING
 
 		self.action_btn = Button(SpriteAnimation(SpriteProvider.get("Challenges/ReactionTestRectangle.png"), [1, 1, 1], [64, 64, 64], None), on_click=self.handle_click)
@@ -60,6 +67,12 @@ class ReactionTimeChallenge(Challenge):
 
 		anim = self.action_btn.get_animation("red_time")
 		tout_anim = self.action_btn.get_animation("timeout")
+		clicked_at = self.action_btn.get_last_click_time()
+		if self.state == self.STATE_GREEN and (self.green_time is None or clicked_at <= self.green_time):
+			# Clicked before green could be seen
+			self.state = self.STATE_RED
+			tout_anim.reset()
+
 		if self.state == self.STATE_WAITING:
 			self.state = self.STATE_RED
 			anim._duration = self.MIN_RED_TIME + random.random() * (self.MAX_RED_TIME - self.MIN_RED_TIME)
@@ -72,7 +85,7 @@ class ReactionTimeChallenge(Challenge):
 			self.set_feedback(f"[{len(self.deltas)}/{self.CLICK_COUNT}] Trop tôt = {self.MAX_REACTION_TIME * 1000}ms")
 		elif self.state == self.STATE_GREEN:
 			self.state = self.STATE_WAITING
-			d = time.time() - self.green_time
+			d = clicked_at - self.green_time
 			self.register_delta(d)
 			tout_anim.reset()
 			self.set_feedback(f"[{len(self.deltas)}/{self.CLICK_COUNT}] Temps de réaction: {self.format_result(d)}")
@@ -93,9 +106,14 @@ class ReactionTimeChallenge(Challenge):
 	def set_green(self):
 		self.state = self.STATE_GREEN
 		self.refresh_action_sprite()
-		self.green_time = time.time()
+		self.green_time = None
+		AppState.on_next_present(self.set_green_time)
 		self.action_btn.get_animation("timeout").reset().start()
 
+	def set_green_time(self, t: float):
+		if self.state == self.STATE_GREEN and self.green_time is None:
+			self.green_time = t
+
 	def format_result(self, result: float) -> str:
 		return f"{1000*result:.0f} ms"
 
@@ -110,7 +128,7 @@ class ReactionTimeChallenge(Challenge):
 
 	def reset_challenge(self):
 		self.deltas = []
-		self.green_time = 0
+		self.green_time = None
 		self.state = self.STATE_WAITING
 		self.refresh_action_sprite()
 		self.feedback_text.set_content("")
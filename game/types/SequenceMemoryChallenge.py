@@ -3,8 +3,8 @@ import random
 import pygame
 
 from elements.Attributes import Animation, FontSettings
-from elements.Elements import DrawingGrid, TextDisplay, DrawingCell
-from elements.Types import SceneElement, Hoverable
+from elements.Elements import CompactDrawingGrid, TextDisplay
+from elements.Types import SceneElement
 from game import Challenge
 from providers import ColorProvider
 from scene import scene_manager
@@ -13,18 +13,23 @@ from utils import C
 
 class SequenceMemoryChallenge(Challenge):
 
+	NAME = "Sequence Mastermind"
+	DESCRIPTION = "Souviens-toi des séquences passant à l'écran"
+	LOGO = "SequenceLogo.png"
+	DESCENDING_LEADERBOARD = True
+
 	GRID_SIZE = 4
 	PLAY_STEP_DURATION = 0.5
 	SHOW_PLAY_DURATION = 0.2
 
 	def __init__(self):
-		super().__init__("Sequence Mastermind", "Souviens-toi des séquences passant à l'écran", "SequenceLogo.png", True)
+		super().__init__(self.NAME, self.DESCRIPTION, self.LOGO, self.DESCENDING_LEADERBOARD)
 		self.LAST_FRAME_CLICK = 0
 		self.sequence: list[tuple[int, int]] = []
 		self.played = 0
 		self.replayed_steps = 0
 
-		self.grid = DrawingGrid(
+		self.grid = CompactDrawingGrid(
 			(self.GRID_SIZE, self.GRID_SIZE),
 			hover_color=ColorProvider.get('bg'),
 			filled_color=pygame.Color(255, 255, 255)
@@ -32,9 +37,7 @@ class SequenceMemoryChallenge(Challenge):
 		self.grid.set_anchor("center").set_relative_pos((0.5, 0.5)).set_relative_height(0.5)
 		self.grid.add_animation("play_sequence", Animation(self.PLAY_STEP_DURATION).set_end_behavior(lambda anim: (anim.reverse(), self.play_next_step())))
 		self.grid.add_animation("show_play", Animation(self.SHOW_PLAY_DURATION).set_end_behavior(lambda anim: (self.set_grid_enabled(True), self.grid.clear_grid(), anim.reset())))
-		for el in self.grid.get_elements():
-			if isinstance(el, DrawingCell):
-				el.on("click", lambda: (self.grid.clear_grid(), self.append_step()) if len(self.sequence) == 0 else self.check_move())
+		self.grid.on("click", lambda: (self.grid.clear_grid(), self.append_step()) if len(self.sequence) == 0 else self.check_move())
 
 		font = FontSettings("resources/fonts/Start.otf", 50, ColorProvider.get('fg'))
 		self.feedback_text = TextDisplay(font, content="")
@@ -46,9 +49,6 @@ class SequenceMemoryChallenge(Challenge):
 
 	def set_grid_enabled(self, val: bool):
 		self.grid.set_enabled(val)
-		for el in self.grid.get_elements():
-			if isinstance(el, Hoverable):
-				el.set_enabled(val)
 
 	def append_step(self):
 		if len(self.sequence) == 0:
@@ -76,7 +76,7 @@ class SequenceMemoryChallenge(Challenge):
 			self.set_feedback(f"A toi de jouer! Séquence de taille {len(self.sequence)}")
 		else:
 			step_pos = self.sequence[self.replayed_steps]
-			self.grid.get_elements()[step_pos[1] * self.GRID_SIZE + step_pos[0]].set_filled(True)
+			self.grid.set_filled(step_pos, True)
 			self.replayed_steps += 1
 
 	def stop_replay(self):
@@ -108,15 +108,7 @@ class SequenceMemoryChallenge(Challenge):
 		if C.FRAME_ID == self.LAST_FRAME_CLICK:
 			return
 		self.LAST_FRAME_CLICK = C.FRAME_ID
-		cell_id = 0
-		for el in self.grid.get_elements():
-			if isinstance(el, DrawingCell):
-				if el.is_filled():
-					break
-				else:
-					cell_id += 1
-		x, y = cell_id % self.GRID_SIZE, cell_id // self.GRID_SIZE
-		if (x, y) != self.sequence[self.played]:
+		if self.grid.get_clicked_cell() != self.sequence[self.played]:
 			self.on_fail()
 		else:
 			self.on_step()
@@ -1,5 +1,3 @@
-import time
-
 from elements.Attributes import SpriteAnimation, FontSettings
 from elements.Elements import Button, TextDisplay
 from elements.Types import SceneElement
@@ -10,15 +8,20 @@ from scene import scene_manager
 
 class TimeMasterChallenge(Challenge):
 
+	NAME = "Time Master"
+	DESCRIPTION = "Fait confiance à ton horloge interne et met ta maitrise du temps à l'épreuve"
+	LOGO = "TimeMasterLogo.png"
+	DESCENDING_LEADERBOARD = True
+
 	def __init__(self):
-		super().__init__("Time Master", "Fait confiance à ton horloge interne et met ta maitrise du temps à l'épreuve", "TimeMasterLogo.png", True)
+		super().__init__(self.NAME, self.DESCRIPTION, self.LOGO, self.DESCENDING_LEADERBOARD)
 		self.clicked_times = []
 		self.target_times = [1, 5, 10, 30]
 		self.current_btn_id = 0
 
 		font = FontSettings("resources/fonts/Start.otf", 50, ColorProvider.get('fg'))
 		self.guideline_text = TextDisplay(font, content="Appuie une fois pour lancer un chronomètre et une deuxième fois après le temps indiqué sur le bouton. Plus tu es précis, plus tu gagnes de points !")
-		self.guideline_text.set_relative_width(0.9).set_anchor("center").set_relative_pos((0.5, 0.2))
+		self.guideline_text.set_static().set_relative_width(0.9).set_anchor("center").set_relative_pos((0.5, 0.2))
 
 		self.button = Button(SpriteAnimation(SpriteProvider.get("Challenges/TimeMasterButtons.png"), [1, 1, 1, 1], [64, 64, 64, 64], None), on_click=self.handle_click)
 		self.button.set_relative_width(0.25).set_anchor("center").set_relative_pos((0.5, 0.5))
@@ -27,12 +30,14 @@ class TimeMasterChallenge(Challenge):
 		self.feedback_text = TextDisplay(font.copy())
 
 	def handle_click(self):
+		# Timed from the input event itself, the callback only runs once the click animation is over
+		clicked_at = self.button.get_last_click_time()
 		if len(self.clicked_times) <= self.current_btn_id:
 			# First click on this button
-			self.clicked_times.append(time.time())
+			self.clicked_times.append(clicked_at)
 		else:
 			# Compute delta
-			delta = time.time() - self.clicked_times[self.current_btn_id]
+			delta = clicked_at - self.clicked_times[self.current_btn_id]
 			accuracy = max(0, 1 - abs(delta - self.target_times[self.current_btn_id]) / self.target_times[self.current_btn_id])
 			# Compute accuracy
 			self.clicked_times[int(self.current_btn_id)] = accuracy
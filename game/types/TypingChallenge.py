@@ -12,14 +12,19 @@ from utils import C
 
 class TypingChallenge(Challenge):
 
+	NAME = "Sweaty Keyboard"
+	DESCRIPTION = "Écris le texte affiché à l'écran le plus rapidement possible"
+	LOGO = "TypingLogo.png"
+	DESCENDING_LEADERBOARD = True
+
 	WORD_LENGTH = 5.5
 
 	def __init__(self):
-		super().__init__("Sweaty Keyboard", "Écris le texte affiché à l'écran le plus rapidement possible", "TypingLogo.png", True)
+		super().__init__(self.NAME, self.DESCRIPTION, self.LOGO, self.DESCENDING_LEADERBOARD)
 		self.start_time = None
-		self.text_area = TextArea(FontSettings("resources/fonts/ArialMonoMTProRegular.TTF", 22, ColorProvider.get('fg')), pattern_color=ColorProvider.get('placeholder'))
+		self.text_area = TextArea(FontSettings("resources/fonts/ArialMonoMTProRegular.TTF", 22, ColorProvider.get('fg')).set_glyph_atlas(), pattern_color=ColorProvider.get('placeholder'))
 		self.text_area.on("type", lambda: self.text_area.shake(6, 0.1, self.text_area.SHAKE_INSTANT))
-		self.text_area.on("type", lambda: self.set_start_time() if len(self.text_area.get_content()) == 1 else None)
+		self.text_area.on("type", lambda: self.set_start_time() if self.text_area.get_content_length() == 1 else None)
 		self.text_area.on("text_complete", lambda: scene_manager.get_current_scene().end_challenge())
 
 		self.wpm_display = TextDisplay(FontSettings("resources/fonts/Start.otf", 65, ColorProvider.get('fg')))
@@ -30,7 +35,7 @@ class TypingChallenge(Challenge):
 
 	def compute_wpm(self) -> float:
 		delta = time.time() - self.start_time
-		return 60 * (len(self.text_area.get_content()) / self.WORD_LENGTH) / delta
+		return 60 * (self.text_area.get_content_length() / self.WORD_LENGTH) / delta
 
 	def refresh_wpm(self):
 		if self.start_time is None or time.time() - self.start_time == 0:
@@ -0,0 +1,130 @@
+import json
+import mmap
+import os
+import struct
+from typing import Union
+
+import pygame
+
+
+class AssetArchive:
+	"""
+	Single file holding every asset ready to use: sprites as raw pixels, fonts and text files as they are.
+	Layout: magic, version and index length header, JSON index, then blobs aligned to ALIGNMENT bytes
+	"""
+
+	PATH = "resources/assets.pack"
+	MAGIC = b"HBPK"
+	VERSION = 1
+	HEADER = struct.Struct("<4sII")
+	ALIGNMENT = 16
+
+	SPRITES = "sprites"
+	FONTS = "fonts"
+	FILES = "files"
+
+	def __init__(self, path: str):
+		self._path = path
+		self._file = open(path, 'rb')
+		# Copy on write, so surfaces created on top of it can still be drawn onto
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+		magic, version, index_length = self.HEADER.unpack_from(self._map)
+		if magic != self.MAGIC or version != self.VERSION:
+			raise ValueError(f"{path} is not a version {self.VERSION} asset archive")
+		self._index: dict[str, dict[str, dict]] = json.loads(self._map[self.HEADER.size:self.HEADER.size + index_length].decode('utf-8'))
+
+	@staticmethod
+	def open(path: str = PATH) -> Union['AssetArchive', None]:
+		"""
+		:return: The archive at the given path, None if there is none (e.g. in development, where loose files are used)
+		"""
+		if not os.path.exists(path):
+			return None
+		return AssetArchive(path)
+
+	def close(self):
+		self._map.close()
+		self._file.close()
+
+	def _entry(self, kind: str, name: str) -> Union[dict, None]:
+		entry = self._index.get(kind, {}).get(name)
+		if entry is None:
+			return None
+		source = os.path.join("resources", kind, name)
+		if os.path.exists(source):
+			stat = os.stat(source)
+			if stat.st_size != entry["source_size"] or int(stat.st_mtime) != entry["source_mtime"]:
+				return None  # The loose file was edited since packing, prefer it
+		return entry
+
+	def _blob(self, entry: dict) -> memoryview:
+		return memoryview(self._map)[entry["offset"]:entry["offset"] + entry["length"]]
+
+	def has(self, kind: str, name: str) -> bool:
+		return self._entry(kind, name) is not None
+
+	def get_names(self, kind: str) -> list[str]:
+		return list(self._index.get(kind, {}))
+
+	def get_sprite(self, name: str) -> Union[pygame.Surface, None]:
+		"""
+		:return: Surface sharing the archive's memory, no decoding involved
+		"""
+		entry = self._entry(self.SPRITES, name)
+		if entry is None:
+			return None
+		return pygame.image.frombuffer(self._blob(entry), entry["size"], entry["format"])
+
+	def get_font_data(self, name: str) -> Union[bytes, None]:
+		entry = self._entry(self.FONTS, name)
+		return None if entry is None else bytes(self._blob(entry))
+
+	def get_file(self, name: str) -> Union[str, None]:
+		entry = self._entry(self.FILES, name)
+		return None if entry is None else str(self._blob(entry), 'utf-8')
+
+	@staticmethod
+	def pack(sprites: list[str], fonts: list[str], files: list[str], path: str = PATH) -> dict[str, dict[str, dict]]:
+		"""
+		Decodes sprites and writes them with fonts and files into a new archive, read from the resources folder
+		:return: The archive's index
+		"""
+		blobs: list[tuple[dict, bytes]] = []
+		index = {AssetArchive.SPRITES: {}, AssetArchive.FONTS: {}, AssetArchive.FILES: {}}
+
+		def add(kind: str, name: str, data: bytes, **fields):
+			stat = os.stat(os.path.join("resources", kind, name))
+			entry = index[kind][name] = dict(length=len(data), source_size=stat.st_size, source_mtime=int(stat.st_mtime), **fields)
+			blobs.append((entry, data))
+
+		for name in sprites:
+			surface = pygame.image.load(os.path.join("resources", AssetArchive.SPRITES, name))
+			pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+			add(AssetArchive.SPRITES, name, pygame.image.tobytes(surface, pixel_format), size=list(surface.get_size()), format=pixel_format)
+		for kind, names in ((AssetArchive.FONTS, fonts), (AssetArchive.FILES, files)):
+			for name in names:
+				with open(os.path.join("resources", kind, name), 'rb') as f:
+					add(kind, name, f.read())
+
+		def align(offset: int) -> int:
+			return -(-offset // AssetArchive.ALIGNMENT) * AssetArchive.ALIGNMENT
+
+		# Offsets are written in the index, whose length depends on them: lay out until it stops growing
+		index_length = 0
+		while True:
+			offset = align(AssetArchive.HEADER.size + index_length)
+			for entry, data in blobs:
+				entry["offset"] = offset
+				offset = align(offset + len(data))
+			encoded = json.dumps(index).encode('utf-8')
+			if len(encoded) <= index_length:
+				break
+			index_length = len(encoded)
+
+		with open(path, 'wb') as f:
+			f.write(AssetArchive.HEADER.pack(AssetArchive.MAGIC, AssetArchive.VERSION, index_length))
+			f.write(encoded.ljust(index_length))
+			for entry, data in blobs:
+				f.seek(entry["offset"])
+				f.write(data)
+		return index
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Any, Union
+
+from providers import SpriteProvider, FontProvider, FileProvider, load_sprite, load_font_data, load_file, to_display_format
+
+
+class AssetManifest:
+	"""
+	Lists the resources loaded at startup, by path relative to their resources folder
+	"""
+
+	SPRITES = "sprites"
+	FONTS = "fonts"
+	FILES = "files"
+
+	def __init__(self, sprites: list[str], fonts: list[str], files: list[str]):
+		self.sprites = sprites
+		self.fonts = fonts
+		self.files = files
+
+	@staticmethod
+	def load(path: str = "resources/manifest.json") -> 'AssetManifest':
+		with open(path, 'r', encoding='utf-8') as f:
+			content = json.loads(f.read())
+		return AssetManifest(content.get(AssetManifest.SPRITES, []), content.get(AssetManifest.FONTS, []), content.get(AssetManifest.FILES, []))
+
+	def get_assets(self) -> list[tuple[str, str]]:
+		"""
+		:return: (kind, name) pairs of every listed asset
+		"""
+		return [(AssetManifest.SPRITES, name) for name in self.sprites] + [(AssetManifest.FONTS, name) for name in self.fonts] + [(AssetManifest.FILES, name) for name in self.files]
+
+
+class AssetPreloader:
+	"""
+	Loads the assets of a manifest in a thread pool, from the asset archive if there is one, then hands them to their provider from the main thread,
+	converting sprites to the display format on the way
+	"""
+
+	def __init__(self, manifest: AssetManifest, workers: int = 4):
+		self._manifest = manifest
+		self._workers = max(1, min(workers, os.cpu_count() or 1))
+		self._executor: Union[ThreadPoolExecutor, None] = None
+		self._pending: dict[Future, tuple[str, str]] = {}
+		self._load_times: dict[str, float] = {}
+		self._asset_count = len(manifest.get_assets())
+
+	@staticmethod
+	def _decode(kind: str, name: str) -> tuple[Any, float]:
+		start = time.perf_counter()
+		if kind == AssetManifest.SPRITES:
+			data = load_sprite(name)
+		elif kind == AssetManifest.FONTS:
+			data = load_font_data(name)
+		else:
+			data = load_file(name)
+		return data, time.perf_counter() - start
+
+	def _store(self, kind: str, name: str, data: Any, elapsed: float):
+		start = time.perf_counter()
+		if kind == AssetManifest.SPRITES:
+			SpriteProvider.set(name, to_display_format(data))
+		elif kind == AssetManifest.FONTS:
+			FontProvider.set_file_data("resources/fonts/" + name, data)
+		else:
+			FileProvider.set(name, data)
+		self._load_times[kind + "/" + name] = elapsed + time.perf_counter() - start
+
+	def start(self) -> 'AssetPreloader':
+		if self._executor is not None:
+			return self
+		self._executor = ThreadPoolExecutor(self._workers, "asset-preloader")
+		for kind, name in self._manifest.get_assets():
+			self._pending[self._executor.submit(self._decode, kind, name)] = kind, name
+		if len(self._pending) == 0:
+			self._executor.shutdown()
+		return self
+
+	def poll(self, timeout: float = 0.) -> 'AssetPreloader':
+		"""
+		Stores the assets decoded so far, waiting at most timeout seconds for one to be ready.
+		Must be called from the main thread, as converting surfaces requires the display
+		"""
+		if len(self._pending) == 0:
+			return self
+		done, _ = wait(self._pending, timeout, FIRST_COMPLETED)
+		for future in done:
+			kind, name = self._pending.pop(future)
+			self._store(kind, name, *future.result())
+		if len(self._pending) == 0:
+			self._executor.shutdown()
+		return self
+
+	def run(self, on_progress: Callable[[float], Any], interval: float = 1 / 60) -> 'AssetPreloader':
+		"""
+		Loads every asset, blocking until done
+		:param on_progress: Called with the loaded portion of assets whenever some are loaded, and at least every interval seconds, e.g. to draw a loading screen
+		"""
+		self.start()
+		on_progress(self.get_progress())
+		while not self.is_done():
+			self.poll(interval)
+			on_progress(self.get_progress())
+		return self
+
+	def is_done(self) -> bool:
+		return self._executor is not None and len(self._pending) == 0
+
+	def get_progress(self) -> float:
+		if self._asset_count == 0:
+			return 1.
+		return len(self._load_times) / self._asset_count
+
+	def get_load_times(self) -> dict[str, float]:
+		"""
+		:return: Time spent loading each asset so far (decoding and conversion), in seconds
+		"""
+		return self._load_times
@@ -1,13 +1,10 @@
-import os
-from typing import Callable, Any
+from typing import Union
 
 import pygame
-from utils import Provider, LoadOnGetProvider
-
-
-def __init_fonts():
-	for file_name in os.listdir("resources/fonts"):
-		FontProvider.set(file_name, pygame.font.Font("resources/fonts/" + file_name, 32))
+from providers.Archive import AssetArchive
+from shaders import ShaderPipeline
+from utils import Provider, LoadOnGetProvider, LRUCache, ScaledSurfaceCache, FontRegistry, surface_bytes
+from utils.leaderboard import LeaderboardRegistry
 
 
 def __load_colors():
@@ -43,18 +40,64 @@ def __load_colors():
 	ColorProvider.set("failure", pygame.Color(0xf7, 0x78, 0x5c))
 
 
+def to_display_format(surface: pygame.Surface) -> pygame.Surface:
+	"""
+	:return: The surface converted to the display pixel format, which blits faster, or itself while there is no display
+	"""
+	if pygame.display.get_surface() is None:
+		return surface
+	return surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+
+
 def init():
+	global _archive
 	pygame.font.init()
-	__init_fonts()
 	__load_colors()
+	_archive = AssetArchive.open()
+
+
+# Assets packed by tools/pack_assets.py for release builds, loose resource files are used when absent
+_archive: Union[AssetArchive, None] = None
+
+
+def get_archive() -> Union[AssetArchive, None]:
+	return _archive
 
 
-FontProvider: Provider[str, pygame.font.Font] = Provider[str, pygame.font.Font]()
+def load_sprite(name: str) -> pygame.Surface:
+	"""
+	:return: The sprite as stored, not yet converted to the display format
+	"""
+	if _archive is not None and _archive.has(AssetArchive.SPRITES, name):
+		return _archive.get_sprite(name)
+	return pygame.image.load("resources/sprites/" + name)
+
+
+def load_font_data(name: str) -> bytes:
+	if _archive is not None and _archive.has(AssetArchive.FONTS, name):
+		return _archive.get_font_data(name)
+	with open("resources/fonts/" + name, 'rb') as f:
+		return f.read()
+
+
+def load_file(name: str) -> str:
+	if _archive is not None and _archive.has(AssetArchive.FILES, name):
+		return _archive.get_file(name)
+	return read_file("resources/files/" + name)
+
+
+# Font instances, keyed by (font path, font size, style)
+FontProvider: FontRegistry = FontRegistry()
 SpriteProvider: Provider[str, pygame.Surface] = LoadOnGetProvider[str, pygame.Surface](
-	lambda x: pygame.image.load("resources/sprites/" + x)
+	lambda x: to_display_format(load_sprite(x))
 )
 ColorProvider: Provider[str, pygame.color.Color] = Provider[str, pygame.color.Color]()
-ShaderProvider: Provider[str, Callable[[pygame.Surface, float], Any]] = Provider[str, Callable[[pygame.Surface, float], Any]]()
+ShaderProvider: ShaderPipeline = ShaderPipeline()
+
+# Rendered text lines, keyed by (font path, font size, style, color, antialias, glyph atlas, text)
+TextSurfaceCache: LRUCache[tuple, pygame.Surface] = LRUCache[tuple, pygame.Surface](4096, 48 * 1024 * 1024, surface_bytes)
+# Zoomed element surfaces, keyed by (source surface, source version, zoom rounded to 1/200th)
+ScaleCache: ScaledSurfaceCache = ScaledSurfaceCache(0.005, 1024, 64 * 1024 * 1024)
 
 
 def read_file(path: str) -> str:
@@ -62,4 +105,5 @@ def read_file(path: str) -> str:
 		return f.read()
 
 
-FileProvider: Provider[str, str] = LoadOnGetProvider[str, str](lambda x: read_file("resources/files/" + x))
+FileProvider: Provider[str, str] = LoadOnGetProvider[str, str](load_file)
+LeaderboardProvider: LeaderboardRegistry = LeaderboardRegistry()
@@ -4,13 +4,22 @@ import pygame
 from abc import ABC
 from providers import ColorProvider
 from elements.Types import SceneElement, Hoverable, Typable, ElementGroup
+from utils import C, FramePolicy
 
 
 class Scene(ABC):
 
+	FULL_REDRAW_THRESHOLD = 0.6  # Portion of the screen above which damaged regions are not worth tracking
+	FRAME_POLICY = FramePolicy()
+
 	def __init__(self):
 		self._elements: list[SceneElement] = []
 		self._hovered_element: Union[Hoverable, None] = None
+		self._drawn_elements: dict[int, SceneElement] = {}
+		self._full_redraw = True
+		self._pending_damage: list[pygame.Rect] = []
+		self._background: Union[pygame.Surface, None] = None
+		self._background_elements: list[SceneElement] = []
 
 	def add_element(self, element: SceneElement, only_if_absent: bool = False):
 		if only_if_absent and element in self._elements:
@@ -35,14 +44,142 @@ class Scene(ABC):
 	def get_elements(self) -> list[SceneElement]:
 		return self._elements
 
+	def get_frame_policy(self) -> FramePolicy:
+		"""
+		:return: Frame pacing the scene needs in its current state, checked every frame
+		"""
+		return self.FRAME_POLICY
+
 	def update(self, dt: float):
 		for element in self._elements:
 			element.tick(dt)
 
-	def draw(self, where: pygame.Surface):
-		where.fill(ColorProvider.get('bg'))
-		for element in self._elements:
-			element.draw(where)
+	def invalidate(self, regions: Union[list[pygame.Rect], None] = None):
+		"""
+		Forces regions of the next frame to be redrawn (e.g. after something else drew on the screen)
+		:param regions: Regions to repaint, the whole screen if None
+		"""
+		if regions is None:
+			self._full_redraw = True
+		else:
+			self._pending_damage += regions
+
+	def is_background_element(self, element: SceneElement) -> bool:
+		"""
+		Static elements are composited once into the background layer, below every other element, unless being hovered
+		"""
+		return element.is_static() and not (isinstance(element, Hoverable) and element.is_hovered())
+
+	def draw(self, where: pygame.Surface) -> list[pygame.Rect]:
+		"""
+		:return: Regions of the screen that were repainted
+		"""
+		screen_rect = where.get_rect()
+		if not C.DIRTY_RECT_RENDERING and not any(element.is_static() for element in self._elements):
+			self._forget_drawn_elements()
+			self._pending_damage = []
+			where.fill(ColorProvider.get('bg'))
+			for element in self._elements:
+				element.draw(where)
+			return [screen_rect]
+
+		frames = [(element, element.compose()) for element in self._elements]
+		damaged: set[int] = set()
+		damage = self._collect_damage(frames, damaged)
+		layer = [(element, frame) for element, frame in frames if self.is_background_element(element)]
+		damage += self._refresh_background(where, layer, damaged)
+		damage += self._pending_damage
+		self._pending_damage = []
+		dynamic = [(element, frame) for element, frame in frames if not self.is_background_element(element)]
+
+		if not C.DIRTY_RECT_RENDERING:
+			self._paint(where, screen_rect, dynamic)
+			return [screen_rect]
+
+		damage = [rect.clip(screen_rect) for rect in self._merge_rects(damage) if rect.colliderect(screen_rect)]
+		if self._full_redraw or sum(rect.width * rect.height for rect in damage) > self.FULL_REDRAW_THRESHOLD * screen_rect.width * screen_rect.height:
+			self._full_redraw = False
+			damage = [screen_rect]
+
+		for rect in damage:
+			where.set_clip(rect)
+			self._paint(where, rect, dynamic)
+		where.set_clip(None)
+		return damage
+
+	def _paint(self, where: pygame.Surface, rect: pygame.Rect, dynamic: list[tuple[SceneElement, list]]):
+		if self._background is not None:
+			where.blit(self._background, rect, rect)
+		else:
+			where.fill(ColorProvider.get('bg'), rect)
+		for element, frame in dynamic:
+			bounds = element.get_drawn_bounds()
+			if bounds is not None and bounds.colliderect(rect):
+				where.blits(frame, doreturn=False)
+
+	def _refresh_background(self, where: pygame.Surface, layer: list[tuple[SceneElement, list]], damaged: set[int]) -> list[pygame.Rect]:
+		"""
+		Composites static elements into the cached background surface whenever one of them changes
+		:return: Regions affected by elements entering or leaving the background layer
+		"""
+		if len(layer) == 0:
+			self._background, self._background_elements = None, []
+			return []
+		elements = [element for element, _ in layer]
+		if self._background is not None and list(map(id, elements)) == list(map(id, self._background_elements)) and not any(id(element) in damaged for element in elements):
+			return []
+
+		changed = {id(element): element for element in elements}
+		for element in self._background_elements:
+			if id(element) in changed:
+				del changed[id(element)]
+			else:
+				changed[id(element)] = element
+
+		if self._background is None or self._background.get_size() != where.get_size():
+			self._background = pygame.Surface(where.get_size(), 0, where)
+		self._background.fill(ColorProvider.get('bg'))
+		for _, frame in layer:
+			self._background.blits(frame, doreturn=False)
+		self._background_elements = elements
+		return [element.get_drawn_bounds() for element in changed.values() if element.get_drawn_bounds() is not None]
+
+	def _collect_damage(self, frames: list[tuple[SceneElement, list]], damaged: set[int]) -> list[pygame.Rect]:
+		"""
+		:param damaged: Filled with the ids of elements that changed since the last frame
+		"""
+		damage = []
+		drawn = {}
+		for element, frame in frames:
+			element_damage = element.collect_damage(frame)
+			if len(element_damage) > 0:
+				damage += element_damage
+				damaged.add(id(element))
+			drawn[id(element)] = element
+		for key, element in self._drawn_elements.items():
+			if key not in drawn:
+				bounds = element.forget_damage()
+				if bounds is not None:
+					damage.append(bounds)
+		self._drawn_elements = drawn
+		return damage
+
+	def _forget_drawn_elements(self):
+		for element in self._drawn_elements.values():
+			element.forget_damage()
+		self._drawn_elements.clear()
+		self._background, self._background_elements = None, []
+
+	@staticmethod
+	def _merge_rects(rects: list[pygame.Rect]) -> list[pygame.Rect]:
+		merged: list[pygame.Rect] = []
+		for rect in rects:
+			i = rect.collidelist(merged)
+			while i != -1:
+				rect = rect.union(merged.pop(i))
+				i = rect.collidelist(merged)
+			merged.append(rect)
+		return merged
 
 	def on_mouse_enter_actions(self):
 		pass
@@ -26,6 +26,7 @@ class SceneManager(Provider[int, Scene], metaclass=Singleton):
 		if self._previous_scene is not None:
 			self._previous_scene.on_set_inactive()
 		if self._current_scene is not None:
+			self._current_scene.invalidate()
 			self._current_scene.on_set_active()
 
 	def set_cursor(self, pos: tuple[int, int]):
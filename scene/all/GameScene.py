@@ -3,17 +3,22 @@ from elements.Elements import Button, TextArea, TextDisplay, PulsingImage, Sprit
 from game import challenge_manager
 from providers import ColorProvider, SpriteProvider
 from scene import Scene
-from utils import C
+from utils import C, FramePolicy
 
 
 class GameScene(Scene):
 
 	CONTROL_MARGIN = 30  # px
 
+	# Browsing challenges and reading results, the kiosk may be left alone on those
+	BROWSE_FRAME_POLICY = FramePolicy(60, idle_frame_rate=20, idle_timeout=15)
+	RESULT_FRAME_POLICY = FramePolicy(30, idle_frame_rate=10, idle_timeout=5)
+
 	def __init__(self):
 		super().__init__()
 		self.current_challenge = 0
 		self.current_player = ""
+		self._frame_policy = self.BROWSE_FRAME_POLICY
 
 		# Create comm elements
 		self.honeypot_logo = PulsingImage(
@@ -21,10 +26,10 @@ class GameScene(Scene):
 		).set_pulse_settings(PulseSettings(period=0.83, amplitude=0.05, base=(1, 1))).set_relative_height(0.33).set_anchor("center").set_relative_pos((0.5, 0.25))
 		self.discord_qr_code = Sprite(
 			SpriteAnimation(SpriteProvider.get("HoneyPot_QR_Discord.png"), [1], [60], None)
-		).set_relative_height(0.33).set_anchor("center").set_relative_pos((0.35, 0.7))
+		).set_static().set_relative_height(0.33).set_anchor("center").set_relative_pos((0.35, 0.7))
 		self.insta_qr_code = Sprite(
 			SpriteAnimation(SpriteProvider.get("HoneyPot_QR_Insta.png"), [1], [60], None)
-		).set_relative_height(0.33).set_anchor("center").set_relative_pos((0.65, 0.7))
+		).set_static().set_relative_height(0.33).set_anchor("center").set_relative_pos((0.65, 0.7))
 
 		# Create Challenge Controls
 		self.start_chall_btn = Button(SpriteAnimation(SpriteProvider.get("Challenges/Btn_StartChallenge.png"), [20], [0.05], None).set_mode(SpriteAnimation.MODE_CIRCULAR), on_click=self.display_nickname_input_screen)
@@ -33,6 +38,8 @@ class GameScene(Scene):
 		self.prev_chall_btn = Button(SpriteAnimation(SpriteProvider.get("Arrows.png"), [1, 1], [64, 64], (228, int(599/2) + 1)), on_click=lambda: self.display_prev_challenge())
 		self.next_chall_btn = Button(SpriteAnimation(SpriteProvider.get("Arrows.png"), [1, 1], [64, 64], (228, int(599/2) + 1)), on_click=lambda: self.display_next_challenge())
 		self.prev_chall_btn.get_spritesheet().set_animation_row(1)
+		self.prev_chall_btn.set_static()
+		self.next_chall_btn.set_static()
 
 		self.prev_chall_btn.on("mouse_enter", lambda: C.glitch())
 		self.prev_chall_btn.on("mouse_leave", lambda: C.unglitch())
@@ -43,7 +50,7 @@ class GameScene(Scene):
 
 		# Create name input
 		font_settings = FontSettings("resources/fonts/Code.ttf", 65, ColorProvider.get('fg'))
-		self.username_prompt = TextDisplay(font_settings, content="Username:").set_max_width(C.DISPLAY_SIZE[0]).set_anchor("center").set_relative_pos((0.5, 0.5))
+		self.username_prompt = TextDisplay(font_settings, content="Username:").set_static().set_max_width(C.DISPLAY_SIZE[0]).set_anchor("center").set_relative_pos((0.5, 0.5))
 		self.username_input = TextArea(font_settings).set_max_width(C.DISPLAY_SIZE[0]).set_anchor("center").set_relative_pos((0.5, 0.5))
 		self.username_input.move((0, 1.5 * self.username_prompt.height))
 		self.username_input.on("type", lambda: self.add_element(self.start_chall_btn, True) if len(self.username_input.get_content()) >= 5 else self.rm_element(self.start_chall_btn))
@@ -58,6 +65,13 @@ class GameScene(Scene):
 	def on_set_active(self):
 		self.display_current_challenge()
 
+	def get_frame_policy(self) -> FramePolicy:
+		return self._frame_policy
+
+	def update(self, dt: float):
+		super().update(dt)
+		challenge_manager.prewarm_next()
+
 	def display_prev_challenge(self):
 		self.current_challenge = (self.current_challenge - 1) % (challenge_manager.get_challenge_count() + 1)
 		self.display_current_challenge()
@@ -67,6 +81,9 @@ class GameScene(Scene):
 		self.display_current_challenge()
 
 	def display_current_challenge(self):
+		screen_count = challenge_manager.get_challenge_count() + 1
+		challenge_manager.prewarm([(self.current_challenge + 1) % screen_count, (self.current_challenge - 1) % screen_count])
+		self._frame_policy = self.BROWSE_FRAME_POLICY
 		self.get_elements().clear()
 		self.add_element(self.prev_chall_btn)
 		self.add_element(self.next_chall_btn)
@@ -81,8 +98,10 @@ class GameScene(Scene):
 			self.start_chall_btn.set_click_callback(self.display_nickname_input_screen)
 
 	def display_nickname_input_screen(self):
+		challenge_manager.cancel_prewarm()
 		chall = challenge_manager.get_challenge(self.current_challenge)
 
+		self._frame_policy = self.FRAME_POLICY
 		self.get_elements().clear()
 
 		self.add_element(self.username_prompt)
@@ -100,6 +119,7 @@ class GameScene(Scene):
 
 		chall = challenge_manager.get_challenge(self.current_challenge)
 		chall.reset_challenge()
+		self._frame_policy = chall.FRAME_POLICY
 		self.add_elements(chall.create_chall_session_elements())
 
 	def end_challenge(self):
@@ -107,6 +127,7 @@ class GameScene(Scene):
 		result = chall.get_session_result()
 		improved, rank = chall.submit_score(result)
 
+		self._frame_policy = self.RESULT_FRAME_POLICY
 		self.get_elements().clear()
 		self.add_elements(chall.create_result_display_elements(result, improved, result if improved else chall.leaderboard.get_prev_entry(self.current_player).get_score(), rank))
 
@@ -0,0 +1,54 @@
+import math
+from typing import Union
+
+import pygame
+
+from providers import ColorProvider, FontProvider
+from shaders.Shader import Shader
+from utils import FrameTimings, AppState
+
+
+class FrameStatsOverlay(Shader):
+	"""
+	Draws the percentiles of recent frame timings in a corner of the screen, to spot a struggling machine at a glance.
+	Runs last in the shader pipeline so that it is neither glitched nor part of the scene's damage tracking
+	"""
+
+	FONT = "resources/fonts/ArialMonoMTProRegular.TTF", 16
+	REFRESH_INTERVAL = 0.5  # s
+	MARGIN = 10  # px
+	PADDING = 6  # px
+	BACKGROUND = 0, 0, 0, 230
+	BUDGETED = False  # Never skipped, it is the tool telling the frame budget is blown
+
+	def __init__(self, timings: FrameTimings):
+		self.timings = timings
+		self._surface: Union[pygame.Surface, None] = None
+		self._rendered_at = -math.inf
+
+	def get_lines(self) -> list[str]:
+		target = f"{AppState.get_target_frame_rate():.0f}" + (" idle" if AppState.is_idle() else "") + (" busy" if AppState.get_frame_policy().is_busy_loop() else "")
+		lines = [f"{self.timings.get_frame_rate():6.1f} fps  (target {target}, {self.timings.get_count()} frames, ms)", f"{'':<8}" + "".join(f"{name:>7}" for name in ("p50", "p95", "p99", "worst"))]
+		for phase, stats in self.timings.get_stats().items():
+			lines.append(f"{phase:<8}" + "".join(f"{value:7.2f}" for value in stats.values()))
+		return lines
+
+	def render(self) -> pygame.Surface:
+		font = FontProvider.get_font(*self.FONT)
+		lines = [font.render(line, True, ColorProvider.get('fg')) for line in self.get_lines()]
+		surface = pygame.Surface((max(line.get_width() for line in lines) + 2 * self.PADDING, sum(line.get_height() for line in lines) + 2 * self.PADDING), pygame.SRCALPHA)
+		surface.fill(self.BACKGROUND)
+		y = self.PADDING
+		for line in lines:
+			surface.blit(line, (self.PADDING, y))
+			y += line.get_height()
+		return surface
+
+	def apply(self, screen: pygame.Surface, t: float) -> list[pygame.Rect]:
+		# Timings are only rendered a few times per second, which keeps the overlay cheap and its digits readable
+		if self._surface is None or abs(t - self._rendered_at) >= self.REFRESH_INTERVAL:
+			self._surface = self.render()
+			self._rendered_at = t
+		rect = self._surface.get_rect(topright=(screen.get_width() - self.MARGIN, self.MARGIN))
+		screen.blit(self._surface, rect)
+		return [rect]
@@ -0,0 +1,100 @@
+import random
+from typing import Union
+
+import numpy as np
+import pygame
+
+from shaders.Shader import Shader
+from utils import C
+
+Block = tuple[tuple[int, int], tuple[int, int], tuple[int, int]]
+
+
+class GlitchShader(Shader):
+
+	DELAY = 15  # Glitch happens every DELAY * DURATION seconds
+	DURATION = 0.5  # s
+	DISPARITY = 10, 25  # Random activation offset, in tenths of seconds
+	BLOCK_UNIT_SIZE = 10, 10  # px
+	BLOCK_COUNT = 20, 35
+
+	def __init__(self, seed: Union[int, None] = None, vectorized: bool = False):
+		"""
+		:param seed: Seeds the shader's random generator, for reproducible benchmarks
+		:param vectorized: Swap blocks in a single NumPy operation instead of blitting copies of them
+		"""
+		self.rng = random.Random(seed)
+		self.vectorized = vectorized
+		self.block_count = self.BLOCK_COUNT
+
+	def is_active(self, t: float) -> bool:
+		if C.FORCE_GLITCH_SHADER:
+			return True
+		# Activation offsets only range between DISPARITY bounds, skip drawing one when it can't lead to an activation
+		period = self.DELAY * self.DURATION
+		phase = t % period
+		if not period - self.DISPARITY[1] / 10 - self.DURATION / 2 <= phase <= period - self.DISPARITY[0] / 10 + self.DURATION / 2:
+			return False
+		return round((t + self.rng.randint(self.DISPARITY[0], self.DISPARITY[1]) / 10) / self.DURATION) % self.DELAY == 0
+
+	def generate_blocks(self, size: tuple[int, int]) -> list[Block]:
+		"""
+		:return: (block size, position a, position b) of the block pairs to swap
+		"""
+		blocks = []
+		for _ in range(self.rng.randint(self.block_count[0], self.block_count[1])):
+			block_size = self.rng.randint(2, 8) * self.BLOCK_UNIT_SIZE[0], self.BLOCK_UNIT_SIZE[1]
+			pos_a = self.rng.randint(block_size[0] * 2, size[0] - block_size[0] * 2), self.rng.randint(block_size[1] * 2, size[1] - block_size[1] * 2)
+			pos_b = int(pos_a[0] + 0.5 * block_size[0] * (-1 if self.rng.random() < 0.5 else 1)), pos_a[1] + block_size[1] * self.rng.randint(-1, 1)
+			blocks.append((block_size, pos_a, pos_b))
+		return blocks
+
+	@staticmethod
+	def apply_blits(screen: pygame.Surface, blocks: list[Block]):
+		for block_size, pos_a, pos_b in blocks:
+			frame_a, frame_b = screen.subsurface(pos_a, block_size).copy(), screen.subsurface(pos_b, block_size).copy()
+			screen.blit(frame_a, pos_b)
+			screen.blit(frame_b, pos_a)
+
+	@staticmethod
+	def apply_pixels(screen: pygame.Surface, blocks: list[Block]):
+		pixels = pygame.surfarray.pixels2d(screen)  # View on the screen's pixels, no copy
+		if pixels.strides[1] != pixels.strides[0] * screen.get_width():
+			del pixels
+			GlitchShader.apply_blits(screen, blocks)  # Padded rows, can't be indexed as a flat array
+			return
+
+		# Flat pixel indices of every block, built from a template padded to the largest block and masked per block
+		layout = np.array([(w, h, ax, ay, bx, by) for (w, h), (ax, ay), (bx, by) in blocks], dtype=np.int32)
+		widths, heights = layout[:, 0, None, None], layout[:, 1, None, None]
+		dy, dx = np.ogrid[:heights.max(), :widths.max()]
+		inside = (dx < widths) & (dy < heights)
+		offsets = (dy * screen.get_width() + dx).astype(np.int32)
+		a = ((layout[:, 3] * screen.get_width() + layout[:, 2])[:, None, None] + offsets)[inside]
+		b = ((layout[:, 5] * screen.get_width() + layout[:, 4])[:, None, None] + offsets)[inside]
+
+		pixels = pixels.T.reshape(-1)  # Rows are packed, this is still a view
+		frame_a, frame_b = pixels[a], pixels[b]
+		pixels[b] = frame_a
+		pixels[a] = frame_b
+		del pixels  # Unlocks the screen
+
+	def apply(self, screen: pygame.Surface, t: float = 0) -> list[pygame.Rect]:
+		blocks = self.generate_blocks(screen.get_size())
+		if self.vectorized and screen.get_bytesize() == 4:
+			self.apply_pixels(screen, blocks)
+		else:
+			self.apply_blits(screen, blocks)
+		return [pygame.Rect(pos, block_size) for block_size, pos_a, pos_b in blocks for pos in (pos_a, pos_b)]
+
+	def degrade(self) -> bool:
+		if self.block_count[1] <= 1:
+			return False
+		self.block_count = max(1, self.block_count[0] // 2), max(1, self.block_count[1] // 2)
+		return True
+
+	def upgrade(self) -> bool:
+		if self.block_count == self.BLOCK_COUNT:
+			return False
+		self.block_count = min(self.BLOCK_COUNT[0], 2 * self.block_count[0]), min(self.BLOCK_COUNT[1], 2 * self.block_count[1])
+		return True
@@ -0,0 +1,207 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Union, Callable, Any
+
+import pygame
+
+from utils import Provider
+
+
+class Shader(ABC):
+
+	BUDGETED = True  # Whether going over the pipeline's frame budget degrades or skips the shader
+
+	def is_active(self, t: float) -> bool:
+		"""
+		Checked every frame before applying the shader, must be cheap
+		"""
+		return True
+
+	@abstractmethod
+	def apply(self, screen: pygame.Surface, t: float) -> Union[list[pygame.Rect], None]:
+		"""
+		:return: Regions of the screen the shader drew on, None if it may have touched the whole screen
+		"""
+		pass
+
+	def degrade(self) -> bool:
+		"""
+		Called when the shader goes over its frame budget
+		:return: Whether the shader managed to lower its cost, it is skipped for a while otherwise
+		"""
+		return False
+
+	def upgrade(self) -> bool:
+		"""
+		Called when the shader runs well under its frame budget, after having been degraded
+		:return: Whether the shader raised its quality back
+		"""
+		return False
+
+
+class FunctionShader(Shader):
+
+	def __init__(self, function: Callable[[pygame.Surface, float], Any]):
+		"""
+		:param function: Full screen shader, returning a truthy value when it drew something
+		"""
+		self.function = function
+
+	def apply(self, screen: pygame.Surface, t: float) -> Union[list[pygame.Rect], None]:
+		return None if self.function(screen, t) else []
+
+
+class ShaderStats:
+
+	EMA_FACTOR = 0.1
+
+	def __init__(self):
+		self.last_ms = 0.
+		self.average_ms = 0.
+		self.runs = 0
+		self.samples = 0  # Runs averaged since the shader's quality last changed
+		self.skipped = 0
+		self.degraded = 0
+		self.upgraded = 0
+
+	def register(self, duration_ms: float, cap_ms: float = float("inf")):
+		"""
+		:param cap_ms: Largest duration averaged, so that a single stall weighs no more than a slightly slow frame
+		"""
+		self.last_ms = duration_ms
+		self.samples += 1
+		# Plain mean until there are enough samples for the moving average not to lean on the first one
+		factor = max(self.EMA_FACTOR, 1 / self.samples)
+		self.average_ms += factor * (min(duration_ms, cap_ms) - self.average_ms)
+		self.runs += 1
+
+	def restart_average(self):
+		"""
+		Forgets the timings taken at the shader's previous quality
+		"""
+		self.samples = 0
+
+	def as_dict(self) -> dict[str, float]:
+		return {"last_ms": self.last_ms, "average_ms": self.average_ms, "runs": self.runs, "skipped": self.skipped, "degraded": self.degraded, "upgraded": self.upgraded}
+
+
+class ShaderPipeline(Provider[str, Shader]):
+
+	UPGRADE_RATIO = 0.5  # Portion of the budget a shader's average must fall under for its quality to be raised back
+	SAMPLE_CAP_RATIO = 2  # Portion of the budget above which a run counts as that much in the average
+
+	def __init__(self, budget_ms: float = 2., cooldown_frames: int = 120, min_samples: int = 30):
+		"""
+		:param budget_ms: Time a single shader may take per frame before being degraded or skipped
+		:param cooldown_frames: Frames during which a shader that can't be degraded any further is skipped after going over budget,
+		and runs of a shader between two changes of its quality
+		:param min_samples: Runs a shader's average must be made of before its quality is changed
+		"""
+		super().__init__()
+		self.budget_ms = budget_ms
+		self.cooldown_frames = cooldown_frames
+		self.min_samples = min_samples
+		self._order: list[str] = []
+		self._disabled: set[str] = set()
+		self._cooldowns: dict[str, int] = {}
+		self._stats: dict[str, ShaderStats] = {}
+
+	def set(self, key: str, value: Union[Shader, Callable[[pygame.Surface, float], Any]], position: Union[int, None] = None):
+		"""
+		:param position: Index in the pipeline, shaders are appended at the end by default
+		"""
+		if not isinstance(value, Shader):
+			value = FunctionShader(value)
+		super().set(key, value)
+		if key in self._order:
+			self._order.remove(key)
+		self._order.insert(len(self._order) if position is None else position, key)
+		self._stats[key] = ShaderStats()
+
+	def rm(self, key: str):
+		super().rm(key)
+		if key in self._order:
+			self._order.remove(key)
+		self._disabled.discard(key)
+		self._cooldowns.pop(key, None)
+		self._stats.pop(key, None)
+
+	def clear(self):
+		super().clear()
+		self._order.clear()
+		self._disabled.clear()
+		self._cooldowns.clear()
+		self._stats.clear()
+
+	def get_order(self) -> list[str]:
+		return self._order
+
+	def set_order(self, order: list[str]):
+		if sorted(order) != sorted(self._order):
+			raise ValueError("Shader order must list every registered shader exactly once")
+		self._order = list(order)
+
+	def enable(self, key: str):
+		self._disabled.discard(key)
+
+	def disable(self, key: str):
+		self._disabled.add(key)
+
+	def is_enabled(self, key: str) -> bool:
+		return key in self.items and key not in self._disabled
+
+	def get_stats(self, key: Union[str, None] = None) -> Union[dict, None]:
+		"""
+		:param key: Shader to get the timings of, every shader's if None
+		"""
+		if key is None:
+			return {name: stats.as_dict() for name, stats in self._stats.items()}
+		stats = self._stats.get(key)
+		return None if stats is None else stats.as_dict()
+
+	def run(self, screen: pygame.Surface, t: float) -> Union[list[pygame.Rect], None]:
+		"""
+		Applies every enabled and active shader, in order
+		:return: Regions drawn on by the shaders, None if the whole screen may have changed
+		"""
+		regions = []
+		for key in self._order:
+			if key in self._disabled:
+				continue
+			stats = self._stats[key]
+			if self._cooldowns.get(key, 0) > 0:
+				self._cooldowns[key] -= 1
+				stats.skipped += 1
+				continue
+			shader = self.items[key]
+			if not shader.is_active(t):
+				continue
+
+			start = time.perf_counter()
+			touched = shader.apply(screen, t)
+			stats.register(1000 * (time.perf_counter() - start), self.SAMPLE_CAP_RATIO * self.budget_ms)
+
+			if shader.BUDGETED:
+				self._adjust(key, shader, stats)
+			if touched is None or regions is None:
+				regions = None
+			else:
+				regions += touched
+		return regions
+
+	def _adjust(self, key: str, shader: Shader, stats: ShaderStats):
+		"""
+		Lowers the shader's quality while its average is over budget and raises it back once well under, at most once per cooldown_frames runs.
+		Averages are only trusted once made of min_samples runs, so that a single slow frame doesn't degrade the shader
+		"""
+		if stats.samples < max(self.min_samples, self.cooldown_frames if stats.degraded + stats.upgraded > 0 else 0):
+			return
+		if stats.average_ms > self.budget_ms:
+			if shader.degrade():
+				stats.degraded += 1
+			else:
+				self._cooldowns[key] = self.cooldown_frames
+			stats.restart_average()
+		elif stats.average_ms < self.UPGRADE_RATIO * self.budget_ms and shader.upgrade():
+			stats.upgraded += 1
+			stats.restart_average()
@@ -0,0 +1,2 @@
+from .Shader import Shader, FunctionShader, ShaderPipeline
+from .Glitch import GlitchShader
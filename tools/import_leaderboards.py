@@ -0,0 +1,35 @@
+"""
+Imports the json leaderboard of every challenge into a score database, in a single transaction per challenge.
+The game does it on its own the first time it runs with --database, this is for databases filled ahead of an event
+
+Usage: python tools/import_leaderboards.py [database path] [--force]
+"""
+import os
+import sys
+
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.getcwd())
+
+import contextlib
+with contextlib.redirect_stdout(None):
+	import pygame
+
+from game import Challenge, ChallengeManager
+from utils.database import ScoreDatabase
+from utils.leaderboard import Leaderboard
+
+
+def main():
+	args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+	path = args[0] if len(args) > 0 else Leaderboard.get_save_directory() + "leaderboards.db"
+	database = ScoreDatabase(path)
+	for challenge_type in ChallengeManager.CHALLENGE_TYPES:
+		file_name = Challenge.get_leaderboard_file_name(challenge_type.NAME)
+		json_path = Leaderboard.get_save_directory() + file_name + ".json"
+		count = database.import_json(file_name, json_path, challenge_type.DESCENDING_LEADERBOARD, "--force" in sys.argv)
+		print(f"{file_name}: {count} scores imported, {len(database.get_best_scores(file_name))} players")
+	print(f"Database at {path}")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,38 @@
+"""
+Serves leaderboards shared by the kiosks of an event, each started with --sync=host:port
+
+Usage: python tools/leaderboard_server.py [--host HOST] [--port PORT] [--directory DIRECTORY]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with contextlib.redirect_stdout(None):
+	import pygame
+
+from utils.sync import LeaderboardServer, DEFAULT_PORT
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--host", default="0.0.0.0", help="Address to listen on, every interface by default")
+	parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+	parser.add_argument("--directory", default="leaderboards", help="Where boards are saved")
+	args = parser.parse_args()
+
+	server = LeaderboardServer(os.path.abspath(args.directory))
+	print(f"Serving leaderboards from {server.directory} on {args.host}:{args.port}", flush=True)
+	try:
+		asyncio.run(server.serve(args.host, args.port))
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,28 @@
+"""
+Packs every asset of the manifest into the archive loaded by release builds, sprites being decoded once here
+
+Usage: python tools/pack_assets.py [archive path]
+"""
+import os
+import sys
+
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.getcwd())
+
+import contextlib
+with contextlib.redirect_stdout(None):
+	import pygame
+
+from providers.Archive import AssetArchive
+from providers.Preloader import AssetManifest
+
+
+def main():
+	path = sys.argv[1] if len(sys.argv) > 1 else AssetArchive.PATH
+	manifest = AssetManifest.load()
+	index = AssetArchive.pack(manifest.sprites, manifest.fonts, manifest.files, path)
+	print(f"Packed {sum(map(len, index.values()))} assets into {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,105 @@
+"""
+Runs a leaderboard server and several kiosk processes on this machine, each submitting random scores while running a frame loop.
+The server is only started once kiosks are already playing, to show that they keep going without it.
+Once done, every kiosk prints a digest of its boards, which must all match
+
+Usage: python tools/sync_demo.py [--kiosks 3] [--duration 5] [--port PORT]
+"""
+import argparse
+import contextlib
+import hashlib
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with contextlib.redirect_stdout(None):
+	import pygame
+
+from utils.leaderboard import LeaderboardRegistry, LeaderboardEntry
+from utils.sync import SyncClient, DEFAULT_PORT
+
+BOARDS = {"demo_points": True, "demo_reaction": False}
+FRAME_TIME = 1 / 60
+SETTLE_TIME = 3 * SyncClient.SYNC_INTERVAL  # s left for the last scores of every kiosk to go around
+
+
+def digest(registry: LeaderboardRegistry) -> str:
+	# Players tied on a score may be ranked in a different order from one kiosk to the other
+	content = repr([(name, sorted((entry.get_name(), entry.get_score()) for entry in registry.get(name).scores)) for name in sorted(BOARDS)])
+	return hashlib.sha1(content.encode()).hexdigest()[:12]
+
+
+def kiosk(index: int, port: int, duration: float):
+	"""
+	Plays random scores for the given duration then only syncs for a while, as a kiosk whose players left
+	"""
+	random.seed(index)
+	registry = LeaderboardRegistry()
+	with contextlib.redirect_stdout(None):
+		registry.load_all(BOARDS)
+	registry.use_sync(SyncClient(port=port))
+
+	worst, submitted = 0., 0
+	start = time.perf_counter()
+	while time.perf_counter() - start < duration + SETTLE_TIME:
+		frame_start = time.perf_counter()
+		registry.merge_remote()
+		if time.perf_counter() - start < duration and random.random() < 0.2:
+			name = f"kiosk{index}_player{random.randrange(50)}" if random.random() < 0.8 else f"Shared{random.randrange(10)}"
+			points = registry.get("demo_points")
+			points.add_score(LeaderboardEntry(name, random.randint(0, 10000)))
+			registry.get("demo_reaction").add_score(LeaderboardEntry(name, random.uniform(150, 400)))
+			submitted += 1
+		worst = max(worst, time.perf_counter() - frame_start)
+		time.sleep(max(0., FRAME_TIME - (time.perf_counter() - frame_start)))
+	while registry.merge_remote() > 0:
+		pass
+
+	client = registry.sync_client
+	print(f"kiosk {index}: {submitted} submitted, {registry.get('demo_points').get_size()} players, connected={client.is_connected()}, pending={client.get_pending_count()}, "
+	      f"worst frame {1000 * worst:.2f} ms, digest {digest(registry)}", flush=True)
+	registry.close_all()
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+	parser.add_argument("--kiosks", type=int, default=3)
+	parser.add_argument("--duration", type=float, default=5, help="Time spent submitting scores, in seconds")
+	parser.add_argument("--port", type=int, default=DEFAULT_PORT + 1)
+	parser.add_argument("--kiosk", type=int, help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.kiosk is not None:
+		kiosk(args.kiosk, args.port, args.duration)
+		return
+
+	directory = tempfile.mkdtemp(prefix="leaderboard_sync_")
+	print(f"Boards saved in {directory}")
+	kiosks = []
+	for i in range(args.kiosks):
+		# Each kiosk has its own desktop, as if on its own machine
+		env = dict(os.environ, USERPROFILE=os.path.join(directory, f"kiosk{i}"))
+		kiosks.append(subprocess.Popen([sys.executable, __file__, "--kiosk", str(i), "--port", str(args.port), "--duration", str(args.duration)], env=env, stdout=subprocess.PIPE, text=True))
+
+	time.sleep(min(1., args.duration / 2))
+	server = subprocess.Popen([sys.executable, os.path.join(ROOT, "tools", "leaderboard_server.py"), "--host", "127.0.0.1", "--port", str(args.port), "--directory", os.path.join(directory, "server")])
+	try:
+		lines = [process.communicate()[0].strip() for process in kiosks]
+	finally:
+		server.terminate()
+		server.wait()
+	for line in lines:
+		print(line)
+	digests = {line.rsplit(" ", 1)[-1] for line in lines}
+	print("Kiosks agree" if len(digests) == 1 else "Kiosks disagree")
+	sys.exit(0 if len(digests) == 1 else 1)
+
+
+if __name__ == '__main__':
+	main()
@@ -2,5 +2,9 @@ from ._constants import *
 from ._functions import *
 from ._types import *
 from ._state import *
+from ._cache import *
+from ._fonts import *
+from ._input import *
+from ._sorted import *
 
 C = Constants()
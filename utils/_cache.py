@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from typing import Generic, Union, Callable
+from weakref import WeakKeyDictionary
+
+import pygame
+
+from utils._types import Kt, Vt
+
+
+class LRUCache(Generic[Kt, Vt]):
+
+	def __init__(self, max_entries: int, max_bytes: int = -1, size_of: Callable[[Vt], int] = lambda _: 0):
+		"""
+		:param max_entries: Maximum amount of items kept in the cache
+		:param max_bytes: Memory cap (in bytes, as measured by size_of), -1 to disable
+		:param size_of: Function returning the memory footprint of a cached value
+		"""
+		self._items: OrderedDict[Kt, Vt] = OrderedDict()
+		self._sizes: dict[Kt, int] = {}
+		self._max_entries = max_entries
+		self._max_bytes = max_bytes
+		self._size_of = size_of
+		self._bytes = 0
+		self.hits, self.misses, self.evictions = 0, 0, 0
+
+	def get(self, key: Kt) -> Union[Vt, None]:
+		value = self._items.get(key, None)
+		if value is None:
+			self.misses += 1
+			return None
+		self._items.move_to_end(key)
+		self.hits += 1
+		return value
+
+	def set(self, key: Kt, value: Vt):
+		if key in self._items:
+			self.rm(key)
+		size = self._size_of(value)
+		if 0 <= self._max_bytes < size:
+			return  # Would evict the whole cache on its own, don't keep it
+		self._items[key] = value
+		self._sizes[key] = size
+		self._bytes += size
+		self._evict()
+
+	def _evict(self):
+		while len(self._items) > self._max_entries or 0 <= self._max_bytes < self._bytes:
+			old, _ = self._items.popitem(last=False)
+			self._bytes -= self._sizes.pop(old)
+			self.evictions += 1
+
+	def rm(self, key: Kt):
+		if key not in self._items:
+			return
+		del self._items[key]
+		self._bytes -= self._sizes.pop(key)
+
+	def clear(self):
+		self._items.clear()
+		self._sizes.clear()
+		self._bytes = 0
+
+	def get_size(self) -> int:
+		return len(self._items)
+
+	def get_bytes(self) -> int:
+		return self._bytes
+
+	def set_limits(self, max_entries: int, max_bytes: int = -1):
+		self._max_entries = max_entries
+		self._max_bytes = max_bytes
+		self._evict()
+
+	def get_stats(self) -> dict[str, int]:
+		return {
+			"entries": len(self._items),
+			"bytes": self._bytes,
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions
+		}
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+	return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+_surface_versions: WeakKeyDictionary[pygame.Surface, int] = WeakKeyDictionary()
+
+
+def get_surface_version(surface: pygame.Surface) -> int:
+	return _surface_versions.get(surface, 0)
+
+
+def bump_surface_version(surface: pygame.Surface):
+	"""
+	Must be called whenever a surface is drawn onto after having been handed out, so that caches keyed on it are refreshed
+	"""
+	_surface_versions[surface] = _surface_versions.get(surface, 0) + 1
+
+
+class ScaledSurfaceCache(LRUCache[tuple, tuple[pygame.Surface, pygame.Surface]]):
+
+	def __init__(self, zoom_step: float, max_entries: int, max_bytes: int = -1):
+		"""
+		:param zoom_step: Zoom factors are rounded to a multiple of this step before scaling, so close zoom values share a surface
+		"""
+		super().__init__(max_entries, max_bytes, lambda entry: surface_bytes(entry[1]))
+		self._zoom_step = zoom_step
+
+	def get_zoom_step(self) -> float:
+		return self._zoom_step
+
+	def set_zoom_step(self, zoom_step: float) -> 'ScaledSurfaceCache':
+		self._zoom_step = zoom_step
+		self.clear()
+		return self
+
+	def quantize(self, zoom: tuple[float, float]) -> tuple[float, float]:
+		if self._zoom_step <= 0:
+			return zoom
+		return round(zoom[0] / self._zoom_step) * self._zoom_step, round(zoom[1] / self._zoom_step) * self._zoom_step
+
+	def scale(self, surface: pygame.Surface, zoom: tuple[float, float]) -> pygame.Surface:
+		zoom = self.quantize(zoom)
+		if zoom[0] == 1. and zoom[1] == 1.:
+			return surface
+		key = id(surface), get_surface_version(surface), zoom
+		entry = self.get(key)
+		if entry is None or entry[0] is not surface:  # Ids can be reused once a surface is garbage collected
+			entry = surface, pygame.transform.smoothscale_by(surface, zoom)
+			self.set(key, entry)
+		return entry[1]
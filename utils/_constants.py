@@ -5,6 +5,7 @@ class Constants:
 	DISPLAY_SIZE = 0, 0
 	DISPLAY_RECT = pygame.Rect((0, 0), (0, 0))
 	FORCE_GLITCH_SHADER = False
+	DIRTY_RECT_RENDERING = False
 	FRAME_ID = 0
 
 	def glitch(self):
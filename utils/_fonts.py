@@ -0,0 +1,74 @@
+import io
+import os.path
+import time
+from typing import Union
+
+import pygame
+
+from utils._types import Provider
+
+
+class FontRegistry(Provider[tuple[str, int, int], pygame.font.Font]):
+	"""
+	Font instances shared by every text drawn with the same file, size and style, colours being applied when rendering
+	"""
+
+	BOLD = 0b0001
+	ITALIC = 0b0010
+	UNDERLINE = 0b0100
+	STRIKETHROUGH = 0b1000
+
+	def __init__(self):
+		super().__init__()
+		self.hits = 0
+		self._load_time = 0.
+		self._file_data: dict[str, bytes] = {}
+
+	def set_file_data(self, path: str, data: bytes):
+		"""
+		Keeps the content of a font file in memory, fonts later loaded from this path are then read from it instead of the disk
+		"""
+		self._file_data[path] = data
+
+	def get_font(self, path: str, size: int, style: int = 0) -> pygame.font.Font:
+		"""
+		:param path: Font file, or the name of a system font if no such file exists
+		:return: The font shared by every caller using the same path, size and style, loaded on the first call
+		"""
+		key = path, size, style
+		font = self.items.get(key)
+		if font is not None:
+			self.hits += 1
+			return font
+		start = time.perf_counter()
+		font = self.items[key] = self.load(path, size, style)
+		self._load_time += time.perf_counter() - start
+		return font
+
+	def load(self, path: str, size: int, style: int = 0) -> pygame.font.Font:
+		if path in self._file_data:
+			# Each font reads its own stream lazily, they can't share one
+			font = pygame.font.Font(io.BytesIO(self._file_data[path]), size)
+		elif os.path.exists(path):
+			font = pygame.font.Font(path, size)
+		else:
+			font = pygame.font.SysFont(path, size)
+		font.set_bold(bool(style & FontRegistry.BOLD))
+		font.set_italic(bool(style & FontRegistry.ITALIC))
+		font.set_underline(bool(style & FontRegistry.UNDERLINE))
+		font.set_strikethrough(bool(style & FontRegistry.STRIKETHROUGH))
+		return font
+
+	def get_load_time(self) -> float:
+		"""
+		:return: Time spent loading fonts so far, in seconds
+		"""
+		return self._load_time
+
+	def get_stats(self) -> dict[str, Union[int, float]]:
+		return {
+			"fonts": len(self.items),
+			"files": len({path for path, _, _ in self.items}),
+			"hits": self.hits,
+			"load_ms": 1000 * self._load_time
+		}
@@ -0,0 +1,57 @@
+import math
+import time
+from typing import Collection
+
+import pygame
+
+
+class InputQueue:
+	"""
+	Pending input events, each with the time it was first seen. Waiting for the next frame on the event queue
+	timestamps input as it comes, rather than at the time the next frame handles it
+	"""
+
+	def __init__(self):
+		self._events: list[tuple[float, pygame.event.Event]] = []
+
+	def poll(self) -> 'InputQueue':
+		self._add(pygame.event.get())
+		return self
+
+	def _add(self, events: list[pygame.event.Event], wake_on: Collection[int] = ()) -> bool:
+		"""
+		:return: Whether one of the events is of one of the given types
+		"""
+		now = time.perf_counter()
+		woken = False
+		for event in events:
+			self._events.append((now, event))
+			woken = woken or event.type in wake_on
+		return woken
+
+	def drain(self) -> list[tuple[float, pygame.event.Event]]:
+		"""
+		:return: (perf_counter time, event) of every event polled so far, which are removed from the queue
+		"""
+		events, self._events = self._events, []
+		return events
+
+	def wait(self, until: float, busy: bool = False, wake_on: Collection[int] = ()) -> 'InputQueue':
+		"""
+		Collects events until the given perf_counter time, or until an event of one of the given types comes
+		:param busy: Poll continuously instead of sleeping on the event queue, for precise pacing
+		:param wake_on: Event types returned on as soon as they come, e.g. player input handled without waiting for the frame's end
+		"""
+		woken = self._add(pygame.event.get(), wake_on)
+		while not woken:
+			remaining = until - time.perf_counter()
+			if remaining <= 0:
+				break
+			if busy:
+				woken = self._add(pygame.event.get(), wake_on)
+				continue
+			# A zero timeout would wait forever
+			event = pygame.event.wait(max(1, math.ceil(1000 * remaining)))
+			if event.type != pygame.NOEVENT:
+				woken = self._add([event] + pygame.event.get(), wake_on)
+		return self
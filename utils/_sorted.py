@@ -0,0 +1,148 @@
+from bisect import bisect_left, bisect_right
+from typing import Generic, Callable, Any, Iterator, Iterable
+
+from utils._types import Vt
+
+
+class SortedList(Generic[Vt]):
+	"""
+	List kept sorted by key, stored as buckets of at most 2 * LOAD items so that inserting or removing an item only shifts one bucket.
+	A Fenwick tree over the bucket sizes gives the position of an item in O(log n).
+	Items with equal keys keep their insertion order, and are told apart by identity
+	"""
+
+	LOAD = 500
+
+	def __init__(self, key: Callable[[Vt], Any], items: Iterable[Vt] = ()):
+		self._key = key
+		self._buckets: list[list[Vt]] = []
+		self._keys: list[list[Any]] = []
+		self._maxes: list[Any] = []  # Last key of each bucket
+		self._tree: list[int] = []  # Fenwick tree of the bucket sizes
+		self._size = 0
+		self.update(items)
+
+	def __len__(self) -> int:
+		return self._size
+
+	def __iter__(self) -> Iterator[Vt]:
+		for bucket in self._buckets:
+			yield from bucket
+
+	def _rebuild(self):
+		self._maxes = [keys[-1] for keys in self._keys]
+		self._tree = [0] + [len(bucket) for bucket in self._buckets]
+		for i in range(1, len(self._tree)):
+			parent = i + (i & -i)
+			if parent < len(self._tree):
+				self._tree[parent] += self._tree[i]
+
+	def _resize(self, bucket: int, delta: int):
+		i = bucket + 1
+		while i < len(self._tree):
+			self._tree[i] += delta
+			i += i & -i
+
+	def _offset(self, bucket: int) -> int:
+		"""
+		:return: Amount of items in the buckets before the given one
+		"""
+		total, i = 0, bucket
+		while i > 0:
+			total += self._tree[i]
+			i -= i & -i
+		return total
+
+	def _locate(self, item: Vt) -> tuple[int, int]:
+		"""
+		:return: (bucket, index in bucket) of the item, ValueError if absent
+		"""
+		key = self._key(item)
+		bucket = bisect_left(self._maxes, key)
+		while bucket < len(self._buckets):
+			keys, items = self._keys[bucket], self._buckets[bucket]
+			i = bisect_left(keys, key)
+			while i < len(keys) and keys[i] == key:
+				if items[i] is item:
+					return bucket, i
+				i += 1
+			if i < len(keys):
+				break
+			bucket += 1  # Equal keys may span several buckets
+		raise ValueError("Item is not in the list")
+
+	def update(self, items: Iterable[Vt]):
+		"""
+		Adds many items at once, sorting them all a single time
+		"""
+		items = list(self) + list(items)
+		keys = [self._key(item) for item in items]
+		order = sorted(range(len(items)), key=keys.__getitem__)
+		items, keys = [items[i] for i in order], [keys[i] for i in order]
+		self._buckets = [items[i:i + self.LOAD] for i in range(0, len(items), self.LOAD)]
+		self._keys = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+		self._size = len(items)
+		self._rebuild()
+
+	def add(self, item: Vt):
+		key = self._key(item)
+		if self._size == 0:
+			self._buckets, self._keys = [[item]], [[key]]
+			self._size = 1
+			self._rebuild()
+			return
+		bucket = min(bisect_right(self._maxes, key), len(self._buckets) - 1)
+		keys = self._keys[bucket]
+		i = bisect_right(keys, key)
+		keys.insert(i, key)
+		self._buckets[bucket].insert(i, item)
+		self._maxes[bucket] = keys[-1]
+		self._size += 1
+		if len(keys) > 2 * self.LOAD:
+			self._buckets[bucket:bucket + 1] = self._buckets[bucket][:self.LOAD], self._buckets[bucket][self.LOAD:]
+			self._keys[bucket:bucket + 1] = keys[:self.LOAD], keys[self.LOAD:]
+			self._rebuild()
+		else:
+			self._resize(bucket, 1)
+
+	def remove(self, item: Vt):
+		bucket, i = self._locate(item)
+		del self._keys[bucket][i]
+		del self._buckets[bucket][i]
+		self._size -= 1
+		if len(self._buckets[bucket]) == 0:
+			del self._keys[bucket]
+			del self._buckets[bucket]
+			self._rebuild()
+		else:
+			self._maxes[bucket] = self._keys[bucket][-1]
+			self._resize(bucket, -1)
+
+	def index(self, item: Vt) -> int:
+		bucket, i = self._locate(item)
+		return self._offset(bucket) + i
+
+	def count_below(self, key: Any) -> int:
+		"""
+		:return: Amount of items whose key is lower than the given one
+		"""
+		bucket = bisect_left(self._maxes, key)
+		if bucket == len(self._buckets):
+			return self._size
+		return self._offset(bucket) + bisect_left(self._keys[bucket], key)
+
+	def head(self, count: int) -> list[Vt]:
+		"""
+		:return: The first count items
+		"""
+		items = []
+		for bucket in self._buckets:
+			if len(items) >= count:
+				break
+			items += bucket[:count - len(items)]
+		return items
+
+	def clear(self):
+		self._buckets, self._keys = [], []
+		self._size = 0
+		self._rebuild()
@@ -1,16 +1,122 @@
+import time
+from typing import Union, Callable, Any
+
+import numpy as np
+
 from utils import Singleton
 
 
+class FrameTimings:
+	"""
+	Fixed size ring buffer of the time spent in each phase of the last frames, and of the time between them
+	"""
+
+	PHASES = "events", "update", "draw", "shaders", "present"
+	PERCENTILES = 50, 95, 99
+
+	def __init__(self, capacity: int, phases: tuple[str, ...] = PHASES):
+		self._phases = phases
+		self._times = np.zeros((capacity, len(phases)))
+		self._intervals = np.zeros(capacity)
+		self._index = 0
+		self._count = 0
+
+	def get_phases(self) -> tuple[str, ...]:
+		return self._phases
+
+	def get_capacity(self) -> int:
+		return len(self._intervals)
+
+	def get_count(self) -> int:
+		return self._count
+
+	def register(self, times: list[float], interval: float) -> 'FrameTimings':
+		"""
+		:param times: Time spent in each phase, in seconds
+		:param interval: Time since the previous frame started, sleeping included, in seconds
+		"""
+		self._times[self._index] = times
+		self._intervals[self._index] = interval
+		self._index = (self._index + 1) % self.get_capacity()
+		self._count = min(self._count + 1, self.get_capacity())
+		return self
+
+	def clear(self) -> 'FrameTimings':
+		self._index = 0
+		self._count = 0
+		return self
+
+	def get_times(self) -> np.ndarray:
+		"""
+		:return: (frames, phases) array of the registered times, in no particular order
+		"""
+		return self._times[:self._count]
+
+	def get_frame_rate(self) -> float:
+		total = self._intervals[:self._count].sum()
+		return 0. if total == 0 else self._count / total
+
+	def get_stats(self) -> dict[str, dict[str, float]]:
+		"""
+		:return: Percentiles and worst time of each phase and of whole frames, in milliseconds
+		"""
+		if self._count == 0:
+			return {}
+		times = 1000 * self.get_times()
+		columns = np.column_stack((times, times.sum(axis=1)))
+		percentiles = np.percentile(columns, self.PERCENTILES, axis=0)
+		worst = columns.max(axis=0)
+		return {
+			name: {**{f"p{p}": float(percentiles[i, column]) for i, p in enumerate(self.PERCENTILES)}, "worst": float(worst[column])}
+			for column, name in enumerate(self._phases + ("frame",))
+		}
+
+
+class FramePolicy:
+	"""
+	How fast frames should be produced, declared by scenes and challenges depending on how responsive they must be
+	"""
+
+	def __init__(self, frame_rate: float = 60, busy_loop: bool = False, idle_frame_rate: Union[float, None] = None, idle_timeout: float = 10):
+		"""
+		:param frame_rate: Target frame rate while the player is active
+		:param busy_loop: Wait for the next frame by spinning instead of sleeping, which paces frames precisely at the cost of a busy CPU core
+		:param idle_frame_rate: Frame rate once no input came for idle_timeout seconds, None to keep frame_rate
+		"""
+		self._frame_rate = frame_rate
+		self._busy_loop = busy_loop
+		self._idle_frame_rate = idle_frame_rate
+		self._idle_timeout = idle_timeout
+
+	def get_frame_rate(self, idle: bool = False) -> float:
+		if idle and self._idle_frame_rate is not None:
+			return self._idle_frame_rate
+		return self._frame_rate
+
+	def is_busy_loop(self) -> bool:
+		return self._busy_loop
+
+	def get_idle_frame_rate(self) -> Union[float, None]:
+		return self._idle_frame_rate
+
+	def get_idle_timeout(self) -> float:
+		return self._idle_timeout
+
+
 class _AppState(metaclass=Singleton):
 
-	_TARGET_FRAME_RATE = 60
-	_FPS_HISTORY_SIZE = 60
+	_FRAME_HISTORY_SIZE = 600
 
 	_running = True
-	_fps_history = []
+	_frame_timings: Union[FrameTimings, None] = None
+	_frame_policy = FramePolicy()
+	_input_time = 0.
+	_present_callbacks = []
 
 	def __init__(self):
-		self._fps_history = [self._TARGET_FRAME_RATE] * self._FPS_HISTORY_SIZE
+		self._frame_timings = FrameTimings(self._FRAME_HISTORY_SIZE)
+		self._present_callbacks = []
+		self._input_time = time.perf_counter()  # Launching counts as input, the first frames aren't idle
 
 	def is_running(self) -> bool:
 		return self._running
@@ -18,14 +124,53 @@ class _AppState(metaclass=Singleton):
 	def stop(self):
 		self._running = False
 
-	def register_frame_time(self, fps: float):
-		self._fps_history = [fps] + self._fps_history[:-1]
+	def register_frame_time(self, times: list[float], interval: float):
+		"""
+		:param times: Time spent working on each phase of the frame, in seconds
+		:param interval: Time since the previous frame started, in seconds
+		"""
+		self._frame_timings.register(times, interval)
+
+	def get_frame_timings(self) -> FrameTimings:
+		return self._frame_timings
+
+	def set_frame_policy(self, policy: FramePolicy):
+		self._frame_policy = policy
+
+	def get_frame_policy(self) -> FramePolicy:
+		return self._frame_policy
+
+	def is_idle(self) -> bool:
+		"""
+		:return: Whether no input came for longer than the current frame policy's idle timeout
+		"""
+		return time.perf_counter() - self._input_time >= self._frame_policy.get_idle_timeout()
 
 	def get_target_frame_rate(self) -> float:
-		return self._TARGET_FRAME_RATE
+		return self._frame_policy.get_frame_rate(self.is_idle())
+
+	def get_frame_rate(self) -> float:
+		return self._frame_timings.get_frame_rate()
+
+	def set_input_time(self, t: float):
+		self._input_time = t
+
+	def get_input_time(self) -> float:
+		"""
+		:return: perf_counter time at which the player input being handled, or the last one, was received
+		"""
+		return self._input_time
+
+	def on_next_present(self, callback: Callable[[float], Any]):
+		"""
+		:param callback: Called with the perf_counter time right after the next frame is presented, e.g. to time what the player saw
+		"""
+		self._present_callbacks.append(callback)
 
-	def get_frame_rate(self):
-		return sum(self._fps_history) / self._FPS_HISTORY_SIZE
+	def notify_present(self, t: float):
+		callbacks, self._present_callbacks = self._present_callbacks, []
+		for callback in callbacks:
+			callback(t)
 
 
 AppState = _AppState()
@@ -0,0 +1,281 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Union
+
+from utils.journal import ScoreJournal
+
+
+class ScoreDatabase:
+	"""
+	Every attempt of every challenge in a single SQLite database, along with the best attempt of each player, indexed by score for ranks and tops.
+	Attempts are queued and written by a background thread through a single connection, one transaction per batch.
+	The database is in WAL mode, so that reads never wait on that writer
+	"""
+
+	SCHEMA = """
+		CREATE TABLE IF NOT EXISTS attempts (
+			id INTEGER PRIMARY KEY,
+			challenge TEXT NOT NULL,
+			player TEXT NOT NULL,
+			name TEXT NOT NULL,
+			score REAL NOT NULL,
+			time REAL NOT NULL,
+			imported INTEGER NOT NULL DEFAULT 0
+		);
+		CREATE INDEX IF NOT EXISTS attempts_by_player ON attempts (challenge, player, time);
+		CREATE TABLE IF NOT EXISTS best (
+			challenge TEXT NOT NULL,
+			player TEXT NOT NULL,
+			name TEXT NOT NULL,
+			score REAL NOT NULL,
+			time REAL NOT NULL,
+			PRIMARY KEY (challenge, player)
+		) WITHOUT ROWID;
+		CREATE INDEX IF NOT EXISTS best_by_score ON best (challenge, score);
+		CREATE TABLE IF NOT EXISTS imports (
+			challenge TEXT PRIMARY KEY,
+			path TEXT NOT NULL,
+			time REAL NOT NULL
+		) WITHOUT ROWID;
+	"""
+
+	INSERT_ATTEMPT = "INSERT INTO attempts (challenge, player, name, score, time) VALUES (?, ?, ?, ?, ?)"
+	INSERT_IMPORTED = "INSERT INTO attempts (challenge, player, name, score, time, imported) VALUES (?, ?, ?, ?, ?, 1)"
+	# Keeps the best attempt of each player, a player's first attempt always being their best so far
+	UPSERT_BEST = """
+		INSERT INTO best (challenge, player, name, score, time) VALUES (?, ?, ?, ?, ?)
+		ON CONFLICT (challenge, player) DO UPDATE SET name = excluded.name, score = excluded.score, time = excluded.time
+		WHERE excluded.score {} best.score
+	"""
+	# Best attempt of each player of a challenge, SQLite taking the other columns from the row holding the MAX or MIN
+	REBUILD_BEST = """
+		INSERT INTO best (challenge, player, name, score, time)
+		SELECT challenge, player, name, {}(score), time FROM attempts WHERE challenge = ? GROUP BY player
+	"""
+
+	RETRY_INTERVAL = 5.  # s between two attempts at writing a batch that failed
+
+	_CHECKPOINT = object()  # Queued to request a checkpoint
+	_CLOSE = object()  # Queued to stop the writer
+
+	def __init__(self, path: str):
+		self.path = path
+		os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		with self.connect() as connection:
+			connection.execute("PRAGMA journal_mode = WAL")
+			connection.executescript(self.SCHEMA)
+		self._queue: queue.Queue = queue.Queue()
+		self._writer: Union[threading.Thread, None] = None
+		self._readers = threading.local()
+
+	def connect(self) -> sqlite3.Connection:
+		connection = sqlite3.connect(self.path, timeout=30)
+		connection.execute("PRAGMA synchronous = FULL")
+		return connection
+
+	def _get_reader(self) -> sqlite3.Connection:
+		"""
+		:return: Connection of the calling thread, for reads
+		"""
+		if getattr(self._readers, "connection", None) is None:
+			self._readers.connection = self.connect()
+		return self._readers.connection
+
+	@staticmethod
+	def normalize(name: str) -> str:
+		return name.lower()
+
+	def get_store(self, challenge: str, descending: bool = True) -> 'ChallengeScores':
+		return ChallengeScores(self, challenge, descending)
+
+	def submit(self, challenge: str, name: str, score: float, descending: bool = True, submit_time: Union[float, None] = None):
+		"""
+		Queues an attempt, written by the background writer
+		:param submit_time: Unix time of the attempt, now by default
+		"""
+		self._start()
+		self._queue.put((descending, challenge, self.normalize(name), name, score, time.time() if submit_time is None else submit_time, True))
+
+	def submit_best(self, challenge: str, name: str, score: float, descending: bool = True):
+		"""
+		Queues a score set elsewhere, only updating the player's best: no attempt is recorded
+		"""
+		self._start()
+		self._queue.put((descending, challenge, self.normalize(name), name, score, time.time(), False))
+
+	def checkpoint(self):
+		"""
+		Queues a checkpoint, moving the write-ahead log into the database
+		"""
+		self._start()
+		self._queue.put(self._CHECKPOINT)
+
+	def flush(self):
+		"""
+		Waits for every queued attempt to be written, or to have failed to be and be kept for a retry
+		"""
+		if self._writer is not None and self._writer.is_alive():
+			self._queue.join()
+
+	def close(self):
+		"""
+		Writes every queued attempt and stops the writer
+		"""
+		if self._writer is None:
+			return
+		if self._writer.is_alive():
+			self._queue.put(self._CLOSE)
+			self._writer.join()
+		self._writer = None
+
+	def _start(self):
+		if self._writer is None or not self._writer.is_alive():
+			self._writer = threading.Thread(target=self._run, name="score-database", daemon=True)
+			self._writer.start()
+
+	def _run(self):
+		connection: Union[sqlite3.Connection, None] = None
+		failed: list[tuple] = []  # Attempts of batches that couldn't be written, retried with the next one
+		running = True
+		while running:
+			try:
+				batch = [self._queue.get(timeout=self.RETRY_INTERVAL if len(failed) > 0 else None)]
+			except queue.Empty:
+				batch = []
+			while not self._queue.empty():
+				batch.append(self._queue.get_nowait())
+			attempts = failed + [item for item in batch if isinstance(item, tuple)]
+			running = self._CLOSE not in batch
+			try:
+				if connection is None:
+					connection = self.connect()
+				if len(attempts) > 0:
+					with connection:
+						self._insert(connection, attempts)
+				failed = []
+				if self._CHECKPOINT in batch:
+					connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+			except sqlite3.Error as e:
+				failed = attempts
+				print(f"Could not save {len(failed)} scores to {self.path}, " + ("retrying later" if running else "they are lost") + f": {e}")
+			finally:
+				for _ in batch:
+					self._queue.task_done()
+		if connection is not None:
+			connection.close()
+
+	def _insert(self, connection: sqlite3.Connection, attempts: list[tuple], statement: str = INSERT_ATTEMPT):
+		"""
+		Inserts attempts and updates the best of each player, within the caller's transaction
+		:param attempts: (descending, challenge, player, name, score, time, recorded) of each attempt, those not recorded only updating bests
+		"""
+		connection.executemany(statement, [attempt[1:6] for attempt in attempts if attempt[6]])
+		for descending in (True, False):
+			rows = [attempt[1:6] for attempt in attempts if attempt[0] == descending]
+			if len(rows) > 0:
+				connection.executemany(self.UPSERT_BEST.format(">" if descending else "<"), rows)
+
+	def import_json(self, challenge: str, path: str, descending: bool = True, force: bool = False) -> int:
+		"""
+		Imports a leaderboard saved as json, along with its journal, in a single transaction. Imported challenges are skipped unless forced
+		:param force: Import again, replacing what the previous import of the challenge brought
+		:return: Amount of attempts imported
+		"""
+		connection = self._get_reader()
+		if not force and connection.execute("SELECT 1 FROM imports WHERE challenge = ?", (challenge,)).fetchone() is not None:
+			return 0
+		attempts = []
+		if os.path.exists(path) or os.path.exists(path + ".journal"):
+			# The file's date is all that is known of when these were set
+			mtime = os.path.getmtime(path) if os.path.exists(path) else time.time()
+			attempts = [(descending, challenge, self.normalize(name), name, score, mtime, True) for name, score in ScoreJournal(path, descending).recover()]
+		with connection:
+			if force:
+				connection.execute("DELETE FROM attempts WHERE challenge = ? AND imported = 1", (challenge,))
+				connection.execute("DELETE FROM best WHERE challenge = ?", (challenge,))
+				connection.execute(self.REBUILD_BEST.format("MAX" if descending else "MIN"), (challenge,))
+			self._insert(connection, attempts, self.INSERT_IMPORTED)
+			connection.execute("INSERT OR REPLACE INTO imports (challenge, path, time) VALUES (?, ?, ?)", (challenge, path, time.time()))
+		return len(attempts)
+
+	def get_best_scores(self, challenge: str) -> list[tuple[str, float]]:
+		"""
+		:return: (name, score) of the best attempt of each player
+		"""
+		return self._get_reader().execute("SELECT name, score FROM best WHERE challenge = ?", (challenge,)).fetchall()
+
+	def get_best(self, challenge: str, name: str) -> Union[tuple[str, float], None]:
+		return self._get_reader().execute("SELECT name, score FROM best WHERE challenge = ? AND player = ?", (challenge, self.normalize(name))).fetchone()
+
+	def get_top(self, challenge: str, count: int = 10, descending: bool = True) -> list[tuple[str, float]]:
+		order = "DESC" if descending else "ASC"
+		return self._get_reader().execute(f"SELECT name, score FROM best WHERE challenge = ? ORDER BY score {order} LIMIT ?", (challenge, count)).fetchall()
+
+	def get_rank(self, challenge: str, name: str, descending: bool = True) -> int:
+		"""
+		:return: 1-based rank of the player, -1 if they have no score
+		"""
+		best = self.get_best(challenge, name)
+		if best is None:
+			return -1
+		return self.get_rank_of_score(challenge, best[1], descending)
+
+	def get_rank_of_score(self, challenge: str, score: float, descending: bool = True) -> int:
+		comparison = ">" if descending else "<"
+		query = f"SELECT COUNT(*) FROM best WHERE challenge = ? AND score {comparison} ?"
+		return self._get_reader().execute(query, (challenge, score)).fetchone()[0] + 1
+
+	def get_attempts(self, challenge: str, name: str) -> list[tuple[str, float, float]]:
+		"""
+		:return: (name, score, unix time) of every attempt of the player, oldest first
+		"""
+		query = "SELECT name, score, time FROM attempts WHERE challenge = ? AND player = ? ORDER BY time"
+		return self._get_reader().execute(query, (challenge, self.normalize(name))).fetchall()
+
+
+class ChallengeScores:
+	"""
+	A challenge's scores in a ScoreDatabase, saving a leaderboard like a ScoreJournal does
+	"""
+
+	def __init__(self, database: ScoreDatabase, challenge: str, descending: bool = True):
+		self.database = database
+		self.challenge = challenge
+		self.descending = descending
+		self.json_path: Union[str, None] = None
+
+	def set_json_path(self, path: str) -> 'ChallengeScores':
+		"""
+		:param path: Leaderboard saved as json, imported on the first load
+		"""
+		self.json_path = path
+		return self
+
+	def recover(self) -> list[tuple[str, float]]:
+		"""
+		:return: (name, score) of the best attempt of each player
+		"""
+		if self.json_path is not None:
+			self.database.import_json(self.challenge, self.json_path, self.descending)
+		return self.database.get_best_scores(self.challenge)
+
+	def append(self, name: str, score: float, improved: bool = True):
+		self.database.submit(self.challenge, name, score, self.descending)
+
+	def merge(self, name: str, score: float):
+		"""
+		Saves a best score set on another kiosk, which isn't an attempt made here
+		"""
+		self.database.submit_best(self.challenge, name, score, self.descending)
+
+	def compact(self):
+		self.database.checkpoint()
+
+	def flush(self):
+		self.database.flush()
+
+	def close(self):
+		self.database.flush()
@@ -0,0 +1,221 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import Union
+
+
+class ScoreJournal:
+	"""
+	Persists a leaderboard as a JSON snapshot plus an append-only journal of the scores submitted since.
+	Submissions are queued and written by a background thread, one fsync per batch, so that the frame loop never waits on the disk.
+	The journal is compacted into a new snapshot, swapped in with an atomic rename, once it grows too large or gets old.
+	A power cut may at worst tear the journal's last record, which recovery skips
+	"""
+
+	COMPACT_RECORDS = 500  # Records in the journal above which it is compacted
+	COMPACT_INTERVAL = 300  # s, age of the oldest compacted record above which the journal is compacted
+	RETRY_INTERVAL = 5.  # s between two attempts at writing records that failed to be
+
+	_COMPACT = object()  # Queued to request a compaction
+	_CLOSE = object()  # Queued to stop the writer
+
+	def __init__(self, snapshot_path: str, descending: bool = True):
+		self.snapshot_path = snapshot_path
+		self.journal_path = snapshot_path + ".journal"
+		self.descending = descending
+		self._queue: queue.Queue = queue.Queue()
+		self._writer: Union[threading.Thread, None] = None
+		self._best: dict[str, tuple[str, float]] = {}  # Best record of each player, what the next snapshot holds
+		self._records = 0  # Records in the journal
+		self._first_record_time: Union[float, None] = None
+		self._journal_size: Union[int, None] = None  # Bytes of the journal known to be written, None until known
+
+	def _keep_best(self, name: str, score: float):
+		player = name.lower()
+		prev = self._best.get(player)
+		if prev is None or (score > prev[1] if self.descending else score < prev[1]):
+			self._best[player] = name, score
+
+	def recover(self) -> list[tuple[str, float]]:
+		"""
+		Reads the snapshot then replays the journal, dropping a torn last record if any. Must be called before any append
+		:return: (name, score) records in the order they were saved, players may appear several times
+		"""
+		records = []
+		if os.path.exists(self.snapshot_path):
+			with open(self.snapshot_path, 'r') as f:
+				content = f.read()
+			try:
+				pairs = json.loads(content)
+			except ValueError:
+				# Written by a version saving in place and cut mid-write: keep it aside rather than compacting over it
+				os.replace(self.snapshot_path, self.snapshot_path + ".corrupt")
+				print(f"Corrupted leaderboard moved to {self.snapshot_path}.corrupt")
+				pairs = {}
+			if isinstance(pairs, dict):
+				records += pairs.items()
+
+		self._records = 0
+		if os.path.exists(self.journal_path):
+			valid = 0
+			with open(self.journal_path, 'rb') as f:
+				for line in f:
+					try:
+						name, score = json.loads(line)
+					except ValueError:
+						break
+					if not line.endswith(b"\n"):
+						break
+					records.append((name, score))
+					valid += len(line)
+					self._records += 1
+			if valid < os.path.getsize(self.journal_path):
+				with open(self.journal_path, 'r+b') as f:
+					f.truncate(valid)
+			self._journal_size = valid
+		self._first_record_time = time.monotonic() if self._records > 0 else None
+
+		self._best.clear()
+		for name, score in records:
+			self._keep_best(name, score)
+		return records
+
+	def append(self, name: str, score: float, improved: bool = True):
+		"""
+		Queues a submission, written to the journal by the background writer
+		:param improved: Whether the score is the player's best, only those are kept
+		"""
+		if not improved:
+			return
+		self._start()
+		self._queue.put((name, score))
+
+	def merge(self, name: str, score: float):
+		"""
+		Queues a best score set elsewhere, journaled like an improving submission since only bests are kept
+		"""
+		self.append(name, score, True)
+
+	def compact(self):
+		"""
+		Queues a compaction, whatever the journal's size
+		"""
+		self._start()
+		self._queue.put(self._COMPACT)
+
+	def flush(self):
+		"""
+		Waits for every queued operation to be written, or to have failed to be and be kept for a retry
+		"""
+		if self._writer is not None and self._writer.is_alive():
+			self._queue.join()
+
+	def close(self):
+		"""
+		Writes every queued operation and stops the writer
+		"""
+		if self._writer is None:
+			return
+		if self._writer.is_alive():
+			self._queue.put(self._CLOSE)
+			self._writer.join()
+		self._writer = None
+
+	def get_record_count(self) -> int:
+		return self._records
+
+	def _start(self):
+		if self._writer is None or not self._writer.is_alive():
+			self._writer = threading.Thread(target=self._run, name="journal-" + os.path.basename(self.snapshot_path), daemon=True)
+			self._writer.start()
+
+	def _run(self):
+		journal = None
+		pending: list[tuple[str, float]] = []  # Records that couldn't be written yet, retried with the next batch
+		running = True
+		while running:
+			# Wakes up on its own when there are records, to compact them once old enough or retry writing them
+			timeout = None if self._first_record_time is None else max(0., self._first_record_time + self.COMPACT_INTERVAL - time.monotonic())
+			if len(pending) > 0:
+				timeout = self.RETRY_INTERVAL if timeout is None else min(timeout, self.RETRY_INTERVAL)
+			try:
+				batch = [self._queue.get(timeout=timeout)]
+			except queue.Empty:
+				batch = []
+			while not self._queue.empty():
+				batch.append(self._queue.get_nowait())
+			running = self._CLOSE not in batch
+
+			pending += [item for item in batch if isinstance(item, tuple)]
+			try:
+				if journal is None:
+					journal = self._open_journal()
+				if len(pending) > 0:
+					self._write(journal, pending)
+					pending = []
+				old = self._first_record_time is not None and time.monotonic() - self._first_record_time >= self.COMPACT_INTERVAL
+				if self._COMPACT in batch or self._records >= self.COMPACT_RECORDS or old:
+					self._compact(journal)
+			except OSError as e:
+				if len(pending) > 0:
+					print(f"Could not save {len(pending)} scores to {self.journal_path}, " + ("retrying later" if running else "they are lost") + f": {e}")
+				else:
+					print(f"Could not compact {self.journal_path}, retrying later: {e}")
+					# Ages the journal so that the next compaction comes after RETRY_INTERVAL rather than right away
+					self._first_record_time = time.monotonic() - self.COMPACT_INTERVAL + self.RETRY_INTERVAL
+				# Reopened for the next attempt, cutting what a torn write may have left
+				if journal is not None:
+					try:
+						journal.close()
+					except OSError:
+						pass
+				journal = None
+			finally:
+				for _ in batch:
+					self._queue.task_done()
+		if journal is not None:
+			journal.close()
+
+	def _open_journal(self):
+		journal = open(self.journal_path, 'ab')
+		if self._journal_size is None:
+			self._journal_size = journal.tell()
+		elif journal.tell() > self._journal_size:
+			journal.truncate(self._journal_size)  # Cut what a failed write may have left
+		return journal
+
+	def _write(self, journal, records: list[tuple[str, float]]):
+		journal.write(b"".join(json.dumps(record).encode('utf-8') + b"\n" for record in records))
+		journal.flush()
+		os.fsync(journal.fileno())
+		self._journal_size = journal.tell()
+		for name, score in records:
+			self._keep_best(name, score)
+		self._records += len(records)
+		if self._first_record_time is None:
+			self._first_record_time = time.monotonic()
+
+	def _compact(self, journal):
+		ranking = sorted(self._best.values(), key=lambda record: record[1], reverse=self.descending)
+		temporary = self.snapshot_path + ".tmp"
+		with open(temporary, 'w') as f:
+			f.write(json.dumps(dict(ranking), indent=4))
+			f.flush()
+			os.fsync(f.fileno())
+		os.replace(temporary, self.snapshot_path)
+		if hasattr(os, "O_DIRECTORY"):
+			# The rename must reach the disk before the journal is emptied, or a power cut could keep the latter only
+			directory = os.open(os.path.dirname(os.path.abspath(self.snapshot_path)), os.O_RDONLY | os.O_DIRECTORY)
+			try:
+				os.fsync(directory)
+			finally:
+				os.close(directory)
+		# Records still in the journal if cut here are replayed on top of the snapshot, which changes nothing
+		journal.truncate(0)
+		journal.flush()
+		os.fsync(journal.fileno())
+		self._journal_size = 0
+		self._records = 0
+		self._first_record_time = None
@@ -1,8 +1,15 @@
-import json
 import os
-from typing import Union
-from os.path import abspath, dirname, exists
-from os import makedirs
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, TYPE_CHECKING
+from os.path import dirname
+
+from utils import SortedList, Provider
+from utils.journal import ScoreJournal
+
+if TYPE_CHECKING:
+	from utils.database import ScoreDatabase, ChallengeScores
+	from utils.sync import SyncClient
 
 
 class LeaderboardEntry:
@@ -20,26 +27,65 @@ class LeaderboardEntry:
 
 class Leaderboard:
 
-	def __init__(self, file_name: str, descending: bool = True):
+	def __init__(self, file_name: str, descending: bool = True, load: bool = True, store: Union[ScoreJournal, 'ChallengeScores', None] = None):
+		"""
+		:param load: Whether to load the saved board right away
+		:param store: Where scores are saved, a journal next to the json file by default, whose directory is then created
+		"""
 		self.file_name = file_name
 		self.descending = descending
-		self.create_paths()
-		self.scores: list[LeaderboardEntry] = []
-		if exists(self.get_save_path()):
-			with open(self.get_save_path(), 'r') as f:
-				pairs = json.loads(f.read())
-			if not isinstance(pairs, dict):
-				return
-			for name, score in pairs.items():
-				self.add_score(LeaderboardEntry(name, score))
-			print("Database Loaded for challenge " + file_name)
+		if store is None:
+			# A given store saves wherever it was told to, the save directory being left alone
+			self.create_paths()
+		# Best entry of each player by normalized name, and every entry from best to worst
+		self.players: dict[str, LeaderboardEntry] = {}
+		self.scores: SortedList[LeaderboardEntry] = SortedList(self.sort_key)
+		self.store = store if store is not None else ScoreJournal(self.get_save_path(), descending)
+		self.sync_client: Union['SyncClient', None] = None
+		self._load_time = 0.
+		if load:
+			self.load()
+
+	def load(self, verbose: bool = True) -> 'Leaderboard':
+		"""
+		Replaces the board's content by the saved one, parsed and sorted a single time
+		:param verbose: Whether to print a summary of the loaded board
+		"""
+		start = time.perf_counter()
+		self.players.clear()
+		self.scores.clear()
+		for name, score in self.store.recover():
+			# Names only differing by case are the same player, keep their best score
+			player = self.normalize(name)
+			prev = self.players.get(player)
+			if prev is None or (score > prev.get_score() if self.descending else score < prev.get_score()):
+				self.players[player] = LeaderboardEntry(name, score)
+		self.scores.update(self.players.values())
+		self._load_time = time.perf_counter() - start
+		if verbose:
+			self.print_summary()
+		return self
+
+	def print_summary(self):
+		if len(self.scores) > 0:
+			print(f"Database Loaded for challenge {self.file_name} ({len(self.scores)} players, {1000 * self._load_time:.1f} ms)")
 		print(self.get_save_path())
 
+	def get_load_time(self) -> float:
+		"""
+		:return: Time spent loading the board, in seconds
+		"""
+		return self._load_time
+
+	@staticmethod
+	def normalize(name: str) -> str:
+		return name.lower()
+
+	def sort_key(self, entry: LeaderboardEntry) -> float:
+		return -entry.get_score() if self.descending else entry.get_score()
+
 	def get_prev_entry(self, name: str) -> Union[LeaderboardEntry, None]:
-		for prev in self.scores:
-			if prev.get_name().lower() == name.lower():
-				return prev
-		return None
+		return self.players.get(self.normalize(name))
 
 	def improves(self, entry: LeaderboardEntry) -> bool:
 		prev = self.get_prev_entry(entry.get_name())
@@ -47,27 +93,70 @@ class Leaderboard:
 
 	def add_score(self, entry: LeaderboardEntry):
 		# Find out if this is any improvement from the user
+		improved = self.improves(entry)
+		self.store.append(entry.get_name(), entry.get_score(), improved)
+		if not improved:
+			return  # Only the attempt is saved if it's not
+		self._insert(entry)
+		if self.sync_client is not None:
+			self.sync_client.submit(self.file_name, entry.get_name(), entry.get_score())
+
+	def merge(self, entry: LeaderboardEntry) -> bool:
+		"""
+		Adds a score set on another kiosk, saved locally but not pushed back
+		:return: Whether it improved the player's score
+		"""
 		if not self.improves(entry):
-			return  # Skip if it's not
+			return False
+		self.store.merge(entry.get_name(), entry.get_score())
+		self._insert(entry)
+		return True
+
+	def _insert(self, entry: LeaderboardEntry):
 		prev = self.get_prev_entry(entry.get_name())
 		if prev is not None:
 			self.scores.remove(prev)
-		self.scores.append(entry)
-		self.scores.sort(key=lambda _e: _e.get_score(), reverse=self.descending)
-		self.save()
+		self.scores.add(entry)
+		self.players[self.normalize(entry.get_name())] = entry
+
+	def set_sync_client(self, client: 'SyncClient') -> 'Leaderboard':
+		"""
+		Shares the board with other kiosks: its scores are pushed, including those set before, and others' are merged by LeaderboardRegistry.merge_remote
+		"""
+		self.sync_client = client
+		client.add_board(self.file_name, self.descending)
+		for entry in self.scores:
+			client.submit(self.file_name, entry.get_name(), entry.get_score())
+		return self
+
+	def get_rank(self, player: str) -> int:
+		"""
+		:return: 1-based rank of the player, -1 if they have no score
+		"""
+		entry = self.get_prev_entry(player)
+		if entry is None:
+			return -1
+		return self.scores.index(entry) + 1
 
-	def get_rank(self, player: str):
-		player = player.lower()
-		for rank, entry in enumerate(self.scores):
-			if entry.get_name().lower() == player:
-				return rank + 1
-		return -1
+	def get_rank_of_score(self, score: float) -> int:
+		"""
+		:return: Rank a new player with the given score would get
+		"""
+		return self.scores.count_below(self.sort_key(LeaderboardEntry("", score))) + 1
+
+	def get_size(self) -> int:
+		return len(self.scores)
 
 	def get_top(self, max_entries: int = 10) -> list[LeaderboardEntry]:
-		return self.scores[:min(max_entries, len(self.scores))]
+		return self.scores.head(max_entries)
+
+	@staticmethod
+	def get_save_directory() -> str:
+		# USERPROFILE is only set on Windows
+		return os.path.join(os.environ.get('USERPROFILE', os.path.expanduser('~')), 'Desktop') + "/HackersBenchmark/"
 
 	def get_save_path(self) -> str:
-		return os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop') + "/HackersBenchmark/" + self.file_name + ".json"
+		return self.get_save_directory() + self.file_name + ".json"
 		# return "Desktop/HackersBenchmark/" + self.file_name + ".json"
 
 		# return abspath("leaderboards/" + self.file_name + ".json")
@@ -77,7 +166,101 @@ class Leaderboard:
 		os.makedirs(dirname(path), exist_ok=True)
 
 	def save(self):
-		self.create_paths()
-		pairs = {p.get_name(): p.get_score() for p in self.scores}
-		with open(self.get_save_path(), 'w') as save_file:
-			save_file.write(json.dumps(pairs, indent=4))
+		"""
+		Compacts the saved scores in the background. Scores are saved as they are added, this only shortens the next load
+		"""
+		self.store.compact()
+
+	def close(self):
+		"""
+		Waits for the scores added so far to be written
+		"""
+		self.store.close()
+
+
+class LeaderboardRegistry(Provider[str, Leaderboard]):
+	"""
+	Leaderboards by file name, loaded together at startup rather than whenever their challenge is built
+	"""
+
+	database: Union['ScoreDatabase', None] = None
+	sync_client: Union['SyncClient', None] = None
+
+	MERGE_BUDGET = 500  # Remote changes merged per call to merge_remote
+
+	def use_database(self, database: 'ScoreDatabase') -> 'LeaderboardRegistry':
+		"""
+		Saves the boards loaded from now on in the given database instead of json files, which are imported the first time
+		"""
+		self.database = database
+		return self
+
+	def create_board(self, file_name: str, descending: bool = True, load: bool = True) -> Leaderboard:
+		if self.database is None:
+			return Leaderboard(file_name, descending, load)
+		store = self.database.get_store(file_name, descending)
+		board = Leaderboard(file_name, descending, False, store)
+		store.set_json_path(board.get_save_path())
+		return board.load() if load else board
+
+	def use_sync(self, client: 'SyncClient') -> 'LeaderboardRegistry':
+		"""
+		Shares every board, loaded or not yet, with other kiosks through the given client, which is started
+		"""
+		self.sync_client = client
+		for board in self.items.values():
+			board.set_sync_client(client)
+		client.start()
+		return self
+
+	def merge_remote(self) -> int:
+		"""
+		Merges changes pulled from other kiosks, a bounded amount at a time so that a large pull is spread over several frames
+		:return: Amount of merged changes
+		"""
+		if self.sync_client is None:
+			return 0
+		changes = self.sync_client.get_changes(self.MERGE_BUDGET)
+		for board_name, descending, name, score in changes:
+			if board_name in self.items:
+				self.items[board_name].merge(LeaderboardEntry(name, score))
+		return len(changes)
+
+	def set(self, key: str, value: Leaderboard):
+		if self.sync_client is not None:
+			value.set_sync_client(self.sync_client)
+		super().set(key, value)
+
+	def get_board(self, file_name: str, descending: bool = True) -> Leaderboard:
+		"""
+		:return: The loaded board, loading it now if it wasn't
+		"""
+		if file_name not in self.items:
+			self.set(file_name, self.create_board(file_name, descending))
+		return self.items[file_name]
+
+	def load_all(self, boards: dict[str, bool], workers: int = 4) -> 'LeaderboardRegistry':
+		"""
+		Loads boards concurrently, overlapping their file reads
+		:param boards: Descending flag of each board by file name
+		"""
+		pending = [self.create_board(file_name, descending, load=False) for file_name, descending in boards.items() if file_name not in self.items]
+		with ThreadPoolExecutor(max(1, min(workers, len(pending)))) as executor:
+			for board in executor.map(lambda _board: _board.load(verbose=False), pending):
+				board.print_summary()
+				self.set(board.file_name, board)
+		return self
+
+	def get_load_times(self) -> dict[str, float]:
+		"""
+		:return: Time spent loading each board, in seconds
+		"""
+		return {file_name: board.get_load_time() for file_name, board in self.items.items()}
+
+	def close_all(self):
+		if self.sync_client is not None:
+			self.sync_client.stop()
+		for board in self.items.values():
+			board.close()
+		if self.database is not None:
+			self.database.close()
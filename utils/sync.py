@@ -0,0 +1,261 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from typing import Union
+
+from utils.journal import ScoreJournal
+from utils.leaderboard import Leaderboard, LeaderboardEntry
+
+DEFAULT_PORT = 7531
+LINE_LIMIT = 64 * 1024 * 1024  # Largest request or response, a whole set of boards pulled at once
+
+
+def is_board_name(name) -> bool:
+	"""
+	:return: Whether the name can be used as a file name, as challenge leaderboard names can
+	"""
+	return isinstance(name, str) and 0 < len(name) <= 64 and name.replace("_", "").isalnum()
+
+
+class LeaderboardServer:
+	"""
+	Leaderboards shared by several kiosks, which push their new scores and pull those of the others through newline-delimited json requests.
+	Every change is given a sequence number, only the latest change of each player being kept, so that kiosks pull what changed since their last sync.
+	Sequence numbers start over with each run of the server, which is told apart by its epoch
+	"""
+
+	def __init__(self, directory: str):
+		"""
+		:param directory: Where boards are saved, as journaled json files
+		"""
+		self.directory = directory
+		os.makedirs(directory, exist_ok=True)
+		self.epoch = f"{time.time():.6f}"
+		self.seq = 0
+		self.boards: dict[str, Leaderboard] = {}
+		# Sequence number of the latest change of each (board, player), the latest last
+		self.changes: dict[tuple[str, str], int] = {}
+
+	def get_board(self, name: str, descending: bool = True) -> Leaderboard:
+		if name not in self.boards:
+			store = ScoreJournal(os.path.join(self.directory, name + ".json"), descending)
+			board = Leaderboard(name, descending, False, store).load(verbose=False)
+			self.boards[name] = board
+			for player in board.players:
+				self._change(name, player)
+		return self.boards[name]
+
+	def _change(self, board: str, player: str):
+		self.seq += 1
+		self.changes.pop((board, player), None)
+		self.changes[board, player] = self.seq
+
+	def get_changes(self, since: int) -> list[list]:
+		"""
+		:return: [board, descending, name, score] of the players whose best score changed after the given sequence number
+		"""
+		changes = []
+		for (board_name, player), seq in reversed(self.changes.items()):
+			if seq <= since:
+				break
+			board = self.boards[board_name]
+			entry = board.players[player]
+			changes.append([board_name, board.descending, entry.get_name(), entry.get_score()])
+		changes.reverse()
+		return changes
+
+	def sync(self, request: dict) -> dict:
+		"""
+		:param request: {"epoch", "since", "boards": {name: descending}, "scores": [[board, name, score], ...]}
+		:return: {"epoch", "seq", "changes": [[board, descending, name, score], ...]}
+		"""
+		for name, descending in request.get("boards", {}).items():
+			if is_board_name(name):
+				self.get_board(name, bool(descending))
+		for record in request.get("scores", []):
+			if len(record) != 3 or record[0] not in self.boards or not isinstance(record[1], str) or not isinstance(record[2], (int, float)):
+				continue
+			board = self.boards[record[0]]
+			entry = LeaderboardEntry(record[1], record[2])
+			if board.improves(entry):
+				board.add_score(entry)
+				self._change(record[0], board.normalize(record[1]))
+		# A kiosk which last synced with a previous run of the server pulls everything
+		since = request.get("since", 0) if request.get("epoch") == self.epoch else 0
+		return {"epoch": self.epoch, "seq": self.seq, "changes": self.get_changes(since)}
+
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		try:
+			while line := await reader.readline():
+				try:
+					response = self.sync(json.loads(line))
+				except (ValueError, TypeError, AttributeError):
+					response = {"error": "Malformed request"}
+				writer.write(json.dumps(response).encode('utf-8') + b"\n")
+				await writer.drain()
+		except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+			pass
+		finally:
+			writer.close()
+
+	async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+		server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+		async with server:
+			await server.serve_forever()
+
+	def close(self):
+		for board in self.boards.values():
+			board.close()
+
+
+class SyncClient:
+	"""
+	Connection of a kiosk to a LeaderboardServer, run by an asyncio loop on a background thread.
+	Submissions are batched, keeping the best score of each player, and pushed along with a pull of the changes made on other kiosks.
+	Pulled changes wait to be merged by the main thread, so that the frame loop never waits on the server
+	"""
+
+	SYNC_INTERVAL = 1.  # s between two syncs
+	BATCH_DELAY = .05  # s waited after a submission for others to batch with it
+	TIMEOUT = 5.  # s before giving up on a request
+	RETRY_INTERVAL = 3.  # s between two connection attempts
+
+	def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+		self.host = host
+		self.port = port
+		self._lock = threading.Lock()
+		self._boards: dict[str, bool] = {}  # Descending flag of each synced board
+		self._pending: dict[tuple[str, str], tuple[str, float]] = {}  # Best unpushed (name, score) of each (board, player)
+		self._received: queue.Queue = queue.Queue()
+		self._epoch: Union[str, None] = None
+		self._seq = 0
+		self._connected = False
+		self._last_sync = 0.
+		self._thread: Union[threading.Thread, None] = None
+		self._loop: Union[asyncio.AbstractEventLoop, None] = None
+		self._wakeup: Union[asyncio.Event, None] = None
+		self._stopping = False
+
+	def add_board(self, name: str, descending: bool = True) -> 'SyncClient':
+		with self._lock:
+			self._boards[name] = descending
+		return self
+
+	def submit(self, board: str, name: str, score: float):
+		"""
+		Queues a score to be pushed with the next sync
+		"""
+		with self._lock:
+			descending = self._boards.get(board, True)
+			key = board, Leaderboard.normalize(name)
+			prev = self._pending.get(key)
+			if prev is None or (score > prev[1] if descending else score < prev[1]):
+				self._pending[key] = name, score
+		self._wake()
+
+	def get_changes(self, max_count: int) -> list[list]:
+		"""
+		:return: Up to max_count [board, descending, name, score] pulled from the server and not yet merged
+		"""
+		changes = []
+		while len(changes) < max_count and not self._received.empty():
+			changes.append(self._received.get_nowait())
+		return changes
+
+	def get_pending_count(self) -> int:
+		return len(self._pending)
+
+	def is_connected(self) -> bool:
+		return self._connected
+
+	def get_last_sync(self) -> float:
+		"""
+		:return: perf_counter time of the last successful sync
+		"""
+		return self._last_sync
+
+	def start(self) -> 'SyncClient':
+		if self._thread is None:
+			self._stopping = False
+			self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="leaderboard-sync", daemon=True)
+			self._thread.start()
+		return self
+
+	def stop(self):
+		"""
+		Pushes pending scores if the server can be reached in time, then stops syncing
+		"""
+		if self._thread is None:
+			return
+		self._stopping = True
+		self._wake()
+		self._thread.join(2 * self.TIMEOUT)
+		self._thread = None
+
+	def _wake(self):
+		if self._loop is not None:
+			try:
+				self._loop.call_soon_threadsafe(self._wakeup.set)
+			except RuntimeError:
+				pass  # Loop already closed
+
+	async def _run(self):
+		self._wakeup = asyncio.Event()
+		self._loop = asyncio.get_running_loop()
+		while not self._stopping:
+			writer = None
+			try:
+				reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port, limit=LINE_LIMIT), self.TIMEOUT)
+				self._connected = True
+				while True:
+					await self._sync(reader, writer)
+					if self._stopping:
+						break
+					await self._sleep(self.SYNC_INTERVAL)
+					if self._wakeup.is_set() and not self._stopping:
+						await asyncio.sleep(self.BATCH_DELAY)
+			except (OSError, asyncio.TimeoutError, ValueError, KeyError):
+				self._connected = False
+				if not self._stopping:
+					await self._sleep(self.RETRY_INTERVAL)
+			finally:
+				if writer is not None:
+					writer.close()
+				if self._stopping:
+					break
+		self._connected = False
+		self._loop = None
+
+	async def _sleep(self, duration: float):
+		"""
+		Sleeps until the given duration elapsed or a submission came
+		"""
+		try:
+			await asyncio.wait_for(self._wakeup.wait(), duration)
+		except asyncio.TimeoutError:
+			pass
+
+	async def _sync(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		self._wakeup.clear()
+		with self._lock:
+			pushed = dict(self._pending)
+			boards = dict(self._boards)
+		request = {"epoch": self._epoch, "since": self._seq, "boards": boards, "scores": [[board, name, score] for (board, _), (name, score) in pushed.items()]}
+		writer.write(json.dumps(request).encode('utf-8') + b"\n")
+		await asyncio.wait_for(writer.drain(), self.TIMEOUT)
+		line = await asyncio.wait_for(reader.readline(), self.TIMEOUT)
+		if not line:
+			raise ConnectionError("Connection closed by the server")
+		response = json.loads(line)
+		with self._lock:
+			for key, record in pushed.items():
+				# Kept if a better score came in the meantime
+				if self._pending.get(key) == record:
+					del self._pending[key]
+		for change in response["changes"]:
+			self._received.put(change)
+		self._epoch, self._seq = response["epoch"], response["seq"]
+		self._last_sync = time.perf_counter()